@@ -11,7 +11,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from . production import editor_type, editor_type_operator, socket_object, node_object, node_mapping
+from . production import preferences, editor_type, editor_type_operator, socket_object, node_object, node_mapping
 
 bl_info = {
     "name": "ReNim Node",
@@ -30,6 +30,7 @@ bl_info = {
 
 
 submodules = [
+    preferences,
     editor_type,
     editor_type_operator,
     socket_object,
@@ -0,0 +1,80 @@
+import time
+import bpy
+from bpy.types import Action
+from . fingerprint import action_fingerprint
+
+# custom properties of action created by bake
+METADATA_PROPERTIES = ["renim_source", "renim_tree",
+                       "renim_node", "renim_timestamp", "renim_content_hash"]
+
+
+def tag_bake_metadata(action: Action, node_source_target):
+    # call after keyframes are written, content hash find exact duplicate bake
+    socket_node = node_source_target.outputs[0]
+    if node_source_target.is_virtual_source():
+        source = bpy.path.basename(node_source_target.source_bvh)
+    else:
+        source = socket_node.source_object.name if socket_node.source_object else ""
+
+    action["renim_source"] = source
+    action["renim_tree"] = node_source_target.id_data.name
+    action["renim_node"] = node_source_target.name
+    action["renim_timestamp"] = time.time()
+    action["renim_content_hash"] = action_fingerprint(action)
+
+
+def is_bake_action(action: Action):
+    # action tagged by bake, also action from version before metadata
+    return "renim_content_hash" in action or "renim_rig_fingerprint" in action
+
+
+def is_action_used(action: Action):
+    # assigned to object or used by nla strip, fake user is not a real user
+    return action.users - int(action.use_fake_user) > 0
+
+
+def plan_action_cleanup(keep_last: int, keep_used: bool):
+    # return tuple (duplicates list of (duplicate, kept action), expired actions)
+    actions = [action for action in bpy.data.actions if is_bake_action(action)]
+
+    def content_hash(action):
+        return action.get("renim_content_hash") or action_fingerprint(action)
+
+    def rank(action):
+        # used action first, then newest
+        return (is_action_used(action), action.get("renim_timestamp", 0.0))
+
+    by_hash = {}
+    for action in actions:
+        by_hash.setdefault(content_hash(action), []).append(action)
+
+    duplicates = []
+    unique = []
+    for group in by_hash.values():
+        group.sort(key=rank, reverse=True)
+        unique.append(group[0])
+        duplicates.extend((action, group[0]) for action in group[1:])
+
+    # retention per tree, newest first
+    expired = []
+    if keep_last > 0:
+        by_tree = {}
+        for action in unique:
+            by_tree.setdefault(action.get("renim_tree", ""), []).append(action)
+        for group in by_tree.values():
+            group.sort(key=lambda action: action.get(
+                "renim_timestamp", 0.0), reverse=True)
+            expired.extend(action for action in group[keep_last:]
+                           if not (keep_used and is_action_used(action)))
+
+    return duplicates, expired
+
+
+def purge_actions(duplicates: list, expired: list):
+    # duplicate users move to kept action, then all removed at once
+    for duplicate, kept in duplicates:
+        duplicate.user_remap(kept)
+        bpy.data.actions.remove(duplicate)
+    for action in expired:
+        bpy.data.actions.remove(action)
+    return len(duplicates), len(expired)
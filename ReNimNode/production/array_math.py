@@ -0,0 +1,146 @@
+import numpy as np
+
+# vectorized rotation math over frames
+# quaternion layout follow blender (w, x, y, z) and matrix use column vector (v' = M @ v)
+
+AXIS_INDEX = {"X": 0, "Y": 1, "Z": 2}
+
+
+def quat_normalize(q):
+    q = np.asarray(q, dtype=np.float64)
+    length = np.linalg.norm(q, axis=-1, keepdims=True)
+    return q / np.where(length == 0.0, 1.0, length)
+
+
+def quat_conjugate(q):
+    q = np.asarray(q, dtype=np.float64)
+    return q * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quat_multiply(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    aw, ax, ay, az = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bw, bx, by, bz = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+def quat_rotate(q, v):
+    q = np.asarray(q, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    # v' = v + 2w(u x v) + 2u x (u x v)
+    u = q[..., 1:]
+    w = q[..., :1]
+    uv = np.cross(u, v)
+    return v + 2.0 * (w * uv + np.cross(u, uv))
+
+
+def quat_to_matrix(q):
+    q = quat_normalize(q)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    m = np.empty(q.shape[:-1] + (3, 3))
+    m[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    m[..., 0, 1] = 2.0 * (x * y - z * w)
+    m[..., 0, 2] = 2.0 * (x * z + y * w)
+    m[..., 1, 0] = 2.0 * (x * y + z * w)
+    m[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    m[..., 1, 2] = 2.0 * (y * z - x * w)
+    m[..., 2, 0] = 2.0 * (x * z - y * w)
+    m[..., 2, 1] = 2.0 * (y * z + x * w)
+    m[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return m
+
+
+def matrix_to_quat(m):
+    m = np.asarray(m, dtype=np.float64)
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    m10, m11, m12 = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    m20, m21, m22 = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+
+    # candidate for every branch, pick the most stable one per element
+    candidates = np.stack([
+        np.stack([1.0 + m00 + m11 + m22, m21 - m12,
+                 m02 - m20, m10 - m01], axis=-1),
+        np.stack([m21 - m12, 1.0 + m00 - m11 - m22,
+                 m01 + m10, m02 + m20], axis=-1),
+        np.stack([m02 - m20, m01 + m10, 1.0 -
+                 m00 + m11 - m22, m12 + m21], axis=-1),
+        np.stack([m10 - m01, m02 + m20, m12 +
+                 m21, 1.0 - m00 - m11 + m22], axis=-1),
+    ], axis=-2)
+    pivot = np.argmax(np.stack(
+        [m00 + m11 + m22, m00, m11, m22], axis=-1), axis=-1)
+    q = np.take_along_axis(
+        candidates, pivot[..., None, None], axis=-2)[..., 0, :]
+    q = quat_normalize(q)
+    # keep w positive like mathutils
+    return np.where(q[..., :1] < 0.0, -q, q)
+
+
+def axis_matrix(axis, angle):
+    angle = np.asarray(angle, dtype=np.float64)
+    c = np.cos(angle)
+    s = np.sin(angle)
+    one = np.ones_like(angle)
+    zero = np.zeros_like(angle)
+    if axis == 0:
+        rows = [[one, zero, zero], [zero, c, -s], [zero, s, c]]
+    elif axis == 1:
+        rows = [[c, zero, s], [zero, one, zero], [-s, zero, c]]
+    else:
+        rows = [[c, -s, zero], [s, c, zero], [zero, zero, one]]
+    return np.stack([np.stack(row, axis=-1) for row in rows], axis=-2)
+
+
+def euler_to_matrix(e, order="XYZ"):
+    e = np.asarray(e, dtype=np.float64)
+    i, j, k = [AXIS_INDEX[axis] for axis in order]
+    # blender apply first axis first, R = Rk @ Rj @ Ri
+    return axis_matrix(k, e[..., k]) @ axis_matrix(j, e[..., j]) @ axis_matrix(i, e[..., i])
+
+
+def matrix_to_euler(m, order="XYZ"):
+    m = np.asarray(m, dtype=np.float64)
+    i, j, k = [AXIS_INDEX[axis] for axis in order]
+    # sign of permutation, XYZ YZX ZXY are even
+    parity = 1.0 if (i, j, k) in [(0, 1, 2), (1, 2, 0), (2, 0, 1)] else -1.0
+
+    e = np.empty(m.shape[:-2] + (3,))
+    e[..., j] = np.arctan2(-parity * m[..., k, i],
+                           np.sqrt(m[..., i, i] ** 2 + m[..., j, i] ** 2))
+    e[..., i] = np.arctan2(parity * m[..., k, j], m[..., k, k])
+    e[..., k] = np.arctan2(parity * m[..., j, i], m[..., i, i])
+    return e
+
+
+def euler_order(pose_bone):
+    # visual keyframe euler follow bone rotation mode, XYZ for quaternion and axis angle
+    return pose_bone.rotation_mode if pose_bone.rotation_mode not in ["QUATERNION", "AXIS_ANGLE"] else "XYZ"
+
+
+def euler_to_quat(e, order="XYZ"):
+    return matrix_to_quat(euler_to_matrix(e, order))
+
+
+def quat_to_euler(q, order="XYZ"):
+    return matrix_to_euler(quat_to_matrix(q), order)
+
+
+def quat_continuity(q):
+    # flip quaternion to the same hemisphere as previous frame
+    q = np.asarray(q, dtype=np.float64)
+    if len(q) < 2:
+        return q
+    signs = np.sign(np.einsum("ij,ij->i", q[1:], q[:-1]))
+    signs[signs == 0.0] = 1.0
+    return q * np.concatenate([[1.0], np.cumprod(signs)])[:, None]
+
+
+def euler_continuity(e):
+    # remove 2 pi jump between frames
+    return np.unwrap(np.asarray(e, dtype=np.float64), axis=0)
@@ -0,0 +1,355 @@
+import bpy
+import numpy as np
+from bpy.types import Action, Object
+from . array_math import euler_continuity, euler_order, quat_continuity, quat_multiply, quat_conjugate, quat_rotate, quat_to_euler
+from . node_mapping import ReNimNodeMapping
+
+# interpolation enum value for keyframe_points.foreach_set
+INTERPOLATION_LINEAR = 1
+
+
+def write_fcurve(action: Action, data_path: str, index: int, group: str, frames, values):
+    # write all keyframes in one go instead keyframe_insert per frame
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(
+            data_path, index=index, action_group=group)
+    else:
+        fcurve.keyframe_points.clear()
+
+    count = len(frames)
+    fcurve.keyframe_points.add(count)
+
+    co = np.empty((count, 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    fcurve.keyframe_points.foreach_set("co", co.ravel())
+    fcurve.keyframe_points.foreach_set(
+        "interpolation", [INTERPOLATION_LINEAR] * count)
+    fcurve.update()
+
+    return fcurve
+
+
+def write_bone_channels(action: Action, bone_name: str, frames, channels: dict):
+    # channels is dict of data path to array (frames, size)
+    groups = {
+        "location": " (loc)",
+        "rotation_quaternion": " (rot quat)",
+        "rotation_euler": " (rot euler)",
+        "scale": " (scale)",
+    }
+    for prop_transform, values in channels.items():
+        data_path = 'pose.bones["{}"].{}'.format(bone_name, prop_transform)
+        for index in range(values.shape[1]):
+            write_fcurve(action, data_path, index, bone_name +
+                         groups[prop_transform], frames, values[:, index])
+
+
+def rest_rotation(armature_object: Object, bone_name: str):
+    bone = armature_object.data.bones.get(bone_name)  # type: ignore
+    if bone is None:
+        return None
+    return np.array(bone.matrix_local.to_quaternion())
+
+
+class ReNimBakeJob:
+    '''Sample visual transform of bake bones and write it to action'''
+
+    def __init__(self, node_source_target):
+        self.node_source_target = node_source_target
+
+        # get output socket node
+        socket_node = node_source_target.outputs[0]
+
+        # target object from socket
+        self.target_object = socket_node.target_object
+
+        # target pose bones
+        target_pose_bones = self.target_object.pose.bones
+
+        # get bone nodes to bake for link socket and set to tuple list (bone name, *[transform to bake])
+        bake_bone_from_nodes = [bake_bone for link in socket_node.links if isinstance(link.to_node, ReNimNodeMapping) and link.to_node.is_bind_valid
+                                for bake_bone in link.to_node.bake_bones(self.target_object)]
+
+        # get additional bones to bake and set to tuple list (bone name, *[transform to bake])
+        additional_bones = [(bone_group.bone_name, *bone_group.translation)
+                            for bone_group in node_source_target.additional_bone_to_bake]
+
+        # merge bone nodes and additional bones and remove duplicate
+        bake_bones = list(set(bake_bone_from_nodes + additional_bones))
+
+        # check if bone exist and add current transform space | tuple(pose bone, *[transform to bake], location, rotation, scale)
+        self.bake_bones = [(target_pose_bones[bone_name], bake_location, bake_rotation, bake_scale, target_pose_bones[bone_name].location.copy(), target_pose_bones[bone_name].rotation_quaternion.copy() if target_pose_bones[bone_name].rotation_mode ==
+                            "QUATERNION" else target_pose_bones[bone_name].rotation_euler.copy(), target_pose_bones[bone_name].scale.copy()) for bone_name, bake_location, bake_rotation, bake_scale in bake_bones if target_pose_bones.get(bone_name)]
+
+        self.frames = []
+        # per bone list of (location, quaternion, scale) for every sampled frame
+        self.samples = {
+            pose_bone.name: [] for pose_bone, *_ in self.bake_bones}
+
+    def reset_pose(self):
+        for pose_bone, is_bake_location, is_bake_rotation, is_bake_scale, ori_location, ori_rotation, ori_scale in self.bake_bones:
+            # set location transform value to original value prevent value from last keyframe
+            if is_bake_location:
+                pose_bone.location = ori_location
+
+            # set rotation transform value to original value prevent value from last keyframe
+            if is_bake_rotation:
+                # 2 rotation mode
+                if pose_bone.rotation_mode == "QUATERNION":
+                    pose_bone.rotation_quaternion = ori_rotation
+                else:
+                    pose_bone.rotation_euler = ori_rotation
+
+            # set scale transform value to original value prevent value from last keyframe
+            if is_bake_scale:
+                pose_bone.scale = ori_scale
+
+    def sample(self, frame):
+        # call after view layer update, read visual transform same as INSERTKEY_VISUAL
+        # frames can be sampled in any order, channels sort them
+        self.frames.append(frame)
+        for pose_bone, *_ in self.bake_bones:
+            matrix = self.target_object.convert_space(
+                pose_bone=pose_bone, matrix=pose_bone.matrix, from_space="POSE", to_space="LOCAL")
+            self.samples[pose_bone.name].append(matrix.decompose())
+
+    def sample_values(self, index: int = -1):
+        # flat array of one sampled frame of all bake bones, to measure interpolation error
+        return np.array([value for pose_bone, *_ in self.bake_bones for transform in self.samples[pose_bone.name][index] for value in transform])
+
+    def keep_frames(self, frames):
+        # drop sampled frames not needed as keyframe
+        keep = [index for index, frame in enumerate(
+            self.frames) if frame in frames]
+        self.frames = [self.frames[index] for index in keep]
+        for bone_name, samples in self.samples.items():
+            self.samples[bone_name] = [samples[index] for index in keep]
+
+    def drain(self):
+        # take sampled frames as arrays and clear them, keep memory flat when streaming to file
+        # tuple (frames, dict bone name -> (location, quaternion, scale) arrays (frames, size))
+        frames = np.array(self.frames, dtype=np.float32)
+        transforms = {bone_name: tuple(np.array([sample[index] for sample in samples]) for index in range(3))
+                      for bone_name, samples in self.samples.items() if samples}
+        self.frames = []
+        for samples in self.samples.values():
+            samples.clear()
+        return frames, transforms
+
+    def channels(self):
+        # convert samples to arrays in frame order | dict bone name -> dict data path -> array (frames, size)
+        order = sorted(range(len(self.frames)),
+                       key=lambda index: self.frames[index])
+        self.frames = [self.frames[index] for index in order]
+
+        result = {}
+        for pose_bone, is_bake_location, is_bake_rotation, is_bake_scale, *_ in self.bake_bones:
+            samples = [self.samples[pose_bone.name][index] for index in order]
+            self.samples[pose_bone.name] = samples
+            if not samples:
+                continue
+
+            channels = {}
+            if is_bake_location:
+                channels["location"] = np.array(
+                    [sample[0] for sample in samples])
+            if is_bake_rotation:
+                channels["rotation_quaternion"] = np.array(
+                    [sample[1] for sample in samples])
+                # continuity is fixed on written action by filter_action_rotations
+                channels["rotation_euler"] = quat_to_euler(
+                    channels["rotation_quaternion"], euler_order(pose_bone))
+            if is_bake_scale:
+                channels["scale"] = np.array(
+                    [sample[2] for sample in samples])
+            result[pose_bone.name] = channels
+        return result
+
+    def write_action(self, action: Action, channels: dict, armature_object: Object | None = None):
+        # armature object own the action, default target object
+        write_action_channels(action, self.frames, channels)
+        filter_action_rotations(
+            action, armature_object or self.target_object)
+
+    def fan_out_channels(self, channels: dict, target_object: Object):
+        return fan_out_channels(channels, self.target_object, target_object)
+
+
+def source_key_frames(source_object: Object, start_frame: int, end_frame: int):
+    # sorted integer keyframe times of source action inside frame range, range ends always included
+    frames = {start_frame, end_frame}
+    action = source_object.animation_data.action if source_object and source_object.animation_data else None
+    for fcurve in action.fcurves if action else []:
+        co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", co)
+        times = np.round(co[0::2]).astype(int)
+        frames.update(int(frame) for frame in times[(
+            times >= start_frame) & (times <= end_frame)])
+    return sorted(frames)
+
+
+def adaptive_sample_frames(evaluate, key_frames: list, tolerance: float):
+    # evaluate(frame) sample frame and return flat values, sample key frames first
+    # then bisect interval only where linear interpolation between its ends deviate more than tolerance
+    # return set of frames to keep as keyframe
+    values = {frame: evaluate(frame) for frame in key_frames}
+    kept = set(key_frames)
+
+    intervals = list(zip(key_frames[:-1], key_frames[1:]))
+    while intervals:
+        start, end = intervals.pop()
+        if end - start < 2:
+            continue
+
+        middle = (start + end) // 2
+        values[middle] = evaluate(middle)
+        factor = (middle - start) / (end - start)
+        interpolated = values[start] + (values[end] - values[start]) * factor
+        if np.max(np.abs(values[middle] - interpolated)) > tolerance:
+            kept.add(middle)
+            intervals.extend([(start, middle), (middle, end)])
+
+    return kept
+
+
+def read_fcurve_co(fcurve):
+    co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+    fcurve.keyframe_points.foreach_get("co", co)
+    return co.reshape(-1, 2)
+
+
+def filter_action_rotations(action: Action, armature_object: Object):
+    # post bake pass over all rotation curves, quaternion to same hemisphere as previous key
+    # euler rebuilt from aligned quaternion when bone has both, then unwrapped, one foreach_set per curve
+    # return count of changed curves
+    bone_curves = {}
+    for fcurve in action.fcurves:
+        if not fcurve.data_path.startswith("pose.bones[") or fcurve.data_path.rsplit(".", 1)[-1] not in ["rotation_quaternion", "rotation_euler"]:
+            continue
+        bone_name = fcurve.data_path.split('"')[1]
+        prop_transform = fcurve.data_path.rsplit(".", 1)[-1]
+        bone_curves.setdefault(bone_name, {}).setdefault(
+            prop_transform, {})[fcurve.array_index] = fcurve
+
+    changed = 0
+    for bone_name, transforms in bone_curves.items():
+        pose_bone = armature_object.pose.bones.get(bone_name)
+        quaternion_curves = transforms.get("rotation_quaternion", {})
+        euler_curves = transforms.get("rotation_euler", {})
+
+        # tuple list (fcurve, keyframe co, new values)
+        writes = []
+
+        rotation = None
+        rotation_frames = None
+        if len(quaternion_curves) == 4:
+            cos = [read_fcurve_co(quaternion_curves[index])
+                   for index in range(4)]
+            # only baked curves share the same keyframe times
+            if all(len(co) == len(cos[0]) and np.array_equal(co[:, 0], cos[0][:, 0]) for co in cos):
+                rotation = quat_continuity(
+                    np.stack([co[:, 1] for co in cos], axis=-1))
+                rotation_frames = cos[0][:, 0]
+                writes.extend((quaternion_curves[index], cos[index], rotation[:, index])
+                              for index in range(4))
+
+        if len(euler_curves) == 3:
+            cos = [read_fcurve_co(euler_curves[index]) for index in range(3)]
+            if rotation is not None and pose_bone and all(np.array_equal(co[:, 0], rotation_frames) for co in cos):
+                euler = euler_continuity(quat_to_euler(
+                    rotation, euler_order(pose_bone)))
+                writes.extend((euler_curves[index], cos[index], euler[:, index])
+                              for index in range(3))
+            else:
+                # hand keyed euler, only unwrap every curve
+                writes.extend((euler_curves[index], cos[index], euler_continuity(cos[index][:, 1]))
+                              for index in range(3))
+
+        for fcurve, co, values in writes:
+            values = values.astype(np.float32)
+            if np.array_equal(co[:, 1], values):
+                continue
+            co[:, 1] = values
+            fcurve.keyframe_points.foreach_set("co", co.ravel())
+            fcurve.update()
+            changed += 1
+
+    return changed
+
+
+def write_action_channels(action: Action, frames, channels: dict):
+    frames = np.array(frames, dtype=np.float32)
+    for bone_name, bone_channels in channels.items():
+        write_bone_channels(action, bone_name, frames, bone_channels)
+
+
+def fan_out_channels(channels: dict, primary_object: Object, target_object: Object):
+    # reuse sampled channels for other target, only convert bone which rest rotation differ
+    result = {}
+    for bone_name, bone_channels in channels.items():
+        pose_bone = target_object.pose.bones.get(bone_name)
+        rest_target = rest_rotation(target_object, bone_name)
+        rest_primary = rest_rotation(primary_object, bone_name)
+        if pose_bone is None or rest_target is None or rest_primary is None:
+            continue
+
+        # offset = rest target^-1 @ rest primary, express the same motion in other bone orientation
+        offset = quat_multiply(quat_conjugate(rest_target), rest_primary)
+        if abs(abs(offset[0]) - 1.0) < 1e-6:
+            result[bone_name] = bone_channels
+            continue
+
+        converted = {}
+        for prop_transform, values in bone_channels.items():
+            if prop_transform == "location":
+                converted[prop_transform] = quat_rotate(offset, values)
+            elif prop_transform == "rotation_quaternion":
+                converted[prop_transform] = quat_multiply(
+                    quat_multiply(offset, values), quat_conjugate(offset))
+            elif prop_transform == "rotation_euler":
+                rotation = quat_multiply(quat_multiply(
+                    offset, bone_channels["rotation_quaternion"]), quat_conjugate(offset))
+                converted[prop_transform] = euler_continuity(quat_to_euler(
+                    rotation, euler_order(pose_bone)))
+            else:
+                converted[prop_transform] = values
+        result[bone_name] = converted
+    return result
+
+
+def new_bake_action(action_name: str):
+    # create new action
+    action = bpy.data.actions.new(action_name)
+
+    # set fake user for action
+    action.use_fake_user = True
+
+    return action
+
+
+def tag_baked_action(action: Action, rig_fingerprint: str, mapping_fingerprint: str):
+    # store fingerprint to find reusable bake later
+    action["renim_rig_fingerprint"] = rig_fingerprint
+    action["renim_mapping_fingerprint"] = mapping_fingerprint
+
+
+def find_baked_action(rig_fingerprint: str, mapping_fingerprint: str):
+    for action in bpy.data.actions:
+        if action.get("renim_rig_fingerprint") == rig_fingerprint and action.get("renim_mapping_fingerprint") == mapping_fingerprint:
+            return action
+    return None
+
+
+def assign_baked_action(target_object: Object, action: Action, reuse_mode: str):
+    # LINK share the same action, COPY assign duplicate action
+    if reuse_mode == "COPY":
+        action = action.copy()
+        action.use_fake_user = True
+
+    if target_object.animation_data is None:
+        target_object.animation_data_create()
+    target_object.animation_data.action = action
+
+    return action
@@ -0,0 +1,116 @@
+import json
+import struct
+import numpy as np
+from . array_math import quat_continuity
+
+# compact baked animation file
+# header | magic, version (uint32), header json length (uint32), header json (bone names, channels, fps)
+# chunks | frame count (uint32), frames float32 (n), transforms float32 (n, bones, 10)
+BAKE_FILE_MAGIC = b"RENIMBK\0"
+BAKE_FILE_VERSION = 1
+BAKE_FILE_EXTENSION = ".renimbake"
+BAKE_FILE_CHANNELS = ["location_x", "location_y", "location_z", "rotation_w", "rotation_x",
+                      "rotation_y", "rotation_z", "scale_x", "scale_y", "scale_z"]
+
+# sampled frames kept in memory before written to file
+BAKE_FILE_CHUNK_FRAMES = 1024
+
+IDENTITY_TRANSFORM = np.array(
+    [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0], dtype=np.float32)
+
+
+class ReNimBakeFileWriter:
+    '''Stream baked local transforms chunk by chunk to file, no action is created'''
+
+    def __init__(self, filepath: str, bone_names: list, fps: float):
+        self.filepath = filepath
+        self.bone_names = list(bone_names)
+        self.frame_count = 0
+        # last quaternion per bone, keep hemisphere continuous across chunk
+        self.last_rotations = {}
+
+        self.file = open(filepath, "wb")
+        header = json.dumps({
+            "bones": self.bone_names,
+            "channels": BAKE_FILE_CHANNELS,
+            "fps": fps,
+        }, separators=(",", ":")).encode("utf-8")
+        self.file.write(BAKE_FILE_MAGIC)
+        self.file.write(struct.pack("<II", BAKE_FILE_VERSION, len(header)))
+        self.file.write(header)
+
+    def write_chunk(self, frames, transforms: dict):
+        # transforms is dict bone name -> (location, quaternion, scale) arrays (frames, size), missing bone is rest
+        count = len(frames)
+        if not count:
+            return
+
+        data = np.empty((count, len(self.bone_names), len(BAKE_FILE_CHANNELS)), dtype=np.float32)
+        data[:] = IDENTITY_TRANSFORM
+        for index, bone_name in enumerate(self.bone_names):
+            if bone_name not in transforms:
+                continue
+            location, rotation, scale = transforms[bone_name]
+
+            last_rotation = self.last_rotations.get(bone_name)
+            if last_rotation is not None:
+                rotation = quat_continuity(np.concatenate([[last_rotation], rotation]))[1:]
+            else:
+                rotation = quat_continuity(rotation)
+            self.last_rotations[bone_name] = rotation[-1]
+
+            data[:, index, 0:3] = location
+            data[:, index, 3:7] = rotation
+            data[:, index, 7:10] = scale
+
+        self.file.write(struct.pack("<I", count))
+        self.file.write(np.asarray(frames, dtype="<f4").tobytes())
+        self.file.write(data.astype("<f4").tobytes())
+        self.frame_count += count
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_exact(file, size: int):
+    raw = file.read(size)
+    if len(raw) != size:
+        raise ValueError("Truncated Bake File")
+    return raw
+
+
+def read_bake_file(filepath: str):
+    # tuple (header dict, frames (frames), transforms (frames, bones, 10))
+    with open(filepath, "rb") as file:
+        if file.read(len(BAKE_FILE_MAGIC)) != BAKE_FILE_MAGIC:
+            raise ValueError("Invalid Bake File")
+        version, header_length = struct.unpack("<II", read_exact(file, 8))
+        if version != BAKE_FILE_VERSION:
+            raise ValueError("Unsupported Bake File Version {}".format(version))
+        header = json.loads(read_exact(file, header_length).decode("utf-8"))
+
+        bone_count = len(header["bones"])
+        channel_count = len(header["channels"])
+        frames = []
+        chunks = []
+        while True:
+            raw = file.read(4)
+            if not raw:
+                break
+            # writer stopped in the middle of chunk
+            if len(raw) < 4:
+                raise ValueError("Truncated Bake File")
+            count, = struct.unpack("<I", raw)
+            frames.append(np.frombuffer(read_exact(file, count * 4), dtype="<f4"))
+            chunks.append(np.frombuffer(read_exact(file, count * bone_count * channel_count * 4),
+                                        dtype="<f4").reshape(count, bone_count, channel_count))
+
+    if not chunks:
+        return header, np.zeros(0, dtype=np.float32), np.zeros((0, bone_count, channel_count), dtype=np.float32)
+    return header, np.concatenate(frames), np.concatenate(chunks)
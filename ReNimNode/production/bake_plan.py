@@ -0,0 +1,18 @@
+# bake all planning without bpy, which object node share the scene sweep and which frames each samples
+
+
+def is_shared_sweep_node(node_source_target) -> bool:
+    # frame step bake of bind constraints to action share one scene sweep, reuse is checked before sweep
+    return not node_source_target.is_array_bake() and node_source_target.bake_output == "ACTION" and \
+        node_source_target.sample_mode == "STEP"
+
+
+def node_frames(node_source_target) -> set:
+    return set(range(node_source_target.start_frame, node_source_target.end_frame + 1, node_source_target.frame_step))
+
+
+def sweep_frames(frame_sets: list):
+    # yield tuple (frame, job indices) over union of all frame sets, scene is evaluated once per yielded frame
+    # job with empty frame set (fully reused bake) is never sampled
+    for frame in sorted(set().union(*frame_sets)):
+        yield frame, [index for index, job_frames in enumerate(frame_sets) if frame in job_frames]
@@ -0,0 +1,52 @@
+# bone chain of chain node without bpy, bones only need get, parent and children like blender bone collections
+
+
+def resolve_chain(bones, bone_start: str, bone_end: str):
+    # list of bone from start to end, without end follow single child until branch
+    start = bones.get(bone_start)
+    if not start:
+        return []
+
+    if not bone_end:
+        chain = [start]
+        while len(chain[-1].children) == 1:
+            chain.append(chain[-1].children[0])
+        return chain
+
+    end = bones.get(bone_end)
+    chain = []
+    while end:
+        chain.append(end)
+        if end == start:
+            return list(reversed(chain))
+        end = end.parent
+
+    # end bone is not descendant of start bone
+    return []
+
+
+def chain_weights(target_lengths: list, source_lengths: list):
+    # weights[target index][source index], share of source bone rotation for target bone
+    # base on overlap of normalized length along chain, every source bone weights sum to 1
+    def spans(lengths):
+        total = sum(lengths) or 1.0
+        result = []
+        walked = 0.0
+        for length in lengths:
+            result.append((walked / total, (walked + length) / total))
+            walked += length
+        return result
+
+    target_spans = spans(target_lengths)
+    source_spans = spans(source_lengths)
+
+    weights = []
+    for target_start, target_end in target_spans:
+        row = []
+        for source_start, source_end in source_spans:
+            overlap = max(0.0, min(target_end, source_end) -
+                          max(target_start, source_start))
+            source_size = source_end - source_start
+            row.append(overlap / source_size if source_size > 0 else 0.0)
+        weights.append(row)
+    return weights
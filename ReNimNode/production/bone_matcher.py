@@ -0,0 +1,231 @@
+import math
+import re
+from collections import defaultdict
+
+# leading tokens from exporter or rig naming convention, not part of bone name
+PREFIX_TOKENS = {
+    "mixamorig", "def", "org", "mch", "bip", "biped", "valvebiped", "cc", "base", "j", "armature", "rig", "skeleton",
+}
+
+# side tokens, unify L / R / Left / Right / .L / _l
+SIDE_TOKENS = {
+    "l": "L",
+    "left": "L",
+    "lft": "L",
+    "r": "R",
+    "right": "R",
+    "rgt": "R",
+}
+
+# two tokens which mean one bone part
+COMPOUND_TOKENS = {
+    ("up", "leg"): "thigh",
+    ("upper", "leg"): "thigh",
+    ("lower", "leg"): "calf",
+    ("up", "arm"): "upperarm",
+    ("upper", "arm"): "upperarm",
+    ("fore", "arm"): "forearm",
+    ("lower", "arm"): "forearm",
+    ("toe", "base"): "toe",
+    ("upper", "chest"): "chest",
+    ("collar", "bone"): "clavicle",
+}
+
+# synonym to canonical token
+SYNONYM_TOKENS = {
+    "hips": "pelvis",
+    "hip": "pelvis",
+    "pelvis": "pelvis",
+    "upleg": "thigh",
+    "upperleg": "thigh",
+    "thigh": "thigh",
+    "femur": "thigh",
+    "leg": "calf",
+    "lowerleg": "calf",
+    "calf": "calf",
+    "shin": "calf",
+    "knee": "calf",
+    "foot": "foot",
+    "ankle": "foot",
+    "toe": "toe",
+    "toes": "toe",
+    "toebase": "toe",
+    "ball": "toe",
+    "shoulder": "clavicle",
+    "clavicle": "clavicle",
+    "collar": "clavicle",
+    "arm": "upperarm",
+    "uparm": "upperarm",
+    "upperarm": "upperarm",
+    "forearm": "forearm",
+    "lowerarm": "forearm",
+    "elbow": "forearm",
+    "hand": "hand",
+    "wrist": "hand",
+    "spine": "spine",
+    "back": "spine",
+    "torso": "spine",
+    "chest": "chest",
+    "upperchest": "chest",
+    "neck": "neck",
+    "head": "head",
+    "thumb": "thumb",
+    "pollex": "thumb",
+    "index": "index",
+    "pointer": "index",
+    "middle": "middle",
+    "mid": "middle",
+    "ring": "ring",
+    "pinky": "pinky",
+    "pinkie": "pinky",
+    "little": "pinky",
+    "small": "pinky",
+}
+
+# finger tokens, "hand" and "finger" are redundant on finger bone (LeftHandIndex1, finger_index_01_l)
+FINGER_TOKENS = {"thumb", "index", "middle", "ring", "pinky"}
+FILLER_TOKENS = {"finger", "fingers", "bone", "jnt", "joint"}
+
+# maximal candidate per bone in fuzzy match
+CANDIDATE_LIMIT = 5
+
+SPLIT_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def split_bone_name(name: str):
+    # strip namespace (mixamorig:Hips, Armature|Hips) then split on separator, case and digits
+    name = re.split(r"[:|]", name)[-1]
+    return [token.lower() for part in re.split(r"[^A-Za-z0-9]+", name) for token in SPLIT_PATTERN.findall(part)]
+
+
+def normalize_bone_name(name: str):
+    # return tuple (side, canonical tokens, numbers)
+    tokens = split_bone_name(name)
+
+    # remove exporter prefix and number attached to it (Bip01, bip001)
+    while len(tokens) > 1 and tokens[0] in PREFIX_TOKENS:
+        tokens.pop(0)
+        while len(tokens) > 1 and tokens[0].isdigit():
+            tokens.pop(0)
+
+    side = ""
+    numbers = []
+    words = []
+    for token in tokens:
+        if token in SIDE_TOKENS:
+            side = SIDE_TOKENS[token]
+        elif token.isdigit():
+            numbers.append(int(token))
+        elif token not in FILLER_TOKENS:
+            words.append(token)
+
+    # merge compound token
+    merged = []
+    index = 0
+    while index < len(words):
+        pair = tuple(words[index:index + 2])
+        if pair in COMPOUND_TOKENS:
+            merged.append(COMPOUND_TOKENS[pair])
+            index += 2
+        else:
+            merged.append(SYNONYM_TOKENS.get(words[index], words[index]))
+            index += 1
+
+    if FINGER_TOKENS.intersection(merged):
+        merged = [token for token in merged if token != "hand"]
+
+    return side, tuple(merged), tuple(numbers)
+
+
+def number_rank_key(numbers):
+    # bone without number come first (Spine, Spine1, Spine2)
+    return numbers if numbers else (-1,)
+
+
+def match_bone_names(target_names: list, source_names: list):
+    # match every target bone to source bone, return list of tuple (target name, source name, confidence)
+    targets = [normalize_bone_name(name) for name in target_names]
+    sources = [normalize_bone_name(name) for name in source_names]
+
+    matches = {}
+    used_sources = set()
+
+    # group index, bones with same side and tokens only differ on number
+    source_groups = defaultdict(list)
+    for index, (side, tokens, _) in enumerate(sources):
+        source_groups[(side, tokens)].append(index)
+    target_groups = defaultdict(list)
+    for index, (side, tokens, _) in enumerate(targets):
+        target_groups[(side, tokens)].append(index)
+
+    for key, target_indices in target_groups.items():
+        source_indices = source_groups.get(key)
+        if not source_indices or not key[1]:
+            continue
+
+        if len(source_indices) == len(target_indices):
+            # same count, align by number order (Spine, Spine1, Spine2 -> spine_01, spine_02, spine_03)
+            target_sorted = sorted(
+                target_indices, key=lambda i: number_rank_key(targets[i][2]))
+            source_sorted = sorted(
+                source_indices, key=lambda i: number_rank_key(sources[i][2]))
+            for target_index, source_index in zip(target_sorted, source_sorted):
+                confidence = 1.0 if targets[target_index][2] == sources[source_index][2] else 0.95
+                matches[target_index] = (source_index, confidence)
+                used_sources.add(source_index)
+        else:
+            # different count, only pair same number
+            source_by_number = {
+                sources[i][2]: i for i in source_indices}
+            for target_index in target_indices:
+                source_index = source_by_number.get(targets[target_index][2])
+                if source_index is not None and source_index not in used_sources:
+                    matches[target_index] = (source_index, 1.0)
+                    used_sources.add(source_index)
+
+    # inverted token index over source bones
+    token_index = defaultdict(list)
+    for index, (_, tokens, _) in enumerate(sources):
+        for token in set(tokens):
+            token_index[token].append(index)
+    idf = {token: math.log(1.0 + len(sources) / len(indices))
+           for token, indices in token_index.items()}
+
+    # fuzzy match for remaining target, only score source sharing token
+    candidates = []
+    for target_index, (side, tokens, numbers) in enumerate(targets):
+        if target_index in matches or not tokens:
+            continue
+
+        target_tokens = set(tokens)
+        scores = []
+        for source_index in {i for token in target_tokens for i in token_index.get(token, [])}:
+            if source_index in used_sources:
+                continue
+
+            source_side, source_tokens, source_numbers = sources[source_index]
+            if source_side != side:
+                continue
+
+            source_tokens = set(source_tokens)
+            shared = sum(idf.get(token, 1.0)
+                         for token in target_tokens & source_tokens)
+            union = sum(idf.get(token, 1.0)
+                        for token in target_tokens | source_tokens)
+            score = shared / union if union else 0.0
+
+            if numbers != source_numbers:
+                score *= 0.85 if not numbers or not source_numbers else 0.7
+
+            scores.append((score, target_index, source_index))
+
+        candidates += sorted(scores, reverse=True)[:CANDIDATE_LIMIT]
+
+    # greedy one to one assignment, best score first
+    for score, target_index, source_index in sorted(candidates, reverse=True):
+        if target_index in matches or source_index in used_sources:
+            continue
+        matches[target_index] = (source_index, score)
+        used_sources.add(source_index)
+
+    return [(target_names[target_index], source_names[source_index], round(confidence, 3)) for target_index, (source_index, confidence) in sorted(matches.items())]
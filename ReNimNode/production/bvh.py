@@ -0,0 +1,203 @@
+import os
+from itertools import islice
+import numpy as np
+from . array_math import euler_to_matrix, matrix_to_quat
+
+# bvh is y up, rotate to blender z up | (x, y, z) -> (x, -z, y)
+AXIS_CONVERSION = np.array([
+    [1.0, 0.0, 0.0],
+    [0.0, 0.0, -1.0],
+    [0.0, 1.0, 0.0],
+])
+
+# frames parsed per chunk, motion is never fully loaded in memory
+BVH_CHUNK_FRAMES = 4096
+
+CHANNEL_AXIS = {"X": 0, "Y": 1, "Z": 2}
+
+
+class BVHJoint:
+    '''Joint of bvh hierarchy'''
+
+    def __init__(self, name: str, parent: int):
+        self.name = name
+        self.parent = parent
+        self.offset = np.zeros(3)
+        self.channels = []
+        # first column of this joint channels in motion line
+        self.column = 0
+        self.end_offset = None
+        self.children = []
+
+
+class BVHMotion:
+    '''Streaming bvh reader, virtual source armature for array retarget'''
+
+    def __init__(self, filepath: str, scale: float = 1.0):
+        self.filepath = filepath
+        self.scale = scale
+        self.joints = []
+        self.frame_count = 0
+        self.frame_time = 0.0
+        self.channel_count = 0
+        # byte position of first motion line
+        self.motion_offset = 0
+
+        self.read_hierarchy()
+        self.joint_index = {joint.name: index for index,
+                            joint in enumerate(self.joints)}
+
+    def read_hierarchy(self):
+        # parse until frame time line, motion data is read later in chunks
+        with open(self.filepath, "r") as file:
+            stack = []
+            is_end_site = False
+            while True:
+                line = file.readline()
+                if not line:
+                    raise ValueError("Invalid BVH, Missing Motion")
+
+                tokens = line.split()
+                if not tokens:
+                    continue
+
+                keyword = tokens[0].upper()
+                if keyword in ["ROOT", "JOINT"]:
+                    joint = BVHJoint(
+                        " ".join(tokens[1:]), stack[-1] if stack else -1)
+                    if stack:
+                        self.joints[stack[-1]].children.append(
+                            len(self.joints))
+                    self.joints.append(joint)
+                    stack.append(len(self.joints) - 1)
+                elif keyword == "END":
+                    is_end_site = True
+                elif keyword == "OFFSET":
+                    offset = np.array([float(x) for x in tokens[1:4]])
+                    if is_end_site:
+                        self.joints[stack[-1]].end_offset = offset
+                    else:
+                        self.joints[stack[-1]].offset = offset
+                elif keyword == "CHANNELS":
+                    joint = self.joints[stack[-1]]
+                    joint.channels = tokens[2:2 + int(tokens[1])]
+                    joint.column = self.channel_count
+                    self.channel_count += len(joint.channels)
+                elif keyword == "}":
+                    if is_end_site:
+                        is_end_site = False
+                    else:
+                        stack.pop()
+                elif keyword == "FRAMES:":
+                    self.frame_count = int(tokens[1])
+                elif keyword == "FRAME" and len(tokens) > 2:
+                    self.frame_time = float(tokens[2])
+                    self.motion_offset = file.tell()
+                    break
+
+        if not self.joints or self.frame_time <= 0.0:
+            raise ValueError("Invalid BVH, Missing Hierarchy Or Frame Time")
+
+    @property
+    def bone_names(self):
+        return [joint.name for joint in self.joints]
+
+    @property
+    def object_scale(self):
+        # act as source object scale, bvh unit to blender unit
+        return np.full(3, self.scale)
+
+    def rest_rotation(self, bone_name: str):
+        # virtual bones keep bvh axes, rest rotation is only the up axis conversion
+        return matrix_to_quat(AXIS_CONVERSION)
+
+    def bone_tuples(self):
+        # tuple list (name, parent name, head, tail) in blender space, for hierarchy matcher
+        heads = []
+        for joint in self.joints:
+            parent_head = heads[joint.parent] if joint.parent >= 0 else np.zeros(3)
+            heads.append(parent_head + joint.offset * self.scale)
+
+        bones = []
+        for index, joint in enumerate(self.joints):
+            if joint.children:
+                tail = heads[joint.children[0]]
+            elif joint.end_offset is not None:
+                tail = heads[index] + joint.end_offset * self.scale
+            else:
+                tail = heads[index] + joint.offset * self.scale
+            bones.append((joint.name, self.joints[joint.parent].name if joint.parent >= 0 else "", tuple(
+                float(x) for x in AXIS_CONVERSION @ heads[index]), tuple(float(x) for x in AXIS_CONVERSION @ tail)))
+        return bones
+
+    def joint_transforms(self, joint: BVHJoint, values):
+        # local (location, quaternion, scale) of joint for motion values (frames, channels)
+        count = len(values)
+        location = np.zeros((count, 3))
+        euler = np.zeros((count, 3))
+        rotation_axes = ""
+        for index, channel in enumerate(joint.channels):
+            column = values[:, joint.column + index]
+            axis = channel[0].upper()
+            if channel[1:].lower() == "position":
+                location[:, CHANNEL_AXIS[axis]] = column
+            else:
+                euler[:, CHANNEL_AXIS[axis]] = np.radians(column)
+                rotation_axes += axis
+
+        # location relative to rest position like imported pose bone
+        if joint.channels and any(channel[1:].lower() == "position" for channel in joint.channels):
+            location -= joint.offset
+
+        # bvh rotate in channel order (R = R1 @ R2 @ R3), blender order apply last axis first
+        rotation_axes += "".join(axis for axis in "XYZ" if axis not in rotation_axes)
+        rotation = matrix_to_quat(euler_to_matrix(euler, rotation_axes[::-1]))
+
+        return location, rotation, np.ones((count, 3))
+
+    def iter_chunks(self, bone_names: list, frame_step: int = 1, chunk_frames: int = BVH_CHUNK_FRAMES):
+        # yield tuple (bvh frame indices, dict bone name -> (location, quaternion, scale)) chunk by chunk
+        joints = [self.joints[self.joint_index[name]]
+                  for name in bone_names if name in self.joint_index]
+
+        with open(self.filepath, "r") as file:
+            file.seek(self.motion_offset)
+            frame = 0
+            # values of frame row wrapped over chunk boundary, completed by next chunk
+            remainder = np.zeros(0)
+            while True:
+                lines = list(islice(file, chunk_frames))
+                if not lines:
+                    break
+
+                values = np.concatenate([remainder, np.fromstring(
+                    "".join(lines), dtype=np.float64, sep=" ")])
+                row_end = len(values) // self.channel_count * self.channel_count
+                remainder = values[row_end:]
+                values = values[:row_end].reshape(-1, self.channel_count)
+                if not len(values):
+                    continue
+
+                # keep step phase across chunk
+                indices = np.arange(frame, frame + len(values))
+                keep = indices % frame_step == 0
+                frame += len(values)
+                if not keep.any():
+                    continue
+
+                values = values[keep]
+                yield indices[keep], {joint.name: self.joint_transforms(joint, values) for joint in joints}
+
+    def scene_frames(self, indices, start_frame: int, fps: float):
+        # bvh frame time to scene frame, whole clip start at start frame
+        return start_frame + indices * self.frame_time * fps
+
+
+def read_bvh_bone_names(filepath: str):
+    # bone names only, for mapping ui
+    if not filepath or not os.path.isfile(filepath):
+        return []
+    try:
+        return BVHMotion(filepath).bone_names
+    except (OSError, ValueError):
+        return []
@@ -1,5 +1,37 @@
+from contextlib import contextmanager
+import bpy
+from bpy.app.handlers import persistent
 from bpy.types import NodeTree
 from bpy.utils import register_class, unregister_class
+from . node_mapping import ReNimNodeMapping, bind_mapping_nodes, unbind_mapping_nodes
+
+# last known links per node tree | dict tree pointer -> dict mapping node name -> object node name
+link_snapshots = {}
+
+# node tree which update is deferred (batch edit or dispatch in progress)
+suspended_trees = set()
+
+
+def mapping_links(node_tree):
+    # current links of mapping nodes | dict mapping node name -> object node name
+    return {link.to_node.name: link.from_node.name for link in node_tree.links
+            if link.is_valid and isinstance(link.to_node, ReNimNodeMapping)}
+
+
+@contextmanager
+def batch_tree_update(node_tree):
+    # defer link dispatch until the end, bind and unbind all changed nodes at once
+    key = node_tree.as_pointer()
+    if key in suspended_trees:
+        yield
+        return
+
+    suspended_trees.add(key)
+    try:
+        yield
+    finally:
+        suspended_trees.discard(key)
+        node_tree.dispatch_link_changes()
 
 
 class ReNimEditorType(NodeTree):
@@ -8,6 +40,70 @@ class ReNimEditorType(NodeTree):
     bl_label = "Retarget Animation Node"
     bl_icon = "NODE_SEL"
 
+    def update(self):
+        # called once per tree change, replace per node link check
+        if self.as_pointer() in suspended_trees:
+            return
+
+        self.dispatch_link_changes()
+
+    def dispatch_link_changes(self):
+        key = self.as_pointer()
+        links = mapping_links(self)
+
+        snapshot = link_snapshots.get(key)
+        if snapshot is None:
+            # first update after load or undo, last link state is stored on node
+            snapshot = {node.name: links[node.name] for node in self.nodes
+                        if isinstance(node, ReNimNodeMapping) and node.old_update and node.name in links}
+
+        link_snapshots[key] = links
+        if links == snapshot:
+            return
+
+        # mapping nodes connected, disconnected or moved to other object node
+        nodes = self.nodes
+        changed_nodes = [nodes[name] for name in set(links) | set(snapshot)
+                         if links.get(name) != snapshot.get(name) and name in nodes]
+
+        # group by target object, removed object node already unbind on free
+        unbind_groups = {}
+        for node in changed_nodes:
+            if node.is_bind:
+                unbind_groups.setdefault(
+                    node.inputs[0].target_object, []).append(node)
+
+        suspended_trees.add(key)
+        try:
+            for target_object, bone_nodes in unbind_groups.items():
+                unbind_mapping_nodes(bpy.context, target_object, bone_nodes)
+
+            # group by object node, only bind to object node which bind
+            bind_groups = {}
+            for node in changed_nodes:
+                node_object = nodes.get(links.get(node.name, ""))
+                if node_object is not None and getattr(node_object, "is_bind", False) and not node.is_bind:
+                    bind_groups.setdefault(node_object.name, []).append(node)
+
+            for node_object_name, bone_nodes in bind_groups.items():
+                nodes[node_object_name].bind_bone_nodes(
+                    bpy.context, bone_nodes)
+
+            # store link state on node for next session
+            for node in changed_nodes:
+                node.old_update = node.name in links
+        finally:
+            suspended_trees.discard(key)
+
+
+@persistent
+def clear_link_snapshots(*args):
+    # tree pointer can be reused after load or undo, next update seed snapshot from node old_update
+    link_snapshots.clear()
+
+
+# handlers which replace node trees in memory
+SNAPSHOT_HANDLERS = ["load_post", "undo_post", "redo_post"]
 
 classes = [
     ReNimEditorType
@@ -18,7 +114,18 @@ def register():
     for x in classes:
         register_class(x)
 
+    for handler_name in SNAPSHOT_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(clear_link_snapshots)
+
 
 def unregister():
+    for handler_name in SNAPSHOT_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if clear_link_snapshots in handlers:
+            handlers.remove(clear_link_snapshots)
+
+    link_snapshots.clear()
+    suspended_trees.clear()
+
     for x in reversed(classes):
         unregister_class(x)
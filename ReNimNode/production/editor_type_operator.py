@@ -2,11 +2,204 @@ import bpy
 from bpy.types import Operator
 from bpy import props
 from bpy.utils import register_class, unregister_class
+from bpy.app.handlers import persistent
 from bpy_extras.io_utils import ExportHelper, ImportHelper
-from mathutils import Vector
-from . node_mapping import ReNimNodeMappingBone
+from . node_mapping import ReNimNodeMapping, ReNimNodeMappingBone, ReNimNodeMappingProperty
+from . editor_type import batch_tree_update
+from . bake import ReNimBakeJob, adaptive_sample_frames, assign_baked_action, fan_out_channels, filter_action_rotations, find_baked_action, new_bake_action, source_key_frames, tag_baked_action, write_action_channels
+from . solver import ReNimArraySolver
+from . world_solver import ReNimWorldSolver
+from . match_pose import apply_pose_rotations, match_pose_rotations, pose_bases
+from . action_cleanup import plan_action_cleanup, purge_actions, tag_bake_metadata
+from . bake_file import BAKE_FILE_CHUNK_FRAMES, ReNimBakeFileWriter
+from . root_motion import apply_root_motion, is_root_motion_parent
+from . property_channels import owner_rig_fingerprint, property_nodes, property_owners, unsampled_channels, write_property_channels
+from . fingerprint import mapping_fingerprint, rig_fingerprint
+from . bone_matcher import match_bone_names
+from . hierarchy_matcher import match_bone_hierarchy
+from . preset import load_preset, merge_preset, save_preset
+from . preset_format import parse_substitutions, read_preset, remap_preset_bones, skip_preset_nodes, validate_preset_bones
+from . preset_library import rank_library_presets, refresh_library_index
+from . source_cache import clear_source_cache, get_source_cache
+from . bake_plan import is_shared_sweep_node, node_frames, sweep_frames
+from . quality import rest_world_rotations, rig_height, sample_world_transforms
+from . quality_math import quality_metrics
+from . preview import clear_previews, get_preview, read_source_transforms, start_preview, stop_all_previews, stop_preview, stop_previews_before_save
+from . preferences import get_preferences, get_source_cache_directory
 import logging
-import json
+import os
+import numpy as np
+
+
+# maximal ranked library preset shown in object node
+LIBRARY_PRESETS_LIMIT = 10
+
+# maximal missing bone names in report
+REPORT_NAMES_LIMIT = 5
+
+INVALID_PRESET_MODES = [
+    ("FLAG", "Flag", "Create mapping with missing bone without connect it and mark it red"),
+    ("SKIP", "Skip", "Do not create mapping with missing bone"),
+    ("KEEP", "Keep", "Create all mapping without check bone")
+]
+
+SAMPLE_MODES = [
+    ("STEP", "Frame Step", "Sample every frame step"),
+    ("ADAPTIVE", "Adaptive", "Sample source key times, add frame only where target deviate from linear interpolation more than tolerance")
+]
+
+AUTO_MAP_METHODS = [
+    ("NAME", "Name", "Match bone by name"),
+    ("HIERARCHY", "Hierarchy", "Match bone by hierarchy structure and rest pose"),
+    ("COMBINED", "Combined", "Match bone by name, then match the rest by hierarchy")
+]
+
+
+def armature_bone_names(armature_object):
+    # bone names without ReNim helper bones
+    return [bone.name for bone in armature_object.data.bones if not bone.collections.get("ReNimHelperBones")]
+
+
+def armature_bone_tuples(armature_object):
+    # tuple list (name, parent name, head, tail) with object rotation, for hierarchy matcher
+    rotation = armature_object.matrix_world.to_3x3()
+    return [(bone.name, bone.parent.name if bone.parent else "", tuple(rotation @ bone.head_local), tuple(rotation @ bone.tail_local))
+            for bone in armature_object.data.bones if not bone.collections.get("ReNimHelperBones")]
+
+
+def get_source_bone_names(node_source_target):
+    # bone names of source armature or virtual source, None when no source
+    if node_source_target.is_virtual_source():
+        return [data.name for data in node_source_target.source_bvh_bones] or None
+
+    source_object = node_source_target.outputs[0].source_object
+    return armature_bone_names(source_object) if source_object else None
+
+
+def get_source_bone_tuples(node_source_target):
+    if node_source_target.is_virtual_source():
+        return node_source_target.get_source_motion().bone_tuples()
+    return armature_bone_tuples(node_source_target.outputs[0].source_object)
+
+
+def report_names(names):
+    names = sorted(names)
+    return ", ".join(names[:REPORT_NAMES_LIMIT]) + (", ..." if len(names) > REPORT_NAMES_LIMIT else "")
+
+
+def check_preset_bones(operator, data: dict, node_source_target, substitutions: str, invalid_mode: str):
+    # remap and check preset bone names with armatures, return tuple (preset data, flagged node names)
+    data = remap_preset_bones(data, parse_substitutions(substitutions))
+
+    socket_node = node_source_target.outputs[0]
+    source_names = get_source_bone_names(node_source_target)
+    if invalid_mode == "KEEP" or not socket_node.target_object or source_names is None:
+        return data, set()
+
+    invalid, missing_target, missing_source = validate_preset_bones(data, armature_bone_names(
+        socket_node.target_object), source_names)
+    if invalid:
+        operator.report({"WARNING"}, "{} Mapping With Missing Bone, Target: {} Source: {}".format(
+            len(invalid), report_names(missing_target) or "-", report_names(missing_source) or "-"))
+
+    if invalid_mode == "SKIP":
+        return skip_preset_nodes(data, invalid), set()
+    return data, invalid
+
+
+def mapped_target_bones(node_source_target):
+    # target bone names baked by linked mapping nodes and additional bones
+    target_object = node_source_target.outputs[0].target_object
+    names = {bone_group.bone_name for bone_group in node_source_target.additional_bone_to_bake}
+    for link in node_source_target.outputs[0].links:
+        if isinstance(link.to_node, ReNimNodeMapping):
+            names.update(bone_name for bone_name, *
+                         _ in link.to_node.bake_bones(target_object))
+    return names
+
+
+def tag_property_actions(property_actions, node_source_target, target_rig_fingerprint: str, bake_mapping_fingerprint: str):
+    # actions of other owners are reused and cleaned up with target bake
+    for animated_id, action in property_actions:
+        tag_baked_action(action, owner_rig_fingerprint(
+            target_rig_fingerprint, animated_id), bake_mapping_fingerprint)
+        tag_bake_metadata(action, node_source_target)
+
+
+def reuse_property_actions(node_source_target, target_rig_fingerprint: str, bake_mapping_fingerprint: str, bake_reuse: str):
+    # reused target bake bring back actions of other owners
+    for animated_id in property_owners(node_source_target):
+        action = find_baked_action(owner_rig_fingerprint(
+            target_rig_fingerprint, animated_id), bake_mapping_fingerprint)
+        if action:
+            assign_baked_action(animated_id, action, bake_reuse)
+
+
+def copy_reused_action(action, action_name: str, node_source_target):
+    # independent copy under the requested name, like a new bake
+    action = action.copy()
+    action.name = action_name
+    action.use_fake_user = True
+    tag_bake_metadata(action, node_source_target)
+    return action
+
+
+def find_bake_targets(node_source_target, bake_mapping_fingerprint: str, rig_fingerprint_cache: dict):
+    # tuple list (target object, rig fingerprint, baked action), baked action is None when reuse is off or not found
+    bake_reuse = node_source_target.bake_reuse
+    bake_targets = []
+    for obj in [node_source_target.outputs[0].target_object] + node_source_target.get_crowd_targets():
+        obj_rig_fingerprint = rig_fingerprint(obj, rig_fingerprint_cache)
+        baked_action = find_baked_action(
+            obj_rig_fingerprint, bake_mapping_fingerprint) if bake_reuse != "NONE" else None
+        bake_targets.append((obj, obj_rig_fingerprint, baked_action))
+    return bake_targets
+
+
+def write_bake_targets(node_source_target, bake_targets: list, bake_mapping_fingerprint: str, action_name: str, write_target, write_crowd):
+    # reuse or write actions of target and crowd targets, return tuple (target action, reused action name, skipped bakes)
+    # write_target(action) fill new target action and return property actions of other owners
+    # write_crowd(action, crowd target) fill new crowd action
+    bake_reuse = node_source_target.bake_reuse
+    skipped_bakes = 0
+
+    _, target_rig_fingerprint, action = bake_targets[0]
+    reused_action_name = action.name if action else ""
+    if action:
+        skipped_bakes += 1
+        if bake_reuse == "COPY":
+            action = copy_reused_action(
+                action, action_name, node_source_target)
+        reuse_property_actions(
+            node_source_target, target_rig_fingerprint, bake_mapping_fingerprint, bake_reuse)
+    else:
+        action = new_bake_action(action_name)
+        tag_property_actions(write_target(
+            action), node_source_target, target_rig_fingerprint, bake_mapping_fingerprint)
+        tag_baked_action(action, target_rig_fingerprint,
+                         bake_mapping_fingerprint)
+        tag_bake_metadata(action, node_source_target)
+
+    for crowd_target, crowd_rig_fingerprint, crowd_action in bake_targets[1:]:
+        # identical rig with target object receive the same bake
+        if not crowd_action and bake_reuse != "NONE" and crowd_rig_fingerprint == target_rig_fingerprint:
+            crowd_action = action
+
+        if crowd_action:
+            assign_baked_action(crowd_target, crowd_action, bake_reuse)
+            skipped_bakes += 1
+            continue
+
+        crowd_action = new_bake_action(action_name + "_" + crowd_target.name)
+        write_crowd(crowd_action, crowd_target)
+        tag_baked_action(
+            crowd_action, crowd_rig_fingerprint, bake_mapping_fingerprint)
+        tag_bake_metadata(crowd_action, node_source_target)
+
+        # crowd target not bind, assign action directly
+        assign_baked_action(crowd_target, crowd_action, "LINK")
+
+    return action, reused_action_name, skipped_bakes
 
 
 class ReNimOperator:
@@ -66,23 +259,78 @@ class ReNimOperatorConnectSelectedBoneNodes(ReNimOperator, Operator):
 
         # filter selected nodes
         bone_nodes = [
-            node for node in context.selected_nodes if isinstance(node, ReNimNodeMappingBone)]
+            node for node in context.selected_nodes if isinstance(node, (ReNimNodeMapping, ReNimNodeMappingProperty))]
 
-        # link bone node to object
-        for bone_node in bone_nodes:
-            links.new(node_source_target.outputs[0], bone_node.inputs[0])
+        # link bone node to object, bind all of them in one batch
+        with batch_tree_update(node_group):
+            for bone_node in bone_nodes:
+                links.new(node_source_target.outputs[0], bone_node.inputs[0])
 
         return {"FINISHED"}
 
 
+class ReNimOperatorSetCompactBoneNodes(ReNimOperator, Operator):
+    """Switch bone nodes connected to object node between compact and full layout"""
+    bl_idname = "renim.set_compact_bone_nodes"
+    bl_label = "Compact Bone Nodes"
+
+    compact: props.BoolProperty(default=True)  # type: ignore
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        for link in node_source_target.outputs[0].links:
+            if isinstance(link.to_node, ReNimNodeMapping):
+                link.to_node.compact = self.compact
+
+        return {"FINISHED"}
+
+
+# selected pose bones cache, poll run on every redraw of every object node
+# invalidated by depsgraph update which also happen on selection change
+selection_cache = {
+    "generation": 0,
+    "key": None,
+    "bones": {},
+}
+
+
+@persistent
+def invalidate_selection_cache(scene, depsgraph):
+    selection_cache["generation"] += 1
+
+
+def selected_bones_by_armature(context):
+    # dict armature object name -> list of selected bone names
+    key = (selection_cache["generation"], context.mode)
+    if selection_cache["key"] != key:
+        bones = {}
+        for pose_bone in context.selected_pose_bones or []:
+            bones.setdefault(pose_bone.id_data.name, []).append(pose_bone.name)
+        selection_cache["key"] = key
+        selection_cache["bones"] = bones
+    return selection_cache["bones"]
+
+
 class ReNimOperatorCreateBoneNodeFromSelectedBones(ReNimOperator, Operator):
-    """Create bone node from selected bones"""
+    """Create bone nodes from selected bones, select the same number of bones on target and source"""
     bl_idname = "renim.create_bone_node_from_selected_bones"
     bl_label = "Create Bone Node From Selected Bones"
 
     @classmethod
     def poll(cls, context):
-        return context.space_data.type == "NODE_EDITOR" and context.space_data.tree_type == "ReNimNode" and context.mode == "POSE" and (bool(context.selected_pose_bones) and len(context.selected_pose_bones) == 2 and len(list(set([pose_bone.id_data for pose_bone in context.selected_pose_bones]))) == 2)
+        if not (context.space_data.type == "NODE_EDITOR" and context.space_data.tree_type == "ReNimNode" and context.mode == "POSE"):  # type: ignore
+            return False
+
+        # two armatures with same number of selected bones
+        bones = selected_bones_by_armature(context)
+        return len(bones) == 2 and len({len(names) for names in bones.values()}) == 1
 
     def execute(self, context):
         node_tree_name = self.node_tree_name
@@ -93,38 +341,201 @@ class ReNimOperatorCreateBoneNodeFromSelectedBones(ReNimOperator, Operator):
 
         node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
 
-        # node group
-        node_group = node_source_target.id_data
-
-        # links
-        links = node_group.links
-
         # target and source object
         target_object = node_source_target.outputs[0].target_object
         source_object = node_source_target.outputs[0].source_object
 
-        # crate bone node
-        bone_node = node_group.nodes.new("ReNimNodeMappingBone")
+        # selected bones by armature, same order as selected_pose_bones
+        selected_bones = selected_bones_by_armature(context)
+        armature_names = list(selected_bones.keys())
+
+        # fallback to armature which is not source, then selection order if object node not filled
+        if target_object and target_object.name in selected_bones:
+            target_name = target_object.name
+        elif source_object and source_object.name in selected_bones:
+            target_name = next(
+                name for name in armature_names if name != source_object.name)
+        else:
+            target_name = armature_names[1]
+        source_name = source_object.name if source_object and source_object.name in selected_bones else next(
+            name for name in armature_names if name != target_name)
+
+        target_bone_names = selected_bones[target_name]
+        source_bone_names = selected_bones[source_name]
+
+        if len(target_bone_names) == 1:
+            pairs = [(target_bone_names[0], source_bone_names[0])]
+        else:
+            # pair many selected bones by name, the rest by armature bone order
+            pairs = [(bone_target, bone_source) for bone_target, bone_source,
+                     _ in match_bone_names(target_bone_names, source_bone_names)]
+            paired_targets = {bone_target for bone_target, _ in pairs}
+            paired_sources = {bone_source for _, bone_source in pairs}
+
+            target_bones = bpy.data.objects[target_name].data.bones
+            source_bones = bpy.data.objects[source_name].data.bones
+            remaining_targets = sorted([name for name in target_bone_names if name not in paired_targets],
+                                       key=lambda name: target_bones.find(name))
+            remaining_sources = sorted([name for name in source_bone_names if name not in paired_sources],
+                                       key=lambda name: source_bones.find(name))
+            pairs += list(zip(remaining_targets, remaining_sources))
+
+        node_source_target.new_bone_nodes(context, pairs)
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorAutoMapBones(ReNimOperator, Operator):
+    """Create bone nodes from matching bone names or hierarchy of target and source armature"""
+    bl_idname = "renim.auto_map_bones"
+    bl_label = "Auto Map Bones"
+
+    threshold: props.FloatProperty(  # type: ignore
+        default=0.75,
+        min=0.0,
+        max=1.0,
+        subtype="FACTOR"
+    )
+    skip_mapped: props.BoolProperty(default=True)  # type: ignore
+    method: props.EnumProperty(  # type: ignore
+        name="Method",
+        items=AUTO_MAP_METHODS,
+        default="NAME"
+    )
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if hasattr(node_source_target, "auto_map_review"):
+            # get output socket node
+            socket_node = node_source_target.outputs[0]
+
+            # target and source object
+            target_object = socket_node.target_object
+            source_names = get_source_bone_names(node_source_target)
+
+            if not target_object or source_names is None:
+                self.report({"ERROR"}, "Target And Source Object Required")
+                return {"CANCELLED"}
+
+            bone_nodes = [link.to_node for link in socket_node.links if isinstance(
+                link.to_node, ReNimNodeMappingBone)]
+
+            # existing bone nodes as fixed pairs for hierarchy matcher
+            anchors = {node.bone_target: node.bone_source for node in bone_nodes if node.bone_target and node.bone_source}
+            mapped_targets = {node.bone_target for node in bone_nodes}
+
+            target_bone_names = armature_bone_names(target_object)
+            source_bone_names = source_names
+
+            # skip bones already have bone node from name matching
+            if self.skip_mapped:
+                mapped_sources = {node.bone_source for node in bone_nodes}
+                target_bone_names = [
+                    name for name in target_bone_names if name not in mapped_targets]
+                source_bone_names = [
+                    name for name in source_bone_names if name not in mapped_sources]
+
+            matches = []
+            if self.method in ["NAME", "COMBINED"]:
+                matches = match_bone_names(
+                    target_bone_names, source_bone_names)
+
+            if self.method in ["HIERARCHY", "COMBINED"]:
+                # confident name matches become anchors for structure alignment
+                matches = [match for match in matches if match[2]
+                           >= self.threshold]
+                anchors.update({bone_target: bone_source for bone_target,
+                               bone_source, _ in matches})
+                matches += match_bone_hierarchy(armature_bone_tuples(
+                    target_object), get_source_bone_tuples(node_source_target), anchors)
+
+            # target bone which already has bone node never get a second one
+            matches = [match for match in matches if match[0]
+                       not in mapped_targets]
+
+            # low confidence pairs go to review list instead create node
+            node_source_target.auto_map_review.clear()
+            for bone_target, bone_source, confidence in matches:
+                if confidence < self.threshold:
+                    data = node_source_target.auto_map_review.add()
+                    data.bone_target = bone_target
+                    data.bone_source = bone_source
+                    data.confidence = confidence
+
+            bone_nodes = node_source_target.new_bone_nodes(context, [(bone_target, bone_source)
+                                                                     for bone_target, bone_source, confidence in matches if confidence >= self.threshold])
+
+            self.report({"INFO"}, "Auto Map {} Bones, {} To Review".format(
+                len(bone_nodes), len(node_source_target.auto_map_review)))
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorAcceptAutoMapReview(ReNimOperator, Operator):
+    """Create bone node from reviewed bone pair, all pairs if index is -1"""
+    bl_idname = "renim.accept_auto_map_review"
+    bl_label = "Accept Bone Pair"
+
+    index: props.IntProperty(default=-1)  # type: ignore
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+        index = self.index
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if hasattr(node_source_target, "auto_map_review"):
+            review = node_source_target.auto_map_review
+            indices = list(range(len(review))) if index < 0 else [index]
+
+            node_source_target.new_bone_nodes(
+                context, [(review[i].bone_target, review[i].bone_source) for i in indices])
+
+            for i in reversed(indices):
+                review.remove(i)
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+
+        return {"FINISHED"}
 
-        # set location
-        bone_node.location = Vector(
-            (node_source_target.width + 100, 0)) + node_source_target.location
 
-        # create tuple list pose bone for selected_pose_bones (object , bone name)
-        selected_pose_bones = [(pose_bone.id_data, pose_bone.name)
-                               for pose_bone in context.selected_pose_bones]
+class ReNimOperatorRemoveAutoMapReview(ReNimOperator, Operator):
+    """Remove bone pair from review list, all pairs if index is -1"""
+    bl_idname = "renim.remove_auto_map_review"
+    bl_label = "Reject Bone Pair"
 
-        # set bone from pose bone to node
-        bone_node.bone_target = next(iter([pose_bone_name for pose_bone_object, pose_bone_name in selected_pose_bones if pose_bone_object ==
-                                           target_object]), context.selected_pose_bones[1].name) if target_object else context.selected_pose_bones[1].name  # type: ignore
-        bone_node.bone_source = next(iter([pose_bone_name for pose_bone_object, pose_bone_name in selected_pose_bones if pose_bone_object ==
-                                           source_object]), context.selected_pose_bones[0].name) if source_object else context.selected_pose_bones[0].name  # type: ignore
+    index: props.IntProperty(default=-1)  # type: ignore
 
-        # unselect bone node
-        bone_node.select = False
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+        index = self.index
 
-        # link node socket to bone node socket
-        links.new(node_source_target.outputs[0], bone_node.inputs[0])
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if hasattr(node_source_target, "auto_map_review"):
+            if index < 0:
+                node_source_target.auto_map_review.clear()
+            else:
+                node_source_target.auto_map_review.remove(index)
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
 
         return {"FINISHED"}
 
@@ -137,11 +548,36 @@ class ReNimOperatorLoadPreset(ReNimOperator, Operator, ImportHelper):  # type: i
     filename_ext = ".json"
 
     filter_glob: props.StringProperty(  # type: ignore
-        default="*.json",
+        default="*.json;*.json.gz",
         options={"HIDDEN"},
         maxlen=255
     )
 
+    merge: props.BoolProperty(  # type: ignore
+        name="Merge",
+        description="Update existing mapping nodes with the same target and source bone, only add missing mapping",
+        default=False
+    )
+
+    remove_stale: props.BoolProperty(  # type: ignore
+        name="Remove Stale",
+        description="Remove mapping nodes which are not in preset when merge",
+        default=False
+    )
+
+    substitutions: props.StringProperty(  # type: ignore
+        name="Substitutions",
+        description="Rename preset bones before load, comma separated old:new pairs (mixamorig:mixamorig1, _L:.L)",
+        default=""
+    )
+
+    invalid_mode: props.EnumProperty(  # type: ignore
+        name="Missing Bone",
+        description="What to do with mapping which bone not exist on target or source armature",
+        items=INVALID_PRESET_MODES,
+        default="FLAG"
+    )
+
     def execute(self, context):
         node_tree_name = self.node_tree_name
         node_name = self.node_source_target_name
@@ -153,64 +589,23 @@ class ReNimOperatorLoadPreset(ReNimOperator, Operator, ImportHelper):  # type: i
 
         node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
         if hasattr(node_source_target, "additional_bone_to_bake"):
-            # node group
-            node_group = node_source_target.id_data
-
-            # load the file
-            file = open(filepath, "r")
-            data_nodes = json.loads(file.read())
-            file.close()
-
-            for node_name, node_data in data_nodes["nodes"].items():
-                # crate bone node
-                node = node_group.nodes.new(node_data["type"])
-
-                # set node to nodes data
-                data_nodes["nodes"][node_name]["node"] = node
-
-                # set label
-                node.label = node_data["label"]
-
-                # set width, height, and hide
-                node.width = node_data["width"]
-                node.height = node_data["height"]
-                node.hide = node_data["hide"]
-
-                # set location
-                node.location = Vector(
-                    node_data["location"]) + node_source_target.location
-
-                # set parent
-                node.parent = data_nodes["nodes"][node_data["parent"]
-                                                  ]["node"] if node_data["parent"] else None
-
-                # unselect bone node
-                node.select = False
-
-                if node_data["type"] == "ReNimNodeMappingBone":
-                    node.bone_target = node_data["bone_target"]
-                    node.bone_source = node_data["bone_source"]
-
-                    node.use_location = node_data["use_location"]
-                    node.location_axis = node_data["location_axis"]
-                    node.location_influence = node_data["location_influence"]
-                    node.location_multiply = node_data["location_multiply"]
-                    node.location_offset = node_data["location_offset"]
-
-                    node.use_rotation_euler = node_data["use_rotation_euler"]
-                    node.rotation_euler_axis = node_data["rotation_euler_axis"]
-                    node.rotation_euler_influence = node_data["rotation_euler_influence"]
-                    node.rotation_euler_multiply = node_data["rotation_euler_multiply"]
-                    node.rotation_euler_offset = node_data["rotation_euler_offset"]
-
-                    node.use_scale = node_data["use_scale"]
-                    node.scale_axis = node_data["scale_axis"]
-                    node.scale_influence = node_data["scale_influence"]
-                    node.scale_multiply = node_data["scale_multiply"]
-                    node.scale_offset = node_data["scale_offset"]
-                    node.mix_mode = node_data["mix_mode"]
-
-            self.report({"INFO"}, "Load Preset Success")
+            try:
+                data = read_preset(filepath)
+            except (OSError, ValueError) as error:
+                self.report({"ERROR"}, str(error))
+                return {"CANCELLED"}
+
+            data, flagged = check_preset_bones(
+                self, data, node_source_target, self.substitutions, self.invalid_mode)
+
+            if self.merge:
+                updated, added, removed = merge_preset(
+                    context, data, node_source_target, self.remove_stale, flagged)
+                self.report({"INFO"}, "Merge Preset Success, {} Updated, {} Added, {} Removed".format(
+                    updated, added, removed))
+            else:
+                load_preset(data, node_source_target, flagged)
+                self.report({"INFO"}, "Load Preset Success")
         else:
             self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
 
@@ -225,11 +620,17 @@ class ReNimOperatorSavePreset(ReNimOperator, Operator, ExportHelper):  # type: i
     filename_ext = ".json"
 
     filter_glob: props.StringProperty(  # type: ignore
-        default="*.json",
+        default="*.json;*.json.gz",
         options={"HIDDEN"},
         maxlen=255
     )
 
+    compress: props.BoolProperty(  # type: ignore
+        name="Compress",
+        description="Write preset with gzip compression",
+        default=False
+    )
+
     def execute(self, context):
         node_tree_name = self.node_tree_name
         node_name = self.node_source_target_name
@@ -241,53 +642,14 @@ class ReNimOperatorSavePreset(ReNimOperator, Operator, ExportHelper):  # type: i
 
         node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
 
+        # extension follow compression, gzip never written under plain .json name
+        if filepath.endswith(".json.gz"):
+            filepath = filepath[:-len(".gz")]
+        if self.compress:
+            filepath = bpy.path.ensure_ext(filepath, ".json") + ".gz"
+
         if hasattr(node_source_target, "additional_bone_to_bake"):
-            # node group
-            node_group = node_source_target.id_data
-            # get bone node and frame from node group
-            nodes = [node for node in node_group.nodes if node.type ==
-                     "FRAME" or isinstance(node, ReNimNodeMappingBone)]
-            # nodes = [node for node in node_group.nodes if isinstance(node, ReNimNodeMappingBone)]
-            data_to_save = {
-                "version": [0, 0, 1],
-                "nodes": {}
-            }
-
-            for node in nodes:
-                location = list((node.location + node.parent.location) - node_source_target.location) if node.parent else list(  # type: ignore
-                    node.location - node_source_target.location)  # type: ignore
-                data_to_save["nodes"][node.name] = {
-                    "type": "NodeFrame" if node.type == "FRAME" else "ReNimNodeMappingBone",
-                    "label": node.label,
-                    "location": location,
-                    "width": node.width,
-                    "height": node.height,
-                    "hide": node.hide,
-                    "parent": node.parent.name if node.parent else None,
-                    "bone_target": getattr(node, "bone_target", ""),
-                    "bone_source": getattr(node, "bone_source", ""),
-                    "use_location": getattr(node, "use_location", None),
-                    "location_axis": list(getattr(node, "location_axis", "")),
-                    "location_influence": list(getattr(node, "location_influence", "")),
-                    "location_multiply": list(getattr(node, "location_multiply", "")),
-                    "location_offset": list(getattr(node, "location_offset", "")),
-                    "use_rotation_euler": getattr(node, "use_rotation_euler", None),
-                    "rotation_euler_axis": list(getattr(node, "rotation_euler_axis", "")),
-                    "rotation_euler_influence": list(getattr(node, "rotation_euler_influence", "")),
-                    "rotation_euler_multiply": list(getattr(node, "rotation_euler_multiply", "")),
-                    "rotation_euler_offset": list(getattr(node, "rotation_euler_offset", "")),
-                    "use_scale": getattr(node, "use_scale", None),
-                    "scale_axis": list(getattr(node, "scale_axis", "")),
-                    "scale_influence": list(getattr(node, "scale_influence", "")),
-                    "scale_multiply": list(getattr(node, "scale_multiply", "")),
-                    "scale_offset": list(getattr(node, "scale_offset", "")),
-                    "mix_mode": getattr(node, "mix_mode", ""),
-                }
-
-            # save to the file
-            file = open(filepath, "w+")
-            file.write(json.dumps(data_to_save, indent=4))
-            file.close()
+            save_preset(filepath, node_source_target, self.compress)
 
             self.report({"INFO"}, "Save Preset Success")
         else:
@@ -296,6 +658,92 @@ class ReNimOperatorSavePreset(ReNimOperator, Operator, ExportHelper):  # type: i
         return {"FINISHED"}
 
 
+def find_library_presets(context, node_source_target):
+    # rank preset library for object node armatures, return list of tuple (file path, name, coverage, matched bones)
+    directory = bpy.path.abspath(get_preferences(context).preset_library)
+    if not directory or not os.path.isdir(directory):
+        raise ValueError("Preset Library Directory Not Found")
+
+    socket_node = node_source_target.outputs[0]
+    source_names = get_source_bone_names(node_source_target)
+    if not socket_node.target_object or source_names is None:
+        raise ValueError("Target And Source Object Required")
+
+    entries = refresh_library_index(directory)
+    ranks = rank_library_presets(entries, armature_bone_names(
+        socket_node.target_object), source_names)
+
+    return [(os.path.join(directory, path), path, coverage, matched) for path, coverage, matched in ranks[:LIBRARY_PRESETS_LIMIT]]
+
+
+class ReNimOperatorFindLibraryPresets(ReNimOperator, Operator):
+    """Find preset in preset library for target and source armature"""
+    bl_idname = "renim.find_library_presets"
+    bl_label = "Find Library Preset"
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        try:
+            presets = find_library_presets(context, node_source_target)
+        except (OSError, ValueError) as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        node_source_target.library_presets.clear()
+        for filepath, name, coverage, matched in presets:
+            data = node_source_target.library_presets.add()
+            data.filepath = filepath
+            data.name = name
+            data.coverage = coverage
+            data.matched = matched
+
+        self.report({"INFO"}, "{} Preset Found".format(len(presets)))
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorLoadBestLibraryPreset(ReNimOperator, Operator):
+    """Load preset from preset library with best bone coverage for target and source armature"""
+    bl_idname = "renim.load_best_library_preset"
+    bl_label = "Load Best Preset"
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        try:
+            presets = find_library_presets(context, node_source_target)
+            if not presets:
+                raise ValueError("No Preset Match Armature Bones")
+
+            filepath, name, coverage, _ = presets[0]
+            data = read_preset(filepath)
+        except (OSError, ValueError) as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        data, flagged = check_preset_bones(
+            self, data, node_source_target, "", "FLAG")
+        load_preset(data, node_source_target, flagged)
+
+        self.report({"INFO"}, "Load Preset {} ({:.0%} Coverage)".format(
+            name, coverage))
+
+        return {"FINISHED"}
+
+
 class ReNimOperatorAddAdditionalBoneToBake(ReNimOperator, Operator):
     """Add additional bone to bake"""
     bl_idname = "renim.add_additional_bone_to_bake"
@@ -344,6 +792,54 @@ class ReNimOperatorRemoveAdditionalBoneToBake(ReNimOperator, Operator):
         return {"FINISHED"}
 
 
+class ReNimOperatorAddCrowdTarget(ReNimOperator, Operator):
+    """Add crowd target armature"""
+    bl_idname = "renim.add_crowd_target"
+    bl_label = "Add Crowd Target"
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if hasattr(node_source_target, "crowd_targets"):
+            node_source_target.crowd_targets.add()
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorRemoveCrowdTarget(ReNimOperator, Operator):
+    """Remove crowd target armature"""
+    bl_idname = "renim.remove_crowd_target"
+    bl_label = "Remove Crowd Target"
+
+    index: props.IntProperty(default=-1)  # type: ignore
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+        index = self.index
+
+        assert node_tree_name
+        assert node_name
+        assert index > -1
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if hasattr(node_source_target, "crowd_targets"):
+            node_source_target.crowd_targets.remove(index)
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+
+        return {"FINISHED"}
+
+
 class ReNimOperatorBakeAction(ReNimOperator, Operator):
     """Bake animation to action"""
     bl_idname = "renim.bake_action"
@@ -354,6 +850,9 @@ class ReNimOperatorBakeAction(ReNimOperator, Operator):
     end_frame: props.IntProperty(default=250)  # type: ignore
     frame_step: props.IntProperty(default=1)  # type: ignore
     unbind_after_bake: props.BoolProperty(default=False)  # type: ignore
+    sample_mode: props.EnumProperty(  # type: ignore
+        items=SAMPLE_MODES, default="STEP")
+    sample_tolerance: props.FloatProperty(default=0.001)  # type: ignore
 
     def execute(self, context):
         node_tree_name = self.node_tree_name
@@ -372,6 +871,48 @@ class ReNimOperatorBakeAction(ReNimOperator, Operator):
 
         node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
 
+        # preview action replace target pose, bake from original pose
+        if hasattr(node_source_target, "additional_bone_to_bake"):
+            stop_preview(node_source_target)
+
+        if hasattr(node_source_target, "additional_bone_to_bake") and node_source_target.use_root_motion:
+            target_object = node_source_target.outputs[0].target_object
+            if target_object is None:
+                self.report({"ERROR"}, "Target Object Required")
+                return {"CANCELLED"}
+            target_bones = target_object.pose.bones
+            if node_source_target.root_motion_bone not in target_bones or node_source_target.root_motion_hips not in target_bones:
+                self.report({"ERROR"}, "Root Motion Bone Not Found")
+                return {"CANCELLED"}
+            if node_source_target.root_motion_bone == node_source_target.root_motion_hips:
+                self.report({"ERROR"}, "Root And Hips Must Be Different Bones")
+                return {"CANCELLED"}
+            if not is_root_motion_parent(target_bones[node_source_target.root_motion_bone], target_bones[node_source_target.root_motion_hips]):
+                self.report({"ERROR"}, "Root Bone Must Be Parent Of Hips")
+                return {"CANCELLED"}
+            if node_source_target.root_motion_bone in mapped_target_bones(node_source_target):
+                # root channels are replaced by root motion
+                self.report({"WARNING"}, "Baked Channels Of Root Bone Are Replaced By Root Motion")
+            if node_source_target.bake_output == "FILE":
+                # streamed chunk never hold the whole clip needed by smoothing
+                self.report({"WARNING"}, "Root Motion Is Not Applied To Bake File")
+
+        if hasattr(node_source_target, "additional_bone_to_bake") and node_source_target.bake_output == "ACTION":
+            # property channels are read from source fcurves, not from evaluated scene
+            unsampled_names = unsampled_channels(node_source_target)
+            if unsampled_names:
+                self.report({"WARNING"}, "Drivers And NLA Are Not Sampled On Property Channels: {}".format(
+                    report_names(unsampled_names)))
+
+        if hasattr(node_source_target, "additional_bone_to_bake") and node_source_target.is_virtual_source():
+            return self.bake_virtual_source(context, node_source_target)
+
+        if hasattr(node_source_target, "additional_bone_to_bake") and node_source_target.bake_method in ["CACHE", "WORLD"]:
+            return self.bake_source_cache(context, node_source_target)
+
+        if hasattr(node_source_target, "additional_bone_to_bake") and node_source_target.bake_output == "FILE":
+            return self.bake_constraint_file(context, node_source_target)
+
         if hasattr(node_source_target, "additional_bone_to_bake"):
             # get output socket node
             socket_node = node_source_target.outputs[0]
@@ -407,101 +948,508 @@ class ReNimOperatorBakeAction(ReNimOperator, Operator):
             # deselect all bones
             bpy.ops.pose.select_all(action="DESELECT")
 
-            # target and source pose bones
-            target_pose_bones = target_object.pose.bones
-            # source_pose_bones = source_object.pose.bones
+            # fingerprint target rigs and mapping to reuse previous bake
+            bake_mapping_fingerprint = mapping_fingerprint(
+                node_source_target, start_frame, end_frame, frame_step,
+                "ADAPTIVE:{}".format(self.sample_tolerance) if self.sample_mode == "ADAPTIVE" else "")
+            bake_targets = find_bake_targets(
+                node_source_target, bake_mapping_fingerprint, {})
 
-            # get bone nodes to bake for link socket and set to tuple list (bone name, *[transform to bake])
-            bake_bone_from_nodes = [(link.to_node.bone_target, link.to_node.use_location, link.to_node.use_rotation_euler, link.to_node.use_scale)
-                                    for link in socket_node.links if isinstance(link.to_node, ReNimNodeMappingBone) and link.to_node.is_bind_valid]
+            # collect bake bones and store current transform
+            bake_job = ReNimBakeJob(node_source_target)
 
-            # get additional bones to bake
-            additional_bones = node_source_target.additional_bone_to_bake
+            # store curent frame
+            old_current_frame = context.scene.frame_current
 
-            # set to tuple list (bone name, *[transform to bake])
-            additional_bones = [(bone_group.bone_name, *bone_group.translation)
-                                for bone_group in additional_bones]
+            # only sweep frames when some target has no bake to reuse
+            if not all(baked_action for _, _, baked_action in bake_targets):
+                # unassign current action, sampled transform should come only from constraint
+                if target_object.animation_data:
+                    target_object.animation_data.action = None
+
+                if self.sample_mode == "ADAPTIVE":
+                    def evaluate(frame):
+                        context.scene.frame_set(frame)
+                        bake_job.reset_pose()
+                        context.view_layer.update()
+                        bake_job.sample(frame)
+                        return bake_job.sample_values()
+
+                    # sample source key times, refine only where target is not linear between them
+                    bake_job.keep_frames(adaptive_sample_frames(evaluate, source_key_frames(
+                        socket_node.source_object, start_frame, end_frame), self.sample_tolerance))
+                else:
+                    # start baking
+                    frame = self.start_frame
+                    while frame <= self.end_frame:
+                        context.scene.frame_set(frame)
+
+                        # set original transform value prevent value from last frame
+                        bake_job.reset_pose()
+
+                        # update pose scene after set original transform
+                        # update scene once in loop for better performance
+                        context.view_layer.update()
+
+                        # sample visual transform of all bake bones
+                        bake_job.sample(frame)
+
+                        frame += self.frame_step
+
+            # source and mapping only evaluated once per frame, write to target action and fan out to crowd targets
+            channels = apply_root_motion(
+                bake_job.channels(), node_source_target)
+
+            def write_target(action):
+                bake_job.write_action(action, channels)
+                # property nodes sampled at the same frames, written with the same bulk fcurve path
+                return write_property_channels(node_source_target, bake_job.frames, action, action_name)
+
+            def write_crowd(action, crowd_target):
+                bake_job.write_action(action, bake_job.fan_out_channels(
+                    channels, crowd_target), crowd_target)
+
+            _, reused_action_name, skipped_bakes = write_bake_targets(
+                node_source_target, bake_targets, bake_mapping_fingerprint, action_name, write_target, write_crowd)
 
-            # merge bone nodes and additional bones
-            bake_bones = bake_bone_from_nodes + additional_bones
+            # unassign action from target object
+            if target_object.animation_data:
+                target_object.animation_data.action = None
 
-            # remove duplicate
-            bake_bones = list(set(bake_bones))
+            # restore current frame
+            context.scene.frame_set(old_current_frame)
 
-            # check if bone exist and add current transform space | tuple(pose bone, *[transform to bake], location, rotation, scale)
-            bake_bones = [(target_pose_bones[bone_name], bake_location, bake_rotation, bake_scale, target_pose_bones[bone_name].location.copy(), target_pose_bones[bone_name].rotation_quaternion.copy() if target_pose_bones[bone_name].rotation_mode ==
-                           "QUATERNION" else target_pose_bones[bone_name].rotation_euler.copy(), target_pose_bones[bone_name].scale.copy()) for bone_name, bake_location, bake_rotation, bake_scale in bake_bones if target_pose_bones.get(bone_name)]
+            # change to pose mode
+            bpy.ops.object.mode_set(mode="OBJECT")
 
-            # create new action
-            action = bpy.data.actions.new(action_name)
+            # restore selected objects
+            for obj in selected_objects:
+                obj.select_set(True)
 
-            # set fake user for action
-            action.use_fake_user = True
+            # change active object to old object
+            context.view_layer.objects.active = old_active_object
 
-            # set action to target object
-            target_object.animation_data.action = action
+            # change to old mode if not object
+            if old_mode != "OBJECT":
+                bpy.ops.object.mode_set(mode=old_mode)
 
-            # store curent frame
-            old_current_frame = context.scene.frame_current
+            if unbind_after_bake and callable(getattr(node_source_target, "unbind")):
+                node_source_target.unbind(context, self)
+
+            if reused_action_name:
+                self.report({"INFO"}, "Bake Action Success, Reused {}, {} Bake Skipped".format(
+                    reused_action_name, skipped_bakes))
+            else:
+                self.report({"INFO"}, "Bake Action Success, {} Bake Skipped".format(
+                    skipped_bakes) if skipped_bakes else "Bake Action Success")
+        else:
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+
+        return {"FINISHED"}
 
-            # start baking
-            frame = self.start_frame
-            while frame <= self.end_frame:
-                context.scene.frame_set(frame)
-
-                for pose_bone, is_bake_location, is_bake_rotation, is_bake_scale, ori_location, ori_rotation, ori_scale in bake_bones:
-                    # set location transform value to original value prevent value from last keyframe
-                    if is_bake_location:
-                        pose_bone.location = ori_location
-
-                    # set rotation transform value to original value prevent value from last keyframe
-                    if is_bake_rotation:
-                        # 2 rotation mode
-                        if pose_bone.rotation_mode == "QUATERNION":
-                            pose_bone.rotation_quaternion = ori_rotation
-                        else:
-                            pose_bone.rotation_euler = ori_rotation
-
-                    # set scale transform value to original value prevent value from last keyframe
-                    if is_bake_scale:
-                        pose_bone.scale = ori_scale
-
-                # update pose scene after set original transform
-                # update scene once in loop for better performance
-                context.view_layer.update()
-
-                for pose_bone, is_bake_location, is_bake_rotation, is_bake_scale, ori_location, ori_rotation, ori_scale in bake_bones:
-                    # bake location
-                    if is_bake_location:
-                        pose_bone.keyframe_insert(
-                            "location", options={"INSERTKEY_VISUAL"}, group=pose_bone.name + " (loc)")
-
-                    # bake rotation
-                    if is_bake_rotation:
-                        pose_bone.keyframe_insert("rotation_quaternion", options={
-                                                  "INSERTKEY_VISUAL"}, group=pose_bone.name + " (rot quat)")
-                        pose_bone.keyframe_insert("rotation_euler", options={
-                                                  "INSERTKEY_VISUAL"}, group=pose_bone.name + " (rot euler)")
-
-                    # bake scale
-                    if is_bake_scale:
-                        pose_bone.keyframe_insert(
-                            "scale", options={"INSERTKEY_VISUAL"}, group=pose_bone.name + " (scale)")
-
-                frame += self.frame_step
-
-            # change interpolation to LINEAR
-            for fcurve in action.fcurves:
-                for keyFramePoints in fcurve.keyframe_points:
-                    keyFramePoints.interpolation = "LINEAR"
+    def bake_constraint_file(self, context, node_source_target):
+        # frame step sweep of bind constraints, sampled transforms flushed to file every chunk
+        if not node_source_target.is_bind:
+            self.report({"ERROR"}, "Bind Object Node Before Bake")
+            return {"CANCELLED"}
 
-            # unassign action from target object
+        if property_nodes(node_source_target):
+            # file only hold bone transforms
+            self.report({"WARNING"}, "Property Channels Are Not Written To Bake File")
+
+        target_object = node_source_target.outputs[0].target_object
+        bake_job = ReNimBakeJob(node_source_target)
+        fps = context.scene.render.fps / context.scene.render.fps_base
+
+        # sampled transform should come only from constraint, action restored after sweep
+        old_action = target_object.animation_data.action if target_object.animation_data else None
+        if old_action:
             target_object.animation_data.action = None
 
-            # restore current frame
+        old_current_frame = context.scene.frame_current
+        try:
+            with ReNimBakeFileWriter(bpy.path.abspath(node_source_target.bake_filepath), [pose_bone.name for pose_bone, *_ in bake_job.bake_bones], fps) as writer:
+                for frame in range(self.start_frame, self.end_frame + 1, self.frame_step):
+                    context.scene.frame_set(frame)
+                    bake_job.reset_pose()
+                    context.view_layer.update()
+                    bake_job.sample(frame)
+
+                    if len(bake_job.frames) >= BAKE_FILE_CHUNK_FRAMES:
+                        writer.write_chunk(*bake_job.drain())
+                writer.write_chunk(*bake_job.drain())
+        except OSError as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+        finally:
+            bake_job.reset_pose()
+            if old_action:
+                target_object.animation_data.action = old_action
             context.scene.frame_set(old_current_frame)
 
-            # change to pose mode
+        self.report({"INFO"}, "Bake File Success, {} Frames".format(
+            writer.frame_count))
+
+        return {"FINISHED"}
+
+    def bake_virtual_source(self, context, node_source_target):
+        # stream source motion from file chunk by chunk, solve mapping with arrays and write only target action
+        try:
+            motion = node_source_target.get_source_motion()
+        except (OSError, ValueError) as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        return self.bake_arrays(context, node_source_target, motion, ReNimArraySolver(node_source_target, motion))
+
+    def bake_source_cache(self, context, node_source_target):
+        # source armature is evaluated once per action and frame range, later bake only read memory-mapped cache
+        try:
+            source = get_source_cache(context, get_source_cache_directory(context), node_source_target.outputs[0].source_object,
+                                      self.start_frame, self.end_frame, self.frame_step)
+        except OSError as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        # world solver walk target hierarchy, array solver reproduce bind constraints
+        if node_source_target.bake_method == "WORLD":
+            solver = ReNimWorldSolver(
+                node_source_target, source, node_source_target.world_normalize)
+        else:
+            solver = ReNimArraySolver(node_source_target, source)
+
+        return self.bake_arrays(context, node_source_target, source, solver)
+
+    def bake_arrays(self, context, node_source_target, source, solver):
+        # source provide bone arrays chunk by chunk (bvh motion or source cache), write only target action
+        target_object = node_source_target.outputs[0].target_object
+
+        if not solver.nodes:
+            self.report({"ERROR"}, "No Bone Node Match Target And Source Bones")
+            return {"CANCELLED"}
+
+        fps = context.scene.render.fps / context.scene.render.fps_base
+
+        if node_source_target.bake_output == "FILE":
+            if property_nodes(node_source_target):
+                # file only hold bone transforms
+                self.report({"WARNING"}, "Property Channels Are Not Written To Bake File")
+
+            # solved chunk go straight to file, no chunk is kept
+            try:
+                with ReNimBakeFileWriter(bpy.path.abspath(node_source_target.bake_filepath), list(solver.bone_nodes), fps) as writer:
+                    for chunk_indices, source_transforms in source.iter_chunks(solver.source_bone_names, self.frame_step):
+                        writer.write_chunk(source.scene_frames(
+                            chunk_indices, self.start_frame, fps), solver.solve(source_transforms))
+            except OSError as error:
+                self.report({"ERROR"}, str(error))
+                return {"CANCELLED"}
+
+            self.report({"INFO"}, "Bake File Success, {} Frames".format(
+                writer.frame_count))
+            return {"FINISHED"}
+
+        # fingerprint target rigs and mapping to reuse previous bake, same as constraint bake
+        bake_mapping_fingerprint = mapping_fingerprint(
+            node_source_target, self.start_frame, self.end_frame, self.frame_step, self.array_sampling(node_source_target))
+        bake_targets = find_bake_targets(
+            node_source_target, bake_mapping_fingerprint, {})
+
+        # only solve source when some target has no bake to reuse
+        frames = channels = None
+        if not all(baked_action for _, _, baked_action in bake_targets):
+            indices = []
+            solved_chunks = []
+            for chunk_indices, source_transforms in source.iter_chunks(solver.source_bone_names, self.frame_step):
+                indices.append(chunk_indices)
+                solved_chunks.append(solver.solve(source_transforms))
+
+            if not solved_chunks:
+                self.report({"ERROR"}, "Source Has No Motion")
+                return {"CANCELLED"}
+
+            frames = source.scene_frames(
+                np.concatenate(indices), self.start_frame, fps)
+            channels = apply_root_motion(
+                solver.channels(solved_chunks), node_source_target)
+
+        def write_target(action):
+            write_action_channels(action, frames, channels)
+            property_actions = write_property_channels(
+                node_source_target, frames, action, self.action_name)
+            filter_action_rotations(action, target_object)
+            return property_actions
+
+        def write_crowd(action, crowd_target):
+            write_action_channels(action, frames, fan_out_channels(
+                channels, target_object, crowd_target))
+            filter_action_rotations(action, crowd_target)
+
+        _, reused_action_name, skipped_bakes = write_bake_targets(
+            node_source_target, bake_targets, bake_mapping_fingerprint, self.action_name, write_target, write_crowd)
+
+        message = "Bake Action Success"
+        if reused_action_name:
+            message += ", Reused {}".format(reused_action_name)
+        if skipped_bakes:
+            message += ", {} Bake Skipped".format(skipped_bakes)
+        if solver.skipped_nodes:
+            message += ", {} Node Skipped".format(len(solver.skipped_nodes))
+        self.report({"INFO"}, message)
+
+        return {"FINISHED"}
+
+    def array_sampling(self, node_source_target):
+        # array bake read other source than scene evaluation, keep it apart from constraint bake fingerprint
+        if node_source_target.is_virtual_source():
+            filepath = bpy.path.abspath(node_source_target.source_bvh)
+            stat = os.stat(filepath)
+            return "BVH:{}:{}:{}:{}".format(filepath, node_source_target.source_bvh_scale, stat.st_mtime, stat.st_size)
+        if node_source_target.bake_method == "WORLD":
+            return "WORLD:{}".format(node_source_target.world_normalize)
+        return node_source_target.bake_method
+
+
+class ReNimOperatorFilterRotations(ReNimOperator, Operator):
+    """Fix quaternion sign flips and euler jumps of target current action"""
+    bl_idname = "renim.filter_rotations"
+    bl_label = "Filter Rotations"
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if not hasattr(node_source_target, "additional_bone_to_bake"):
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+            return {"CANCELLED"}
+
+        target_object = node_source_target.outputs[0].target_object
+        action = target_object.animation_data.action if target_object and target_object.animation_data else None
+        if action is None:
+            self.report({"ERROR"}, "Target Has No Action")
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, "Filter Rotations Success, {} Curves Changed".format(
+            filter_action_rotations(action, target_object)))
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorQualityReport(ReNimOperator, Operator):
+    """Measure retarget error of every mapped bone over frame range, sorted worst first"""
+    bl_idname = "renim.quality_report"
+    bl_label = "Quality Report"
+
+    # batch run get CANCELLED when some bone exceed threshold
+    fail_on_threshold: props.BoolProperty(default=False)  # type: ignore
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if not hasattr(node_source_target, "additional_bone_to_bake"):
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+            return {"CANCELLED"}
+
+        socket_node = node_source_target.outputs[0]
+        target_object = socket_node.target_object
+        source_object = socket_node.source_object
+        if node_source_target.is_virtual_source() or not target_object or not source_object:
+            self.report({"ERROR"}, "Quality Report Need Target And Source Armature")
+            return {"CANCELLED"}
+
+        start_frame = node_source_target.start_frame
+        end_frame = node_source_target.end_frame
+        if start_frame >= end_frame:
+            self.report({"ERROR"}, "Invalid Frame Range")
+            return {"CANCELLED"}
+
+        # mapped pairs with both bones | tuple list (node name, target bone, source bone)
+        pairs = [(link.to_node.name, link.to_node.bone_target, link.to_node.bone_source) for link in socket_node.links if isinstance(link.to_node, ReNimNodeMappingBone)
+                 and target_object.data.bones.get(link.to_node.bone_target) and source_object.data.bones.get(link.to_node.bone_source)]
+        if not pairs:
+            self.report({"ERROR"}, "No Bone Node Match Target And Source Bones")
+            return {"CANCELLED"}
+
+        target_bone_names = [bone_target for _, bone_target, _ in pairs]
+        source_bone_names = [bone_source for _, _, bone_source in pairs]
+
+        # sample what target currently show, bind constraints, preview or baked action
+        old_current_frame = context.scene.frame_current
+        target_samples = []
+        source_samples = []
+        for frame in range(start_frame, end_frame + 1, node_source_target.frame_step):
+            context.scene.frame_set(frame)
+            target_samples.append(sample_world_transforms(
+                target_object, target_bone_names))
+            source_samples.append(sample_world_transforms(
+                source_object, source_bone_names))
+        context.scene.frame_set(old_current_frame)
+
+        metrics = quality_metrics(
+            np.array([positions for positions, _ in source_samples]),
+            np.array([rotations for _, rotations in source_samples]),
+            rest_world_rotations(source_object, source_bone_names),
+            rig_height(source_object),
+            np.array([positions for positions, _ in target_samples]),
+            np.array([rotations for _, rotations in target_samples]),
+            rest_world_rotations(target_object, target_bone_names),
+            rig_height(target_object))
+
+        # store worst position error first
+        node_source_target.quality_report.clear()
+        node_source_target.quality_report_index = -1
+        over_threshold = []
+        for index in np.argsort(-metrics["position_rms"]):
+            node_name, bone_target, bone_source = pairs[index]
+            item = node_source_target.quality_report.add()
+            item.name = bone_target
+            item.bone_source = bone_source
+            item.node_name = node_name
+            for metric, values in metrics.items():
+                setattr(item, metric, float(values[index]))
+            item.is_over_threshold = item.position_rms > node_source_target.quality_position_threshold or \
+                item.orientation_rms > node_source_target.quality_orientation_threshold
+            if item.is_over_threshold:
+                over_threshold.append(bone_target)
+
+        if over_threshold:
+            self.report({"ERROR"} if self.fail_on_threshold else {"WARNING"}, "{} Bones Over Threshold: {}".format(
+                len(over_threshold), report_names(over_threshold)))
+            return {"CANCELLED"} if self.fail_on_threshold else {"FINISHED"}
+
+        self.report({"INFO"}, "Quality Report Success, All {} Bones Under Threshold".format(
+            len(pairs)))
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorCleanupBakeActions(Operator):
+    """Remove duplicate bake actions and bake actions over retention of every ReNim node tree"""
+    bl_idname = "renim.cleanup_bake_actions"
+    bl_label = "Clean Up Bake Actions"
+    bl_options = {"REGISTER", "UNDO"}
+
+    keep_last: props.IntProperty(  # type: ignore
+        name="Keep Last",
+        description="Newest bake actions kept per node tree, 0 keep all and only remove duplicates",
+        default=3,
+        min=0
+    )
+    keep_used: props.BoolProperty(  # type: ignore
+        name="Keep Used",
+        description="Keep bake action assigned to object or used in NLA",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.space_data.type == "NODE_EDITOR" and context.space_data.tree_type == "ReNimNode"  # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        duplicates, expired = plan_action_cleanup(
+            self.keep_last, self.keep_used)
+        removed_duplicates, removed_expired = purge_actions(
+            duplicates, expired)
+
+        self.report({"INFO"}, "Clean Up Success, {} Duplicates And {} Old Bake Actions Removed".format(
+            removed_duplicates, removed_expired))
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorMatchPose(ReNimOperator, Operator):
+    """Rotate every mapped target bone to follow source bone rest direction, parent first in one pass"""
+    bl_idname = "renim.match_pose"
+    bl_label = "Match Pose"
+
+    apply_as_rest: props.BoolProperty(  # type: ignore
+        name="Apply As Rest",
+        description="Apply matched pose as target rest pose",
+        default=False
+    )
+    reset_others: props.BoolProperty(  # type: ignore
+        name="Reset Others",
+        description="Reset unmatched bones and location and scale of matched bones to rest, otherwise only rotation of matched bones is written",
+        default=False
+    )
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if not hasattr(node_source_target, "additional_bone_to_bake"):
+            self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+            return {"CANCELLED"}
+
+        socket_node = node_source_target.outputs[0]
+        target_object = socket_node.target_object
+        source_object = socket_node.source_object
+        if node_source_target.is_virtual_source() or not target_object or not source_object:
+            self.report({"ERROR"}, "Match Pose Need Target And Source Armature")
+            return {"CANCELLED"}
+
+        # helper bones and constraints follow rest pose of bind time
+        if node_source_target.is_bind:
+            self.report({"ERROR"}, "Unbind Before Match Pose")
+            return {"CANCELLED"}
+
+        # target bone -> source bone, first node win
+        pairs = {}
+        for link in socket_node.links:
+            if isinstance(link.to_node, ReNimNodeMappingBone) and link.to_node.bone_target and link.to_node.bone_source:
+                pairs.setdefault(link.to_node.bone_target,
+                                 link.to_node.bone_source)
+        if not pairs:
+            self.report({"ERROR"}, "No Bone Node To Match")
+            return {"CANCELLED"}
+
+        # kept pose of other bones move matched children, so rotations are solved on top of it
+        rotations = match_pose_rotations(target_object, source_object, pairs,
+                                         None if self.reset_others else pose_bases(target_object))
+        apply_pose_rotations(target_object, rotations, self.reset_others)
+
+        if self.apply_as_rest:
+            # store current mode
+            old_mode = "OBJECT"
+
+            # store current active object
+            old_active_object = context.active_object
+
+            # change mode to object if current mode is not object
+            if context.mode != "OBJECT":
+                # overide current mode if not object
+                old_mode = context.active_object.mode if context.active_object else context.mode
+                bpy.ops.object.mode_set(mode="OBJECT")
+
+            # store selected object for seamless binding
+            selected_objects = context.selected_objects
+
+            # deselect all objects
+            bpy.ops.object.select_all(action="DESELECT")
+
+            # apply pose of all bones in one call
+            context.view_layer.objects.active = target_object
+            bpy.ops.object.mode_set(mode="POSE")
+            bpy.ops.pose.armature_apply(selected=False)
             bpy.ops.object.mode_set(mode="OBJECT")
 
             # restore selected objects
@@ -515,12 +1463,250 @@ class ReNimOperatorBakeAction(ReNimOperator, Operator):
             if old_mode != "OBJECT":
                 bpy.ops.object.mode_set(mode=old_mode)
 
-            if unbind_after_bake and callable(getattr(node_source_target, "unbind")):
+        self.report({"INFO"}, "Match Pose Success, {} Bones Matched".format(
+            len(rotations)))
+
+        return {"FINISHED"}
+
+
+def bound_object_nodes():
+    # bound object nodes with target of every ReNim node tree in file
+    return [node for node_tree in bpy.data.node_groups if node_tree.bl_idname == "ReNimNode"
+            for node in node_tree.nodes if hasattr(node, "additional_bone_to_bake") and node.is_bind and node.outputs[0].target_object]
+
+
+class ReNimOperatorBakeAll(Operator):
+    """Bake all bound object nodes of every ReNim node tree, scene is evaluated once per frame for all targets"""
+    bl_idname = "renim.bake_all"
+    bl_label = "Bake All"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return context.space_data.type == "NODE_EDITOR" and context.space_data.tree_type == "ReNimNode"  # type: ignore
+
+    def execute(self, context):
+        node_source_targets = bound_object_nodes()
+        if not node_source_targets:
+            self.report({"ERROR"}, "No Bound Object Node To Bake")
+            return {"CANCELLED"}
+
+        invalid_nodes = [
+            node for node in node_source_targets if node.start_frame >= node.end_frame or node.frame_step < 1]
+        if invalid_nodes:
+            self.report({"ERROR"}, "Invalid Frame Range On {}".format(
+                report_names([node.name for node in invalid_nodes])))
+            return {"CANCELLED"}
+
+        # file output, array bake and adaptive sampling have their own path in bake action
+        own_path_nodes = [
+            node for node in node_source_targets if not is_shared_sweep_node(node)]
+        node_source_targets = [
+            node for node in node_source_targets if is_shared_sweep_node(node)]
+
+        # store current mode
+        old_mode = "OBJECT"
+
+        # store current active object
+        old_active_object = context.active_object
+
+        # store selected object, unbind after bake change selection
+        selected_objects = list(context.selected_objects)
+
+        # change mode to object if current mode is not object
+        if context.mode != "OBJECT":
+            # overide current mode if not object
+            old_mode = context.active_object.mode if context.active_object else context.mode
+            bpy.ops.object.mode_set(mode="OBJECT")
+
+        # tuple list (object node, bake job, frames to sample, mapping fingerprint, bake targets)
+        bake_jobs = []
+        rig_fingerprint_cache = {}
+        for node_source_target in node_source_targets:
+            # preview action replace target pose, bake from original pose
+            stop_preview(node_source_target)
+
+            # node which every target can reuse a bake is not sampled
+            bake_mapping_fingerprint = mapping_fingerprint(
+                node_source_target, node_source_target.start_frame, node_source_target.end_frame, node_source_target.frame_step)
+            bake_targets = find_bake_targets(
+                node_source_target, bake_mapping_fingerprint, rig_fingerprint_cache)
+            is_reused = all(
+                baked_action for _, _, baked_action in bake_targets)
+
+            bake_job = ReNimBakeJob(node_source_target)
+            # unassign current action, sampled transform should come only from constraint
+            if not is_reused and bake_job.target_object.animation_data:
+                bake_job.target_object.animation_data.action = None
+            bake_jobs.append((node_source_target, bake_job, set() if is_reused else node_frames(
+                node_source_target), bake_mapping_fingerprint, bake_targets))
+
+        unsampled_names = {name for node_source_target, _, job_frames, _, _ in bake_jobs if job_frames
+                           for name in unsampled_channels(node_source_target)}
+        if unsampled_names:
+            # property channels are read from source fcurves, not from evaluated scene
+            self.report({"WARNING"}, "Drivers And NLA Are Not Sampled On Property Channels: {}".format(
+                report_names(unsampled_names)))
+
+        # store curent frame
+        old_current_frame = context.scene.frame_current
+
+        # one sweep over union of all frame ranges, each job only sample its own frames
+        frames = []
+        for frame, job_indices in sweep_frames([job_frames for _, _, job_frames, _, _ in bake_jobs]):
+            frames.append(frame)
+            context.scene.frame_set(frame)
+
+            frame_jobs = [bake_jobs[index][1] for index in job_indices]
+
+            # set original transform value prevent value from last frame
+            for bake_job in frame_jobs:
+                bake_job.reset_pose()
+
+            # update scene once for all targets
+            context.view_layer.update()
+
+            for bake_job in frame_jobs:
+                bake_job.sample(frame)
+
+        skipped_bakes = 0
+        for node_source_target, bake_job, _, bake_mapping_fingerprint, bake_targets in bake_jobs:
+            channels = apply_root_motion(
+                bake_job.channels(), node_source_target)
+
+            def write_target(action):
+                bake_job.write_action(action, channels)
+                return write_property_channels(node_source_target, bake_job.frames, action, node_source_target.action_name)
+
+            def write_crowd(action, crowd_target):
+                bake_job.write_action(action, bake_job.fan_out_channels(
+                    channels, crowd_target), crowd_target)
+
+            _, _, node_skipped_bakes = write_bake_targets(
+                node_source_target, bake_targets, bake_mapping_fingerprint, node_source_target.action_name, write_target, write_crowd)
+            skipped_bakes += node_skipped_bakes
+
+        # restore current frame
+        context.scene.frame_set(old_current_frame)
+
+        # change active object to old object
+        context.view_layer.objects.active = old_active_object
+
+        # change to old mode if not object
+        if old_mode != "OBJECT":
+            bpy.ops.object.mode_set(mode=old_mode)
+
+        for node_source_target, *_ in bake_jobs:
+            if node_source_target.unbind_after_bake:
                 node_source_target.unbind(context, self)
 
-            self.report({"INFO"}, "Bake Action Success")
+        failed_nodes = []
+        for node_source_target in own_path_nodes:
+            result = bpy.ops.renim.bake_action(
+                node_tree_name=node_source_target.id_data.name,
+                node_source_target_name=node_source_target.name,
+                action_name=node_source_target.action_name,
+                start_frame=node_source_target.start_frame,
+                end_frame=node_source_target.end_frame,
+                frame_step=node_source_target.frame_step,
+                unbind_after_bake=node_source_target.unbind_after_bake,
+                sample_mode=node_source_target.sample_mode,
+                sample_tolerance=node_source_target.sample_tolerance)
+            if "FINISHED" not in result:
+                failed_nodes.append(node_source_target.name)
+
+        # restore selected objects, without operator so it work in any mode
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for obj in selected_objects:
+            obj.select_set(True)
+
+        message = "Bake All Success, {} Object Nodes In {} Frames".format(
+            len(bake_jobs), len(frames))
+        if skipped_bakes:
+            message += ", {} Bake Skipped".format(skipped_bakes)
+        if own_path_nodes:
+            message += ", {} Baked Separately: {}".format(len(own_path_nodes), report_names(
+                [node.name for node in own_path_nodes]))
+
+        if failed_nodes:
+            self.report({"WARNING"}, "Bake All Failed On {}".format(
+                report_names(failed_nodes)))
         else:
+            self.report({"INFO"}, message)
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorTogglePreview(ReNimOperator, Operator):
+    """Preview mapping on target from source arrays in memory, node change update preview instantly"""
+    bl_idname = "renim.toggle_preview"
+    bl_label = "Toggle Preview"
+
+    def execute(self, context):
+        node_tree_name = self.node_tree_name
+        node_name = self.node_source_target_name
+
+        assert node_tree_name
+        assert node_name
+
+        node_source_target = bpy.data.node_groups[node_tree_name].nodes[node_name]
+
+        if not hasattr(node_source_target, "additional_bone_to_bake"):
             self.report({"ERROR"}, "Operator Can Only Call From ReNim Node")
+            return {"CANCELLED"}
+
+        if get_preview(node_source_target):
+            stop_preview(node_source_target)
+            self.report({"INFO"}, "Preview Stopped")
+            return {"FINISHED"}
+
+        start_frame = node_source_target.start_frame
+        end_frame = node_source_target.end_frame
+        frame_step = node_source_target.frame_step
+        fps = context.scene.render.fps / context.scene.render.fps_base
+
+        # source is sampled or read once, kept in memory until preview stop
+        try:
+            if node_source_target.is_virtual_source():
+                source = node_source_target.get_source_motion()
+            else:
+                assert start_frame < end_frame
+                source = get_source_cache(context, get_source_cache_directory(context), node_source_target.outputs[0].source_object,
+                                          start_frame, end_frame, frame_step)
+                frame_step = 1
+        except (OSError, ValueError) as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        indices, source_transforms = read_source_transforms(
+            source, source.bone_names, frame_step)
+        if not source_transforms:
+            self.report({"ERROR"}, "Source Has No Motion")
+            return {"CANCELLED"}
+
+        start_preview(node_source_target, source, source.scene_frames(
+            indices, start_frame, fps), source_transforms)
+        self.report({"INFO"}, "Preview Started")
+
+        return {"FINISHED"}
+
+
+class ReNimOperatorClearSourceCache(Operator):
+    """Remove sampled source motion files from source cache directory"""
+    bl_idname = "renim.clear_source_cache"
+    bl_label = "Clear Source Cache"
+
+    def execute(self, context):
+        removed, freed, locked = clear_source_cache(
+            get_source_cache_directory(context))
+
+        if locked:
+            self.report({"WARNING"}, "Clear Source Cache, {} Files Removed, {} Files In Use".format(
+                removed, locked))
+        else:
+            self.report({"INFO"}, "Clear Source Cache Success, {} Files Removed, {:.1f} MB Freed".format(
+                removed, freed / (1024 * 1024)))
 
         return {"FINISHED"}
 
@@ -528,12 +1714,27 @@ class ReNimOperatorBakeAction(ReNimOperator, Operator):
 classes = [
     ReNimOperatorToggleBind,
     ReNimOperatorConnectSelectedBoneNodes,
+    ReNimOperatorSetCompactBoneNodes,
     ReNimOperatorCreateBoneNodeFromSelectedBones,
+    ReNimOperatorAutoMapBones,
+    ReNimOperatorAcceptAutoMapReview,
+    ReNimOperatorRemoveAutoMapReview,
     ReNimOperatorLoadPreset,
     ReNimOperatorSavePreset,
+    ReNimOperatorFindLibraryPresets,
+    ReNimOperatorLoadBestLibraryPreset,
     ReNimOperatorAddAdditionalBoneToBake,
     ReNimOperatorRemoveAdditionalBoneToBake,
+    ReNimOperatorAddCrowdTarget,
+    ReNimOperatorRemoveCrowdTarget,
     ReNimOperatorBakeAction,
+    ReNimOperatorBakeAll,
+    ReNimOperatorFilterRotations,
+    ReNimOperatorQualityReport,
+    ReNimOperatorCleanupBakeActions,
+    ReNimOperatorMatchPose,
+    ReNimOperatorTogglePreview,
+    ReNimOperatorClearSourceCache,
 ]
 
 
@@ -541,7 +1742,16 @@ def register():
     for x in classes:
         register_class(x)
 
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_selection_cache)
+    bpy.app.handlers.load_pre.append(clear_previews)
+    bpy.app.handlers.save_pre.append(stop_previews_before_save)
+
 
 def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_selection_cache)
+    bpy.app.handlers.load_pre.remove(clear_previews)
+    bpy.app.handlers.save_pre.remove(stop_previews_before_save)
+    stop_all_previews()
+
     for x in reversed(classes):
         unregister_class(x)
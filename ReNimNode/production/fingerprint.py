@@ -0,0 +1,103 @@
+import hashlib
+import json
+import numpy as np
+from bpy.types import Action, Object
+from . node_mapping import ReNimNodeMapping, ReNimNodeMappingProperty
+from . property_channels import channel_path
+
+# rest matrix rounding, prevent float noise produce different fingerprint
+FINGERPRINT_PRECISION = 4
+
+
+def hash_data(data) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def property_value(node, prop_name: str):
+    value = getattr(node, prop_name)
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return [round(x, FINGERPRINT_PRECISION) if isinstance(x, float) else x for x in value]
+
+
+def rig_fingerprint(armature_object: Object, cache: dict | None = None) -> str:
+    # fingerprint from bone names, hierarchy and rest matrices
+    # armature data can be shared by many objects, compute it once per data
+    key = armature_object.data.as_pointer()  # type: ignore
+    if cache is not None and key in cache:
+        return cache[key]
+
+    bones = [(
+        bone.name,
+        bone.parent.name if bone.parent else "",
+        [round(x, FINGERPRINT_PRECISION) for row in bone.matrix_local for x in row],
+    ) for bone in armature_object.data.bones]  # type: ignore
+    fingerprint = hash_data(sorted(bones))
+
+    if cache is not None:
+        cache[key] = fingerprint
+    return fingerprint
+
+
+def action_fingerprint(action: Action | None) -> str:
+    # fingerprint from fcurve keyframes, cheap compare to re-evaluate the action
+    if action is None:
+        return ""
+
+    sha1 = hashlib.sha1()
+    for fcurve in action.fcurves:
+        sha1.update("{}[{}]".format(fcurve.data_path,
+                    fcurve.array_index).encode("utf-8"))
+        co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", co)
+        sha1.update(co.tobytes())
+    return sha1.hexdigest()
+
+
+def mapping_fingerprint(node_source_target, start_frame: int, end_frame: int, frame_step: int, sampling: str = "") -> str:
+    # fingerprint from mapping nodes parameter, source motion and frame range
+    socket_node = node_source_target.outputs[0]
+    source_object = socket_node.source_object
+    source_action = source_object.animation_data.action if source_object and source_object.animation_data else None
+
+    mapping = sorted([[link.to_node.bl_idname] + [property_value(link.to_node, prop_name) for prop_name in link.to_node.mapping_properties]
+                      for link in socket_node.links if isinstance(link.to_node, ReNimNodeMapping)], key=str)
+    additional_bones = sorted([[bone_group.bone_name, list(bone_group.translation)]
+                               for bone_group in node_source_target.additional_bone_to_bake], key=str)
+
+    # bind mix current target pose with constraint result, match pose overwrite it
+    target_object = socket_node.target_object
+    target_basis = sorted([[pose_bone.name] + [round(x, FINGERPRINT_PRECISION) for row in pose_bone.matrix_basis for x in row]
+                           for pose_bone in target_object.pose.bones if not pose_bone.bone.collections.get("ReNimHelperBones")], key=str) if target_object else []
+
+    data = {
+        "source": source_object.name if source_object else "",
+        "source_rig": rig_fingerprint(source_object) if source_object else "",
+        "source_action": action_fingerprint(source_action),
+        "target_basis": target_basis,
+        "frame_range": [start_frame, end_frame, frame_step],
+        "mapping": mapping,
+        "additional_bones": additional_bones,
+    }
+    # property nodes only when used, keep fingerprint of previous version
+    properties = []
+    for link in socket_node.links:
+        if isinstance(link.to_node, ReNimNodeMappingProperty):
+            node = link.to_node
+            # source channel may be animated on other id, e.g. shape keys of face mesh
+            source_id, _ = channel_path(
+                node.source_object or source_object, node.source_type, node.source_name)
+            source_id_action = source_id.animation_data.action if source_id and source_id.animation_data else None
+            properties.append([property_value(node, prop_name) for prop_name in node.mapping_properties] + [
+                source_id.name if source_id else "", action_fingerprint(source_id_action)])
+    properties.sort(key=str)
+    if properties:
+        data["properties"] = properties
+    # frame step bake keep fingerprint of previous version
+    if sampling:
+        data["sampling"] = sampling
+    # root motion change baked channels of root and hips
+    if node_source_target.use_root_motion:
+        data["root_motion"] = [node_source_target.root_motion_bone, node_source_target.root_motion_hips, list(node_source_target.root_motion_axes),
+                               node_source_target.root_motion_rotation, node_source_target.root_motion_smoothing]
+    return hash_data(data)
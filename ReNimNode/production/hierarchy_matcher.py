@@ -0,0 +1,432 @@
+import math
+import numpy as np
+
+# cost when alignment skip a chain level (extra root bone, ik bone)
+SKIP_COST = 0.3
+
+# score for chain which contain anchor bone
+ANCHOR_BONUS = 4.0
+ANCHOR_PENALTY = -4.0
+
+# chain level difference between aligned chains, bound skip recursion
+MAX_SKIP_LEVELS = 2
+
+# smaller over bigger subtree size of aligned chains, pair below it is never compared
+MIN_SIZE_RATIO = 0.5
+
+# children pairs more than this only compare nearest children, each child keep this many candidates
+FULL_PAIRS_LIMIT = 64
+CANDIDATE_CHILDREN = 4
+
+
+def normalize_bones(bones: list):
+    # bones is list of tuple (name, parent name, head, tail) in armature space
+    # normalize position by armature height, origin at armature origin on the lowest point
+    points = [point for _, _, head, tail in bones for point in (head, tail)]
+    if not points:
+        return {}
+
+    min_x = min(point[0] for point in points)
+    max_x = max(point[0] for point in points)
+    min_y = min(point[1] for point in points)
+    max_y = max(point[1] for point in points)
+    min_z = min(point[2] for point in points)
+    max_z = max(point[2] for point in points)
+    height = max(max_z - min_z, max_x - min_x, max_y - min_y, 1e-6)
+    origin = (0.0, 0.0, min_z)
+
+    def normalize(point):
+        return tuple((point[i] - origin[i]) / height for i in range(3))
+
+    return {name: (parent, normalize(head), normalize(tail)) for name, parent, head, tail in bones}
+
+
+def build_chains(bones: dict):
+    # compress single child bone sequence into chain, return (chains, root chain indices)
+    children = {name: [] for name in bones}
+    roots = []
+    for name, (parent, _, _) in bones.items():
+        if parent and parent in children:
+            children[parent].append(name)
+        else:
+            roots.append(name)
+
+    chains = []
+
+    def add_chain(start):
+        chain_bones = [start]
+        while len(children[chain_bones[-1]]) == 1:
+            chain_bones.append(children[chain_bones[-1]][0])
+
+        index = len(chains)
+        chains.append({"bones": chain_bones, "children": []})
+        child_chains = [add_chain(child)
+                        for child in children[chain_bones[-1]]]
+        chains[index]["children"] = child_chains
+        return index
+
+    # iterative depth would be nicer, but rig hierarchy depth is small
+    root_chains = [add_chain(root) for root in roots]
+
+    for chain in chains:
+        chain_bones = chain["bones"]
+        heads = [bones[name][1] for name in chain_bones]
+        tails = [bones[name][2] for name in chain_bones]
+        lengths = [math.dist(head, tail) for head, tail in zip(heads, tails)]
+        total = sum(lengths)
+
+        direction = [tails[-1][i] - heads[0][i] for i in range(3)]
+        direction_length = math.sqrt(sum(x * x for x in direction))
+        chain["direction"] = [
+            x / direction_length for x in direction] if direction_length > 1e-9 else [0.0, 0.0, 0.0]
+        chain["length"] = total
+        chain["head"] = heads[0]
+        chain["side"] = 0 if abs(heads[0][0]) < 0.02 and abs(
+            tails[-1][0]) < 0.02 else (1 if heads[0][0] + tails[-1][0] > 0 else -1)
+
+        # normalized position of bone middle along chain, used for redistribution
+        positions = []
+        walked = 0.0
+        for length in lengths:
+            positions.append(
+                (walked + length / 2) / total if total > 1e-9 else (len(positions) + 0.5) / len(lengths))
+            walked += length
+        chain["positions"] = positions
+
+    # subtree size, children added after parent so walk reversed
+    for chain in reversed(chains):
+        chain["size"] = len(chain["bones"]) + \
+            sum(chains[child]["size"] for child in chain["children"])
+
+    # chain level from root chain
+    for index in root_chains:
+        chains[index]["depth"] = 0
+    for chain in chains:
+        for child in chain["children"]:
+            chains[child]["depth"] = chain["depth"] + 1
+
+    return chains, root_chains
+
+
+def ratio(a, b):
+    if a <= 0 and b <= 0:
+        return 1.0
+    return min(a, b) / max(a, b)
+
+
+def chain_similarity(target_chain: dict, source_chain: dict):
+    # local feature similarity in range 0 - 1
+    dot = sum(target_chain["direction"][i] * source_chain["direction"][i]
+              for i in range(3))
+    distance = math.dist(target_chain["head"], source_chain["head"])
+
+    score = 0.0
+    score += 0.3 * (dot + 1.0) / 2.0
+    score += 0.15 * ratio(target_chain["length"], source_chain["length"])
+    score += 0.1 * ratio(len(target_chain["bones"]),
+                         len(source_chain["bones"]))
+    score += 0.1 * 1.0 / (1.0 + abs(len(target_chain["children"]) -
+                                    len(source_chain["children"])))
+    score += 0.1 * ratio(target_chain["size"], source_chain["size"])
+    score += 0.15 * math.exp(-distance * 4.0)
+    score += 0.1 * (1.0 if target_chain["side"]
+                    == source_chain["side"] else 0.0)
+    return score
+
+
+def best_assignment(weights):
+    # maximum weight matching, hungarian algorithm with potentials, return list of (row, column)
+    # pair with weight not above zero is never returned, same as leaving both unmatched
+    weights = np.maximum(np.asarray(weights, dtype=np.float64), 0.0)
+    if weights.ndim != 2 or not weights.size:
+        return []
+
+    # algorithm assign every row, rows must not be more than columns
+    is_transpose = weights.shape[0] > weights.shape[1]
+    if is_transpose:
+        weights = weights.T
+    rows, columns = weights.shape
+    cost = weights.max() - weights
+
+    # 1 based like reference algorithm, index 0 is virtual column
+    row_potential = np.zeros(rows + 1)
+    column_potential = np.zeros(columns + 1)
+    column_row = np.zeros(columns + 1, dtype=np.int64)
+    way = np.zeros(columns + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        column_row[0] = row
+        column = 0
+        min_values = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current_row = column_row[column]
+
+            # relax every free column from current row at once
+            reduced = cost[current_row - 1] - \
+                row_potential[current_row] - column_potential[1:]
+            free = ~used[1:]
+            update = free & (reduced < min_values[1:])
+            min_values[1:][update] = reduced[update]
+            way[1:][update] = column
+
+            free_values = np.where(free, min_values[1:], np.inf)
+            next_column = int(np.argmin(free_values)) + 1
+            delta = free_values[next_column - 1]
+
+            used_columns = np.nonzero(used)[0]
+            row_potential[column_row[used_columns]] += delta
+            column_potential[used_columns] -= delta
+            min_values[1:][free] -= delta
+
+            column = next_column
+            if column_row[column] == 0:
+                break
+
+        # augment along found path
+        while column:
+            previous_column = way[column]
+            column_row[column] = column_row[previous_column]
+            column = previous_column
+
+    pairs = []
+    for column in range(1, columns + 1):
+        row = column_row[column] - 1
+        if row >= 0 and weights[row, column - 1] > 0:
+            pairs.append((column - 1, row) if is_transpose else (row, column - 1))
+    return sorted(pairs)
+
+
+def candidate_children(target_chains: list, source_chains: list, target_children: list, source_children: list):
+    # child pairs worth aligning, list of tuple (target child, source child)
+    if len(target_children) * len(source_children) <= FULL_PAIRS_LIMIT:
+        return [(target_child, source_child) for target_child in target_children for source_child in source_children]
+
+    # wide branch (fingers, face, fan), compare children only with nearest children of same direction
+    def features(chains, children):
+        return np.array([chains[index]["head"] for index in children]), np.array([chains[index]["direction"] for index in children])
+
+    target_heads, target_directions = features(target_chains, target_children)
+    source_heads, source_directions = features(source_chains, source_children)
+    distance = np.linalg.norm(
+        target_heads[:, None] - source_heads[None], axis=-1) + 0.5 * (1.0 - target_directions @ source_directions.T)
+
+    pairs = set()
+    count = min(CANDIDATE_CHILDREN, len(source_children))
+    for row, columns in enumerate(np.argpartition(distance, count - 1, axis=1)[:, :count]):
+        pairs.update((row, int(column)) for column in columns)
+    count = min(CANDIDATE_CHILDREN, len(target_children))
+    for column, rows in enumerate(np.argpartition(distance, count - 1, axis=0)[:count].T):
+        pairs.update((int(row), column) for row in rows)
+    return [(target_children[row], source_children[column]) for row, column in sorted(pairs)]
+
+
+def align_chain_bones(target_chain: dict, source_chain: dict, confidence: float):
+    # map bones inside matched chain, redistribute by normalized position when count differ
+    target_bones = target_chain["bones"]
+    source_bones = source_chain["bones"]
+    if len(target_bones) == len(source_bones):
+        return [(target, source, confidence) for target, source in zip(target_bones, source_bones)]
+
+    # shorter chain pick nearest bone on longer chain, keep order
+    swap = len(target_bones) > len(source_bones)
+    short_chain, long_chain = (
+        source_chain, target_chain) if swap else (target_chain, source_chain)
+
+    pairs = []
+    start = 0
+    for index, position in enumerate(short_chain["positions"]):
+        remaining = len(short_chain["positions"]) - index - 1
+        candidates = range(start, len(long_chain["positions"]) - remaining)
+        nearest = min(candidates, key=lambda i: abs(
+            long_chain["positions"][i] - position))
+        start = nearest + 1
+        bone_confidence = confidence * \
+            (1.0 - min(abs(long_chain["positions"][nearest] - position), 1.0))
+        if swap:
+            pairs.append((long_chain["bones"][nearest],
+                         short_chain["bones"][index], bone_confidence))
+        else:
+            pairs.append((short_chain["bones"][index],
+                         long_chain["bones"][nearest], bone_confidence))
+    return pairs
+
+
+def match_bone_hierarchy(target_bones: list, source_bones: list, anchors: dict | None = None):
+    # structural match, bones is list of tuple (name, parent name, head, tail) in armature space
+    # anchors is dict target bone name -> source bone name already mapped
+    # return list of tuple (target name, source name, confidence)
+    anchors = anchors or {}
+
+    target_chains, target_roots = build_chains(normalize_bones(target_bones))
+    source_chains, source_roots = build_chains(normalize_bones(source_bones))
+
+    # virtual root for armature with many root bones
+    target_chains.append({"bones": [], "children": target_roots})
+    source_chains.append({"bones": [], "children": source_roots})
+    target_root = len(target_chains) - 1
+    source_root = len(source_chains) - 1
+
+    # which chain contain source bone, for anchor lookup
+    source_chain_of_bone = {bone: index for index, chain in enumerate(
+        source_chains) for bone in chain["bones"]}
+
+    local_cache = {}
+
+    def local_score(target_index, source_index):
+        key = (target_index, source_index)
+        if key not in local_cache:
+            target_chain = target_chains[target_index]
+            source_chain = source_chains[source_index]
+            score = chain_similarity(target_chain, source_chain)
+            for bone in target_chain["bones"]:
+                if bone in anchors:
+                    score += ANCHOR_BONUS if source_chain_of_bone.get(
+                        anchors[bone]) == source_index else ANCHOR_PENALTY
+            local_cache[key] = score
+        return local_cache[key]
+
+    # dynamic programming over chain pair, key is (target chain, source chain, skip state)
+    # skip state 1 after skip target and 2 after skip source, skipping both levels is the same as match without score
+    def is_near_level(target_index, source_index):
+        # virtual root pair with every chain, other chains only with chain of close level and size
+        if target_index == target_root or source_index == source_root:
+            return True
+        target_chain = target_chains[target_index]
+        source_chain = source_chains[source_index]
+        return abs(target_chain["depth"] - source_chain["depth"]) <= MAX_SKIP_LEVELS and \
+            ratio(target_chain["size"], source_chain["size"]) >= MIN_SIZE_RATIO
+
+    def own_score(target_index, source_index):
+        if target_index == target_root or source_index == source_root:
+            return 0.0 if target_index == target_root and source_index == source_root else -math.inf
+        return local_score(target_index, source_index)
+
+    children_cache = {}
+
+    def children_pairs(target_index, source_index):
+        key = (target_index, source_index)
+        if key not in children_cache:
+            children_cache[key] = [(target_child, source_child) for target_child, source_child in candidate_children(
+                target_chains, source_chains, target_chains[target_index]["children"], source_chains[source_index]["children"])
+                if is_near_level(target_child, source_child)]
+        return children_cache[key]
+
+    def state_key(target_index, source_index, state):
+        # state only forbid skip on other side, same value as free state when other side has no children
+        if state == 1 and not source_chains[source_index]["children"] or state == 2 and not target_chains[target_index]["children"]:
+            state = 0
+        return (target_index, source_index, state)
+
+    def successors(key):
+        target_index, source_index, state = key
+        result = []
+        if own_score(target_index, source_index) > -math.inf:
+            result += [(target_child, source_child, 0)
+                       for target_child, source_child in children_pairs(target_index, source_index)]
+        if state != 2:
+            result += [state_key(target_child, source_index, 1) for target_child in target_chains[target_index]["children"]
+                       if is_near_level(target_child, source_index)]
+        if state != 1:
+            result += [state_key(target_index, source_child, 2) for source_child in source_chains[source_index]["children"]
+                       if is_near_level(target_index, source_child)]
+        return result
+
+    # iterative post order, deep rig (long spine with twigs) do not hit recursion limit
+    root_key = (target_root, source_root, 0)
+    order = []
+    visited = set()
+    stack = [(root_key, False)]
+    while stack:
+        key, is_expanded = stack.pop()
+        if is_expanded:
+            order.append(key)
+            continue
+        if key in visited:
+            continue
+        visited.add(key)
+        stack.append((key, True))
+        stack += [(successor, False)
+                  for successor in successors(key) if successor not in visited]
+
+    memo = {}
+    for key in order:
+        target_index, source_index, state = key
+        target_chain = target_chains[target_index]
+        source_chain = source_chains[source_index]
+
+        # option 1, match both chains then match children
+        own = own_score(target_index, source_index)
+        best = (-math.inf, None)
+        if own > -math.inf and not (target_chain["children"] and source_chain["children"]):
+            best = (own, ("match", []))
+        elif own > -math.inf:
+            pairs = children_pairs(target_index, source_index)
+            target_row = {child: row for row,
+                          child in enumerate(target_chain["children"])}
+            source_column = {child: column for column,
+                             child in enumerate(source_chain["children"])}
+            weights = np.zeros(
+                (len(target_chain["children"]), len(source_chain["children"])))
+            for target_child, source_child in pairs:
+                weights[target_row[target_child], source_column[source_child]] = memo[(
+                    target_child, source_child, 0)][0]
+            assigned = best_assignment(weights)
+            total = own + sum(weights[row, column] for row, column in assigned)
+            best = (total, ("match", [(target_chain["children"][row], source_chain["children"][column])
+                                      for row, column in assigned]))
+
+        # option 2, skip target chain level (extra bone on target)
+        if state != 2:
+            for target_child in target_chain["children"]:
+                if is_near_level(target_child, source_index):
+                    score = memo[state_key(
+                        target_child, source_index, 1)][0] - SKIP_COST
+                    if score > best[0]:
+                        best = (score, ("skip_target", target_child))
+
+        # option 3, skip source chain level
+        if state != 1:
+            for source_child in source_chain["children"]:
+                if is_near_level(target_index, source_child):
+                    score = memo[state_key(
+                        target_index, source_child, 2)][0] - SKIP_COST
+                    if score > best[0]:
+                        best = (score, ("skip_source", source_child))
+
+        if best[1] is None:
+            best = (0.0, ("match", []))
+
+        memo[key] = best
+
+    # walk decision to collect matched chains
+    matched_chains = []
+    stack = [root_key]
+    while stack:
+        target_index, source_index, state = stack.pop()
+        decision, value = memo[(target_index, source_index, state)][1]
+        if decision == "match":
+            if target_index != target_root and source_index != source_root:
+                matched_chains.append((target_index, source_index))
+            stack += [(target_child, source_child, 0)
+                      for target_child, source_child in value]
+        elif decision == "skip_target":
+            stack.append(state_key(value, source_index, 1))
+        else:
+            stack.append(state_key(target_index, value, 2))
+
+    # map bones inside chains, skip anchor bones and their source
+    anchored_sources = set(anchors.values())
+    pairs = []
+    for target_index, source_index in matched_chains:
+        confidence = max(0.0, min(1.0, chain_similarity(
+            target_chains[target_index], source_chains[source_index])))
+        for target, source, bone_confidence in align_chain_bones(target_chains[target_index], source_chains[source_index], confidence):
+            if target in anchors or source in anchored_sources:
+                continue
+            pairs.append((target, source, round(bone_confidence, 3)))
+
+    # keep target bone order
+    order = {name: index for index, (name, *_) in enumerate(target_bones)}
+    return sorted(pairs, key=lambda pair: order[pair[0]])
@@ -0,0 +1,100 @@
+import numpy as np
+from mathutils import Matrix, Quaternion
+from . array_math import matrix_to_quat
+from . world_solver import armature_rest_matrices, hierarchy_order
+
+
+def rotation_between(a, b):
+    # shortest arc rotation matrix turning unit vector a to unit vector b
+    axis = np.cross(a, b)
+    sine = np.linalg.norm(axis)
+    cosine = np.dot(a, b)
+    if sine < 1e-8:
+        if cosine > 0.0:
+            return np.eye(3)
+        # opposite, turn half around any perpendicular axis
+        perpendicular = np.cross(a, [1.0, 0.0, 0.0] if abs(a[0]) < 0.9 else [0.0, 1.0, 0.0])
+        axis = perpendicular / np.linalg.norm(perpendicular)
+        return 2.0 * np.outer(axis, axis) - np.eye(3)
+
+    axis = axis / sine
+    cross_matrix = np.array([
+        [0.0, -axis[2], axis[1]],
+        [axis[2], 0.0, -axis[0]],
+        [-axis[1], axis[0], 0.0],
+    ])
+    return np.eye(3) + sine * cross_matrix + (1.0 - cosine) * cross_matrix @ cross_matrix
+
+
+def pose_bases(target_object) -> dict:
+    # dict bone -> current matrix basis as numpy array
+    return {pose_bone.name: np.array(pose_bone.matrix_basis) for pose_bone in target_object.pose.bones}
+
+
+def match_pose_rotations(target_object, source_object, pairs: dict, bases: dict | None = None):
+    # pairs is dict target bone -> source bone, bases is dict bone -> matrix basis kept on bone, None for rest
+    # parent first, rotate every mapped target bone so its direction follow source rest direction in world space
+    # return dict target bone -> basis quaternion, location and scale of mapped bone and pose of unmapped bone are kept
+    bases = bases or {}
+    target_rest = armature_rest_matrices(target_object)
+    target_world = np.array(target_object.matrix_world.to_3x3().normalized())
+    source_world = np.array(source_object.matrix_world.to_3x3().normalized())
+    source_bones = source_object.data.bones
+
+    pose_matrices = {}
+    result = {}
+    for bone_name in hierarchy_order(target_rest):
+        parent_name, rest = target_rest[bone_name]
+        # rest relative to parent, then parent pose already matched
+        matrix = pose_matrices[parent_name] @ (np.linalg.inv(
+            target_rest[parent_name][1]) @ rest) if parent_name else rest.copy()
+        basis = bases.get(bone_name)
+        if basis is None:
+            basis = np.eye(4)
+
+        source_bone = source_bones.get(pairs.get(bone_name, ""))
+        if source_bone is None or source_bone.length < 1e-8:
+            pose_matrices[bone_name] = matrix @ basis
+            continue
+
+        # source direction in target armature space
+        direction = target_world.T @ (source_world @
+                                      np.array(source_bone.tail_local - source_bone.head_local))
+        direction = direction / np.linalg.norm(direction)
+
+        # bone point along its y axis
+        rotation = matrix[:3, :3] / np.linalg.norm(matrix[:3, :3], axis=0)
+        swing = rotation_between(rotation[:, 1], direction)
+        basis_rotation = rotation.T @ swing @ rotation
+
+        # basis is location, rotation then scale, only rotation is replaced
+        basis_matrix = np.eye(4)
+        basis_matrix[:3, 3] = basis[:3, 3]
+        basis_matrix[:3, :3] = basis_rotation @ np.diag(
+            np.linalg.norm(basis[:3, :3], axis=0))
+        pose_matrices[bone_name] = matrix @ basis_matrix
+        result[bone_name] = matrix_to_quat(basis_rotation)
+
+    return result
+
+
+def apply_pose_rotations(target_object, rotations: dict, reset_others: bool = False):
+    # write only rotation of matched bone in its rotation mode
+    # reset others put unmatched bones and location and scale of matched bones back to rest
+    for pose_bone in target_object.pose.bones:
+        quaternion = rotations.get(pose_bone.name)
+        if reset_others:
+            pose_bone.matrix_basis = Matrix.Identity(4)
+        if quaternion is None:
+            continue
+
+        quaternion = Quaternion(quaternion)
+        if pose_bone.rotation_mode == "QUATERNION":
+            pose_bone.rotation_quaternion = quaternion
+        elif pose_bone.rotation_mode == "AXIS_ANGLE":
+            axis, angle = quaternion.to_axis_angle()
+            pose_bone.rotation_axis_angle = (angle, *axis)
+        else:
+            # closest euler to current value, no flip on bone already near the pose
+            pose_bone.rotation_euler = quaternion.to_euler(
+                pose_bone.rotation_mode, pose_bone.rotation_euler)
@@ -4,84 +4,268 @@ from bpy import props
 from nodeitems_utils import NodeItem, register_node_categories, unregister_node_categories
 from bpy.utils import register_class, unregister_class
 from . node import ReNimNode, ReNimNodeCategory
+from . bone_chain import chain_weights, resolve_chain
 
 
-class ReNimNodeMappingBone(ReNimNode, Node):
+def bind_mapping_nodes(context, target_object, bone_nodes: list):
+    # bind many mapping nodes at once, switch mode only once for all nodes
+    if not bone_nodes:
+        return
+
+    # store current mode
+    old_mode = "OBJECT"
+
+    # store current active object
+    old_active_object = context.active_object
+
+    # change mode to object if current mode is not object
+    if context.mode != "OBJECT":
+        # overide current mode if not object
+        old_mode = context.active_object.mode if context.active_object else context.mode
+        bpy.ops.object.mode_set(mode="OBJECT")
+
+    # store selected object for seamless binding
+    selected_objects = context.selected_objects
+
+    # deselect all object
+    bpy.ops.object.select_all(action="DESELECT")
+
+    # active object to target object
+    context.view_layer.objects.active = target_object
+
+    # change mode to edit to add bone (expose edit_bones)
+    bpy.ops.object.mode_set(mode="EDIT")
+    # disbale mirror for preventing symmetrize bone
+    context.active_object.data.use_mirror_x = False  # type: ignore
+
+    # bone collections
+    bone_collection = target_object.data.collections.get("ReNimHelperBones")
+    assert bone_collection
+
+    for node in bone_nodes:
+        node.add_bone(bone_collection)
+
+    # we can use update_from_editmode() to update pose_bones collection and still can do add constarint and driver in edit mode
+    context.active_object.update_from_editmode()
+    for node in bone_nodes:
+        if node.is_bind_valid:
+            node.add_constraint_bone()
+
+    # change mode back to object
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    # deselect all object
+    bpy.ops.object.select_all(action="DESELECT")
+
+    # restore selected objects
+    for obj in selected_objects:
+        obj.select_set(True)
+
+    # change active object to old object
+    context.view_layer.objects.active = old_active_object
+
+    # change to old mode if not object
+    if old_mode != "OBJECT":
+        bpy.ops.object.mode_set(mode=old_mode)
+
+
+def unbind_mapping_nodes(context, target_object, bone_nodes: list):
+    # unbind many mapping nodes at once, switch mode only once for all nodes
+    if not bone_nodes:
+        return
+
+    # store current mode
+    old_mode = "OBJECT"
+
+    # store current active object
+    old_active_object = context.active_object
+
+    # change mode to object if current mode is not object
+    if context.mode != "OBJECT":
+        # overide current mode if not object
+        old_mode = context.active_object.mode if context.active_object else context.mode
+        bpy.ops.object.mode_set(mode="OBJECT")
+
+    # store selected object for seamless binding
+    selected_objects = context.selected_objects
+
+    # deselect all object
+    bpy.ops.object.select_all(action="DESELECT")
+
+    # active object to target object
+    context.view_layer.objects.active = target_object
+
+    # remove constraint and driver only on valid bone, no need to switch mode to pose
+    for node in bone_nodes:
+        if node.is_bind_valid:
+            node.remove_constraint_bone()
+
+    # change mode to edit to remove bone (expose edit_bones)
+    bpy.ops.object.mode_set(mode="EDIT")
+    # disbale mirror for preventing symmetrize bone
+    context.active_object.data.use_mirror_x = False  # type: ignore
+
+    for node in bone_nodes:
+        if node.is_bind_valid:
+            node.remove_bone()
+
+        node.is_bind_valid = False
+        # set color node
+        node.use_custom_color = False
+        node.is_bind = False
+
+    # change mode back to object
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    # deselect all object
+    bpy.ops.object.select_all(action="DESELECT")
+
+    # restore selected objects
+    for obj in selected_objects:
+        obj.select_set(True)
+
+    # change active object to old object
+    context.view_layer.objects.active = old_active_object
+
+    # change to old mode if not object
+    if old_mode != "OBJECT":
+        bpy.ops.object.mode_set(mode=old_mode)
+
+
+def update_mapping_preview(self, context):
+    # object node in preview re-solve only this bone from arrays in memory
+    from . preview import update_node_preview
+    update_node_preview(self)
+
+
+def update_mapping_preview_remap(self, context):
+    from . preview import update_node_preview
+    update_node_preview(self, is_remap=True)
+
+
+class ReNimNodeMapping:
+    """Shared live bind for mapping nodes"""
+
+    # compact node style, skip full parameter layout
+    compact: props.BoolProperty(default=False)  # type: ignore
+
+    def draw_compact(self, layout):
+        # one row layout, cheap to draw for big mapping
+        row = layout.row(align=True)
+        row.prop(self, "use_location", text="", icon="CON_LOCLIKE")
+        row.prop(self, "use_rotation_euler", text="", icon="CON_ROTLIKE")
+        row.prop(self, "use_scale", text="", icon="CON_SIZELIKE")
+        row.label(text=self.bone_source if self.bone_source else "NONE",
+                  icon="BONE_DATA")
+
+    def live_bind_bone(self):
+        # get node object
+        node_object = self.inputs[0].links[0].from_node
+
+        bind_mapping_nodes(
+            bpy.context, node_object.outputs[0].target_object, [self])
+
+    def live_unbind_bone(self):
+        if self.is_bind:
+            unbind_mapping_nodes(
+                bpy.context, self.inputs[0].target_object, [self])
+
+    def free(self):
+        if self.is_bind:
+            self.live_unbind_bone()
+
+
+class ReNimNodeMappingBone(ReNimNodeMapping, ReNimNode, Node):
     """ReNim node bone map"""
     bl_idname = "ReNimNodeMappingBone"
     bl_label = "Bone"
     bl_icon = "GROUP_BONE"
     bl_width_default = 300
 
-    use_location: props.BoolProperty(default=True)  # type: ignore
+    use_location: props.BoolProperty(  # type: ignore
+        default=True, update=update_mapping_preview)
     location_axis: props.BoolVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[True, True, True]
+        default=[True, True, True],
+        update=update_mapping_preview
     )
     location_influence: props.FloatVectorProperty(  # type: ignore
         size=3,
         min=0.0,
         max=1.0,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     location_multiply: props.FloatVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     location_offset: props.FloatVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[0.0, 0.0, 0.0]
+        default=[0.0, 0.0, 0.0],
+        update=update_mapping_preview
     )
-    use_rotation_euler: props.BoolProperty(default=True)  # type: ignore
+    use_rotation_euler: props.BoolProperty(  # type: ignore
+        default=True, update=update_mapping_preview)
     rotation_euler_axis: props.BoolVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[True, True, True]
+        default=[True, True, True],
+        update=update_mapping_preview
     )
     rotation_euler_influence: props.FloatVectorProperty(  # type: ignore
         size=3,
         min=0.0,
         max=1.0,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     rotation_euler_multiply: props.FloatVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     rotation_euler_offset: props.FloatVectorProperty(  # type: ignore
         size=3,
         unit="ROTATION",
         subtype="XYZ",
-        default=[0.0, 0.0, 0.0]
+        default=[0.0, 0.0, 0.0],
+        update=update_mapping_preview
     )
-    use_scale: props.BoolProperty(default=True)  # type: ignore
+    use_scale: props.BoolProperty(  # type: ignore
+        default=True, update=update_mapping_preview)
     scale_axis: props.BoolVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[True, True, True]
+        default=[True, True, True],
+        update=update_mapping_preview
     )
     scale_influence: props.FloatVectorProperty(  # type: ignore
         size=3,
         min=0.0,
         max=1.0,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     scale_multiply: props.FloatVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[1.0, 1.0, 1.0]
+        default=[1.0, 1.0, 1.0],
+        update=update_mapping_preview
     )
     scale_offset: props.FloatVectorProperty(  # type: ignore
         size=3,
         subtype="XYZ",
-        default=[0.0, 0.0, 0.0]
+        default=[0.0, 0.0, 0.0],
+        update=update_mapping_preview
     )
     mix_mode: props.EnumProperty(  # type: ignore
         name="Mix Mode",
@@ -90,17 +274,46 @@ class ReNimNodeMappingBone(ReNimNode, Node):
             ("BEFORE", "Before Original", "Apply copied transformation before original, as if the constraint target is a parent. Scale is handled specially to avoid creating shear"),
             ("AFTER", "After Original", "Apply copied transformation after original, as if the constraint target is a child. Scale is handled specially to avoid creating shear")
         ],
-        default="AFTER"
+        default="AFTER",
+        update=update_mapping_preview
     )
 
-    bone_target: props.StringProperty(default="")  # type: ignore
-    bone_source: props.StringProperty(default="")  # type: ignore
+    bone_target: props.StringProperty(  # type: ignore
+        default="", update=update_mapping_preview_remap)
+    bone_source: props.StringProperty(  # type: ignore
+        default="", update=update_mapping_preview_remap)
 
     is_bind: props.BoolProperty(default=False)  # type: ignore
     is_bind_valid: props.BoolProperty(default=False)  # type: ignore
 
     old_update: props.BoolProperty(default=False)  # type: ignore
 
+    # properties which define the mapping, used by preset and fingerprint
+    mapping_properties = [
+        "bone_target",
+        "bone_source",
+        "use_location",
+        "location_axis",
+        "location_influence",
+        "location_multiply",
+        "location_offset",
+        "use_rotation_euler",
+        "rotation_euler_axis",
+        "rotation_euler_influence",
+        "rotation_euler_multiply",
+        "rotation_euler_offset",
+        "use_scale",
+        "scale_axis",
+        "scale_influence",
+        "scale_multiply",
+        "scale_offset",
+        "mix_mode",
+    ]
+
+    def bake_bones(self, target_object):
+        # tuple list (bone name, *[transform to bake])
+        return [(self.bone_target, self.use_location, self.use_rotation_euler, self.use_scale)]
+
     def add_bone(self, bone_collection: BoneCollection):
         # get object socket
         socket = self.inputs[0].links[0].from_socket
@@ -418,168 +631,6 @@ class ReNimNodeMappingBone(ReNimNode, Node):
 
             mimic_source_bone.bone.driver_remove("hide")
 
-    def live_bind_bone(self):
-        socket_input = self.inputs[0]
-
-        # get node object
-        node_object = socket_input.links[0].from_node
-
-        # store current mode
-        old_mode = "OBJECT"
-
-        # store current active object
-        old_active_object = bpy.context.active_object
-
-        # change mode to object if current mode is not object
-        if bpy.context.mode != "OBJECT":
-            # overide current mode if not object
-            old_mode = bpy.context.active_object.mode if bpy.context.active_object else bpy.context.mode
-            bpy.ops.object.mode_set(mode="OBJECT")
-
-        # store selected object for seamless binding
-        selected_objects = bpy.context.selected_objects
-
-        # deselect all object
-        bpy.ops.object.select_all(action="DESELECT")
-
-        # select target and source object
-        # commented becuse we don't really need to select the object
-        # node_object.outputs[0].target_object.select_set(True)
-        # node_object.outputs[0].source_object.select_set(True)
-
-        # active object to target object
-        bpy.context.view_layer.objects.active = node_object.outputs[0].target_object
-
-        # change mode to edit to add bone (expose edit_bones)
-        bpy.ops.object.mode_set(mode="EDIT")
-        # disbale mirror for preventing symmetrize bone
-        bpy.context.active_object.data.use_mirror_x = False  # type: ignore
-
-        # bone collections
-        collections = node_object.outputs[0].target_object.data.collections
-        bone_collection = collections.get("ReNimHelperBones")
-        assert bone_collection
-
-        self.add_bone(
-            bone_collection
-        )
-
-        # change mode to pose to add constraint and driver
-        # commented becuse we don't really need to switch mode to pose
-        # bpy.ops.object.mode_set(mode="POSE")
-        # we can use update_from_editmode() to update pose_bones collection and still can do add constarint and driver in edit mode
-        bpy.context.active_object.update_from_editmode()
-        if self.is_bind_valid:
-            self.add_constraint_bone()
-
-        # change mode back to object
-        bpy.ops.object.mode_set(mode="OBJECT")
-
-        # deselect all object
-        bpy.ops.object.select_all(action="DESELECT")
-
-        # restore selected objects
-        for obj in selected_objects:
-            obj.select_set(True)
-
-        # change active object to old object
-        bpy.context.view_layer.objects.active = old_active_object
-
-        # change to old mode if not object
-        if old_mode != "OBJECT":
-            bpy.ops.object.mode_set(mode=old_mode)
-
-    def live_unbind_bone(self):
-        if self.is_bind:
-            # target and source object
-            target_object = self.inputs[0].target_object
-            # source_object = self.inputs[0].source_object
-
-            # store current mode
-            old_mode = "OBJECT"
-
-            # store current active object
-            old_active_object = bpy.context.active_object
-
-            # change mode to object if current mode is not object
-            if bpy.context.mode != "OBJECT":
-                old_mode = bpy.context.active_object.mode if bpy.context.active_object else bpy.context.mode
-                bpy.ops.object.mode_set(mode="OBJECT")
-
-            # store selected object for seamless binding
-            selected_objects = bpy.context.selected_objects
-
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
-
-            # select target and source object
-            # commented becuse we don't really need to select the object
-            # target_object.select_set(True)
-            # source_object.select_set(True)
-
-            # active object to target object
-            bpy.context.view_layer.objects.active = target_object
-
-            # change mode to pose to remove constraint and driver only on valid bone
-            # commented becuse we don't really need to switch mode to pose
-            # bpy.ops.object.mode_set(mode="POSE")
-
-            if self.is_bind_valid:
-                self.remove_constraint_bone()
-
-            # change mode to edit to remove bone (expose edit_bones)
-            bpy.ops.object.mode_set(mode="EDIT")
-            # disbale mirror for preventing symmetrize bone
-            bpy.context.active_object.data.use_mirror_x = False  # type: ignore
-
-            if self.is_bind_valid:
-                self.remove_bone()
-
-            self.is_bind_valid = False
-            # set color node
-            self.use_custom_color = False
-            self.is_bind = False
-
-            # change mode back to object
-            bpy.ops.object.mode_set(mode="OBJECT")
-
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
-
-            # restore selected objects
-            for obj in selected_objects:
-                obj.select_set(True)
-
-            # change active object to old object
-            bpy.context.view_layer.objects.active = old_active_object
-
-            # change to old mode if not object
-            if old_mode != "OBJECT":
-                bpy.ops.object.mode_set(mode=old_mode)
-
-    def update(self):
-        socket_input = self.inputs[0]
-        # detect if node link change
-        is_state_change = not (socket_input.is_linked == self.old_update)
-
-        if is_state_change:
-            if socket_input.is_linked:
-                # get node object
-                node_object = socket_input.links[0].from_node
-                # check is source target node is bind and bind bone
-                if node_object.is_bind:
-                    self.live_bind_bone()
-            else:
-                # unbind bone if node is binded
-                if self.is_bind:
-                    self.live_unbind_bone()
-
-        self.old_update = socket_input.is_linked
-
-    def free(self):
-        if self.is_bind:
-            self.live_unbind_bone()
-
     def init(self, context):
         self.color = (0.1, 0.55, 0.25)
         self.use_custom_color = False
@@ -587,6 +638,10 @@ class ReNimNodeMappingBone(ReNimNode, Node):
                         "Target").display_shape = "DIAMOND"
 
     def draw_buttons(self, context, layout):
+        if self.compact:
+            self.draw_compact(layout)
+            return
+
         row = layout.row()
         split = row.split(factor=0.3)
         col = split.column()
@@ -644,6 +699,10 @@ class ReNimNodeMappingBone(ReNimNode, Node):
             if len(links) and links[0].from_socket.source_object is not None and links[0].from_socket.source_object.type == "ARMATURE":
                 col.prop_search(
                     self, "bone_source", self.inputs[0].links[0].from_socket.source_object.pose, "bones", text="")
+            elif len(links) and getattr(links[0].from_node, "source_bvh_bones", None):
+                # bones of virtual source from file
+                col.prop_search(
+                    self, "bone_source", links[0].from_node, "source_bvh_bones", text="")
             else:
                 col.prop(self, "bone_source", text="", icon="BONE_DATA")
         else:
@@ -654,14 +713,455 @@ class ReNimNodeMappingBone(ReNimNode, Node):
         return self.bone_target if self.bone_target else "Bone"
 
 
+def update_chain_constraints(self, context):
+    # apply node parameter directly to bound constraints, chain node has no driver
+    if self.is_bind_valid and self.inputs[0].target_object:
+        self.update_constraint_bone()
+
+
+class ReNimNodeMappingChain(ReNimNodeMapping, ReNimNode, Node):
+    """ReNim node bone chain map"""
+    bl_idname = "ReNimNodeMappingChain"
+    bl_label = "Chain"
+    bl_icon = "LINKED"
+    bl_width_default = 300
+
+    use_location: props.BoolProperty(  # type: ignore
+        default=False, update=update_chain_constraints)
+    use_rotation_euler: props.BoolProperty(  # type: ignore
+        default=True, update=update_chain_constraints)
+    use_scale: props.BoolProperty(  # type: ignore
+        default=False, update=update_chain_constraints)
+    influence: props.FloatProperty(  # type: ignore
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype="FACTOR",
+        update=update_chain_constraints
+    )
+    mix_mode: props.EnumProperty(  # type: ignore
+        name="Mix Mode",
+        description="Specify how the copied and existing transformations are combined",
+        items=[
+            ("BEFORE", "Before Original", "Apply copied transformation before original, as if the constraint target is a parent. Scale is handled specially to avoid creating shear"),
+            ("AFTER", "After Original", "Apply copied transformation after original, as if the constraint target is a child. Scale is handled specially to avoid creating shear")
+        ],
+        default="AFTER",
+        update=update_chain_constraints
+    )
+
+    # chain from start bone to end bone, empty end bone follow single child
+    bone_target: props.StringProperty(default="")  # type: ignore
+    bone_target_end: props.StringProperty(default="")  # type: ignore
+    bone_source: props.StringProperty(default="")  # type: ignore
+    bone_source_end: props.StringProperty(default="")  # type: ignore
+
+    is_bind: props.BoolProperty(default=False)  # type: ignore
+    is_bind_valid: props.BoolProperty(default=False)  # type: ignore
+
+    old_update: props.BoolProperty(default=False)  # type: ignore
+
+    # properties which define the mapping, used by preset and fingerprint
+    mapping_properties = [
+        "bone_target",
+        "bone_target_end",
+        "bone_source",
+        "bone_source_end",
+        "use_location",
+        "use_rotation_euler",
+        "use_scale",
+        "influence",
+        "mix_mode",
+    ]
+
+    def chain_names(self, target_bones, source_bones):
+        # tuple (target bone names, source bone names, weights)
+        target_chain = resolve_chain(
+            target_bones, self.bone_target, self.bone_target_end)
+        source_chain = resolve_chain(
+            source_bones, self.bone_source, self.bone_source_end)
+        weights = chain_weights([bone.length for bone in target_chain], [
+                                bone.length for bone in source_chain])
+        return [bone.name for bone in target_chain], [bone.name for bone in source_chain], weights
+
+    def bake_bones(self, target_object):
+        # tuple list (bone name, *[transform to bake]), location only on first bone of chain
+        target_chain = resolve_chain(
+            target_object.data.bones, self.bone_target, self.bone_target_end)
+        return [(bone.name, self.use_location and index == 0, self.use_rotation_euler, self.use_scale) for index, bone in enumerate(target_chain)]
+
+    def mimic_bones(self, bones, target_name: str):
+        # mimic target then its ancestors, edit bones or pose bones
+        # bind from older version still has mimic source and rotation bones as parents
+        mimic_bone = bones.get("TARGET_" + self.name + "_" + target_name)
+        result = []
+        while mimic_bone:
+            result.append(mimic_bone)
+            mimic_bone = mimic_bone.parent
+        return result
+
+    def add_bone(self, bone_collection: BoneCollection):
+        # get object socket
+        socket = self.inputs[0].links[0].from_socket
+
+        # target and source object
+        target_object = socket.target_object
+        source_object = socket.source_object
+
+        # store object to socket input node for removing constraint and bone
+        self.inputs[0].target_object = target_object
+        self.inputs[0].source_object = source_object
+
+        # edit bones target and data bones source, same as bone node
+        target_object_edit_bones = target_object.data.edit_bones
+        source_object_bones = source_object.data.bones
+
+        target_names, source_names, _ = self.chain_names(
+            target_object_edit_bones, source_object_bones)
+
+        if target_names and source_names:
+            # one mimic target per chain bone, oriented as target bone
+            # every source rotation is converted to its orientation by constraint, no helper per source bone
+            for target_name in target_names:
+                target_bone = target_object_edit_bones[target_name]
+                mimic_target_bone = target_object_edit_bones.new(
+                    "TARGET_" + self.name + "_" + target_name)
+                # not deform
+                mimic_target_bone.use_deform = False
+                # set length new bone
+                mimic_target_bone.length = 0.001
+                # make bone unable to select
+                mimic_target_bone.hide_select = True
+                # add to bone collection
+                bone_collection.assign(mimic_target_bone)
+                # change bone orientation base on rotation
+                mimic_target_bone.matrix = target_bone.matrix.to_quaternion().to_matrix().to_4x4()
+
+            self.is_bind_valid = True
+            # set color node
+            self.color = (0.1, 0.55, 0.25)
+        else:
+            self.is_bind_valid = False
+            # set color node
+            self.color = (0.55, 0.1, 0.1)
+
+        self.use_custom_color = True
+        self.is_bind = True
+
+    def remove_bone(self):
+        # target object
+        target_object = self.inputs[0].target_object
+
+        # remove object from socket input node
+        self.inputs[0].target_object = None
+        self.inputs[0].source_object = None
+
+        target_object_edit_bones = target_object.data.edit_bones
+
+        for target_bone in resolve_chain(target_object_edit_bones, self.bone_target, self.bone_target_end):
+            # remove mimic target and helpers of older bind if exist
+            for mimic_bone in self.mimic_bones(target_object_edit_bones, target_bone.name):
+                target_object_edit_bones.remove(mimic_bone)
+
+    def add_constraint_bone(self):
+        # get object socket
+        socket = self.inputs[0].links[0].from_socket
+
+        # target and source object
+        target_object = socket.target_object
+        source_object = socket.source_object
+
+        target_object_pose_bones = target_object.pose.bones
+
+        target_names, source_names, weights = self.chain_names(
+            target_object.data.bones, source_object.data.bones)
+
+        # one set of constraint per chain bone and no driver, parameter applied in update_constraint_bone
+        # source local transform is read in mimic target orientation (local space owner orientation)
+        for index, target_name in enumerate(target_names):
+            target_bone = target_object_pose_bones.get(target_name)
+            mimic_target_bone = target_object_pose_bones.get(
+                "TARGET_" + self.name + "_" + target_name)
+
+            if not (target_bone and mimic_target_bone):
+                continue
+
+            # location only from first bone of chain
+            if index == 0:
+                const_location = mimic_target_bone.constraints.new(
+                    "COPY_LOCATION")
+                const_location.name = "RENIM_LOCATION"
+                const_location.target = source_object
+                const_location.subtarget = source_names[0]
+                const_location.owner_space = "LOCAL"
+                const_location.target_space = "LOCAL_OWNER_ORIENT"
+
+            # redistribute rotation of every source bone overlap this target bone
+            # stacked in chain order, each applied after previous like parented source bones
+            for source_index, weight in enumerate(weights[index]):
+                if weight <= 0.0:
+                    continue
+                const_rotation = mimic_target_bone.constraints.new(
+                    "COPY_ROTATION")
+                const_rotation.name = "RENIM_ROTATION_" + str(source_index)
+                const_rotation.target = source_object
+                const_rotation.subtarget = source_names[source_index]
+                const_rotation.owner_space = "LOCAL"
+                const_rotation.target_space = "LOCAL_OWNER_ORIENT"
+                const_rotation.mix_mode = "AFTER"
+                const_rotation.influence = min(weight, 1.0)
+
+            # scale from source bone with biggest share
+            const_scale = mimic_target_bone.constraints.new("COPY_SCALE")
+            const_scale.name = "RENIM_SCALE"
+            const_scale.target = source_object
+            const_scale.subtarget = source_names[max(
+                range(len(source_names)), key=lambda i: weights[index][i])]
+            const_scale.owner_space = "LOCAL"
+            const_scale.target_space = "LOCAL_OWNER_ORIENT"
+
+            # add constraint on target bone to copy transform from mimic target
+            const_copy_transform_target_bone = target_bone.constraints.new(
+                "COPY_TRANSFORMS")
+            const_copy_transform_target_bone.show_expanded = False
+            const_copy_transform_target_bone.name = "RENIM_TRANSFORM_" + self.name
+            const_copy_transform_target_bone.subtarget = mimic_target_bone.name
+            const_copy_transform_target_bone.target = target_object
+            const_copy_transform_target_bone.owner_space = "LOCAL"
+            const_copy_transform_target_bone.target_space = "LOCAL_WITH_PARENT"
+
+            # make bone unselectable and hidden
+            mimic_target_bone.bone.hide_select = True
+            mimic_target_bone.bone.hide = True
+
+        self.update_constraint_bone()
+
+    def update_constraint_bone(self):
+        target_object = self.inputs[0].target_object
+        target_object_pose_bones = target_object.pose.bones
+
+        for target_bone in resolve_chain(target_object_pose_bones, self.bone_target, self.bone_target_end):
+            const_copy_transform_target_bone = target_bone.constraints.get(
+                "RENIM_TRANSFORM_" + self.name)
+            if const_copy_transform_target_bone:
+                const_copy_transform_target_bone.mix_mode = self.mix_mode
+                const_copy_transform_target_bone.influence = self.influence
+
+            for mimic_bone in self.mimic_bones(target_object_pose_bones, target_bone.name):
+                for const in mimic_bone.constraints:
+                    if const.type == "COPY_LOCATION":
+                        const.enabled = self.use_location
+                    elif const.type == "COPY_ROTATION":
+                        const.enabled = self.use_rotation_euler
+                    elif const.type == "COPY_SCALE":
+                        const.enabled = self.use_scale
+
+    def remove_constraint_bone(self):
+        # target object
+        target_object = self.inputs[0].target_object
+        target_object_pose_bones = target_object.pose.bones
+
+        # constraint on mimic bones removed together with the bones
+        for target_bone in resolve_chain(target_object_pose_bones, self.bone_target, self.bone_target_end):
+            const_copy_transform_target_bone = target_bone.constraints.get(
+                "RENIM_TRANSFORM_" + self.name)
+            if const_copy_transform_target_bone:
+                target_bone.constraints.remove(
+                    const_copy_transform_target_bone)
+
+    def init(self, context):
+        self.color = (0.1, 0.55, 0.25)
+        self.use_custom_color = False
+        self.inputs.new("ReNimSocketSourceTarget",
+                        "Target").display_shape = "DIAMOND"
+
+    def draw_buttons(self, context, layout):
+        if self.compact:
+            self.draw_compact(layout)
+            return
+
+        row = layout.row()
+        split = row.split(factor=0.3)
+        col = split.column()
+        col.alignment = "RIGHT"
+        col.label(text="Transform")
+        col.label(text="Influence")
+        col.label(text="Mix")
+        col.label(text="Target Start")
+        col.label(text="Target End")
+        col.label(text="Source Start")
+        col.label(text="Source End")
+        col = split.column()
+        row = col.row(align=True)
+        row.prop(self, "use_location", text="Location", toggle=True)
+        row.prop(self, "use_rotation_euler", text="Rotation", toggle=True)
+        row.prop(self, "use_scale", text="Scale", toggle=True)
+        col.prop(self, "influence", text="", slider=True)
+        col.prop(self, "mix_mode", text="")
+        col = col.column()
+        col.enabled = not self.is_bind
+
+        links = self.inputs[0].links if self.inputs[0].is_linked else []
+        target_object = links[0].from_socket.target_object if len(
+            links) else None
+        source_object = links[0].from_socket.source_object if len(
+            links) else None
+
+        for prop_name, obj in [("bone_target", target_object), ("bone_target_end", target_object), ("bone_source", source_object), ("bone_source_end", source_object)]:
+            if obj is not None and obj.type == "ARMATURE":
+                col.prop_search(self, prop_name, obj.pose, "bones", text="")
+            else:
+                col.prop(self, prop_name, text="", icon="BONE_DATA")
+
+    def draw_label(self):
+        return self.bone_target if self.bone_target else "Chain"
+
+
+CHANNEL_TYPES = [
+    ("PROPERTY", "Custom Property", "Custom property of object", "PROPERTIES", 0),
+    ("SHAPE_KEY", "Shape Key", "Shape key value of mesh", "SHAPEKEY_DATA", 1),
+]
+
+REMAP_CURVES = [
+    ("LINEAR", "Linear", "Straight remap from input range to output range"),
+    ("SMOOTH", "Smooth", "Smoothstep, ease in and out"),
+    ("EASE_IN", "Ease In", "Slow start, power of exponent"),
+    ("EASE_OUT", "Ease Out", "Slow end, power of exponent"),
+]
+
+
+class ReNimNodeMappingProperty(ReNimNode, Node):
+    """ReNim node custom property and shape key map, sampled and written on bake without constraint"""
+    bl_idname = "ReNimNodeMappingProperty"
+    bl_label = "Property"
+    bl_icon = "PROPERTIES"
+    bl_width_default = 300
+
+    source_type: props.EnumProperty(  # type: ignore
+        name="Source Type",
+        items=CHANNEL_TYPES,
+        default="PROPERTY"
+    )
+    # empty owner use source or target armature of object node
+    source_object: props.PointerProperty(  # type: ignore
+        name="Source Owner",
+        type=bpy.types.Object
+    )
+    source_name: props.StringProperty(default="")  # type: ignore
+    target_type: props.EnumProperty(  # type: ignore
+        name="Target Type",
+        items=CHANNEL_TYPES,
+        default="PROPERTY"
+    )
+    target_object: props.PointerProperty(  # type: ignore
+        name="Target Owner",
+        type=bpy.types.Object
+    )
+    target_name: props.StringProperty(default="")  # type: ignore
+
+    input_min: props.FloatProperty(default=0.0)  # type: ignore
+    input_max: props.FloatProperty(default=1.0)  # type: ignore
+    output_min: props.FloatProperty(default=0.0)  # type: ignore
+    output_max: props.FloatProperty(default=1.0)  # type: ignore
+    remap_curve: props.EnumProperty(  # type: ignore
+        name="Remap Curve",
+        items=REMAP_CURVES,
+        default="LINEAR"
+    )
+    curve_exponent: props.FloatProperty(  # type: ignore
+        default=2.0, min=0.01)
+    use_clamp: props.BoolProperty(default=True)  # type: ignore
+    gain: props.FloatProperty(default=1.0)  # type: ignore
+
+    # properties which define the mapping, used by fingerprint
+    mapping_properties = [
+        "source_type",
+        "source_name",
+        "target_type",
+        "target_name",
+        "input_min",
+        "input_max",
+        "output_min",
+        "output_max",
+        "remap_curve",
+        "curve_exponent",
+        "use_clamp",
+        "gain",
+    ]
+
+    def init(self, context):
+        self.color = (0.1, 0.55, 0.25)
+        self.use_custom_color = False
+        self.inputs.new("ReNimSocketSourceTarget",
+                        "Target").display_shape = "DIAMOND"
+
+    def draw_channel(self, layout, prefix: str, armature_object):
+        owner = getattr(self, prefix + "_object") or armature_object
+        layout.prop(self, prefix + "_type", text="")
+        layout.prop(self, prefix + "_object", text="")
+        shape_keys = getattr(owner.data, "shape_keys",
+                             None) if owner is not None else None
+        if getattr(self, prefix + "_type") == "SHAPE_KEY" and shape_keys is not None:
+            layout.prop_search(self, prefix + "_name",
+                               shape_keys, "key_blocks", text="")
+        else:
+            layout.prop(self, prefix + "_name", text="", icon="PROPERTIES")
+
+    def draw_buttons(self, context, layout):
+        links = self.inputs[0].links if self.inputs[0].is_linked else []
+        target_object = links[0].from_socket.target_object if len(
+            links) else None
+        source_object = links[0].from_socket.source_object if len(
+            links) else None
+
+        row = layout.row()
+        split = row.split(factor=0.3)
+        col = split.column()
+        col.alignment = "RIGHT"
+        col.label(text="Target")
+        col.label(text="Owner")
+        col.label(text="Name")
+        col.label(text="Source")
+        col.label(text="Owner")
+        col.label(text="Name")
+        col.label(text="Input Range")
+        col.label(text="Output Range")
+        col.label(text="Curve")
+        col.label(text="Gain")
+        col = split.column()
+        self.draw_channel(col, "target", target_object)
+        self.draw_channel(col, "source", source_object)
+        row = col.row(align=True)
+        row.prop(self, "input_min", text="Min")
+        row.prop(self, "input_max", text="Max")
+        row = col.row(align=True)
+        row.prop(self, "output_min", text="Min")
+        row.prop(self, "output_max", text="Max")
+        row = col.row(align=True)
+        row.prop(self, "remap_curve", text="")
+        sub_row = row.row(align=True)
+        sub_row.enabled = self.remap_curve in ["EASE_IN", "EASE_OUT"]
+        sub_row.prop(self, "curve_exponent", text="Exponent")
+        row = col.row(align=True)
+        row.prop(self, "gain", text="")
+        row.prop(self, "use_clamp", text="Clamp", toggle=True)
+
+    def draw_label(self):
+        return self.target_name if self.target_name else "Property"
+
+
 classes = [
-    ReNimNodeMappingBone
+    ReNimNodeMappingBone,
+    ReNimNodeMappingChain,
+    ReNimNodeMappingProperty,
 ]
 
 
 node_categories = [
     ReNimNodeCategory("RENIM_MAPPING", "Mapping", items=[  # type: ignore
-        NodeItem("ReNimNodeMappingBone")  # type: ignore
+        NodeItem("ReNimNodeMappingBone"),  # type: ignore
+        NodeItem("ReNimNodeMappingChain"),  # type: ignore
+        NodeItem("ReNimNodeMappingProperty"),  # type: ignore
     ]),
     ReNimNodeCategory("RENIM_LAYOUT", "Layout", items=[  # type: ignore
         NodeItem("NodeFrame")  # type: ignore
@@ -1,12 +1,37 @@
 from typing import cast
 import bpy
-from bpy.types import Context, Node, NodeSocket, Operator, PropertyGroup
+from bpy.types import Context, Node, NodeSocket, Operator, PropertyGroup, UIList
 from bpy.utils import register_class, unregister_class
 from bpy import props
+from mathutils import Vector
 from nodeitems_utils import NodeItem, register_node_categories, unregister_node_categories
 from . node import ReNimNode, ReNimNodeCategory
-from . node_mapping import ReNimNodeMappingBone
-from . editor_type_operator import ReNimOperatorAddAdditionalBoneToBake, ReNimOperatorBakeAction, ReNimOperatorConnectSelectedBoneNodes, ReNimOperatorCreateBoneNodeFromSelectedBones, ReNimOperatorLoadPreset, ReNimOperatorRemoveAdditionalBoneToBake, ReNimOperatorSavePreset, ReNimOperatorToggleBind
+from . node_mapping import ReNimNodeMapping, bind_mapping_nodes, unbind_mapping_nodes
+from . editor_type import batch_tree_update
+from . bvh import BVHMotion, read_bvh_bone_names
+from . bake_file import BAKE_FILE_EXTENSION
+from . editor_type_operator import AUTO_MAP_METHODS, SAMPLE_MODES, ReNimOperatorAcceptAutoMapReview, ReNimOperatorAddAdditionalBoneToBake, ReNimOperatorAddCrowdTarget, ReNimOperatorAutoMapBones, ReNimOperatorRemoveAutoMapReview, ReNimOperatorBakeAction, ReNimOperatorBakeAll, ReNimOperatorCleanupBakeActions, ReNimOperatorFilterRotations, ReNimOperatorRemoveCrowdTarget, ReNimOperatorConnectSelectedBoneNodes, ReNimOperatorCreateBoneNodeFromSelectedBones, ReNimOperatorFindLibraryPresets, ReNimOperatorLoadBestLibraryPreset, ReNimOperatorLoadPreset, ReNimOperatorMatchPose, ReNimOperatorQualityReport, ReNimOperatorRemoveAdditionalBoneToBake, ReNimOperatorSavePreset, ReNimOperatorSetCompactBoneNodes, ReNimOperatorToggleBind, ReNimOperatorTogglePreview
+from . preview import get_preview, stop_preview
+
+SOURCE_TYPES = [
+    ("ARMATURE", "Armature", "Source motion from armature in scene"),
+    ("BVH", "BVH File", "Stream source motion from BVH file without import, bake without bind")
+]
+
+BAKE_METHODS = [
+    ("CONSTRAINT", "Constraint", "Evaluate bind constraints of source and target every frame"),
+    ("CACHE", "Source Cache", "Sample source once to disk cache, solve mapping from cached arrays without bind"),
+    ("WORLD", "World Solver", "Sample source once to disk cache, solve bone rotation in armature space top-down and root translation, without bind")
+]
+
+# batch created bone nodes layout
+BONE_NODES_PER_COLUMN = 10
+BONE_NODE_SPACING = 450
+
+
+class ReNimGroupPropertyBoneName(PropertyGroup):
+    # only name, for bone search of virtual source
+    pass
 
 
 class ReNimGroupPropertyBakeBone(PropertyGroup):
@@ -18,6 +43,153 @@ class ReNimGroupPropertyBakeBone(PropertyGroup):
     )
 
 
+class ReNimGroupPropertyBoneMatch(PropertyGroup):
+    bone_target: props.StringProperty(default="")  # type: ignore
+    bone_source: props.StringProperty(default="")  # type: ignore
+    confidence: props.FloatProperty(  # type: ignore
+        default=0.0,
+        min=0.0,
+        max=1.0,
+        subtype="FACTOR"
+    )
+
+
+class ReNimGroupPropertyCrowdTarget(PropertyGroup):
+    target_object: props.PointerProperty(  # type: ignore
+        type=bpy.types.Object,
+        poll=lambda self, obj: obj.type == "ARMATURE"
+    )
+
+
+class ReNimGroupPropertyLibraryPreset(PropertyGroup):
+    # name is preset path relative to preset library
+    filepath: props.StringProperty(default="", subtype="FILE_PATH")  # type: ignore
+    coverage: props.FloatProperty(  # type: ignore
+        default=0.0,
+        min=0.0,
+        max=1.0,
+        subtype="FACTOR"
+    )
+    matched: props.IntProperty(default=0)  # type: ignore
+
+
+class ReNimGroupPropertyBoneQuality(PropertyGroup):
+    # name is target bone name
+    bone_source: props.StringProperty(default="")  # type: ignore
+    node_name: props.StringProperty(default="")  # type: ignore
+    # position in rig height unit, orientation in degree
+    position_rms: props.FloatProperty(default=0.0)  # type: ignore
+    position_max: props.FloatProperty(default=0.0)  # type: ignore
+    orientation_rms: props.FloatProperty(default=0.0)  # type: ignore
+    orientation_max: props.FloatProperty(default=0.0)  # type: ignore
+    sliding: props.FloatProperty(default=0.0)  # type: ignore
+    jitter: props.FloatProperty(default=0.0)  # type: ignore
+    is_over_threshold: props.BoolProperty(default=False)  # type: ignore
+
+
+class ReNimUIListMappingNodes(UIList):
+    """Mapping table, one row per mapping node linked to object node"""
+    bl_idname = "RENIM_UL_mapping_nodes"
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        # status from bind state
+        if item.is_bind and not item.is_bind_valid:
+            layout.alert = True
+            status_icon = "ERROR"
+        elif item.is_bind:
+            status_icon = "CHECKMARK"
+        else:
+            status_icon = "BLANK1"
+
+        row = layout.row(align=True)
+        row.label(text="", icon=status_icon)
+
+        sub_row = row.row(align=True)
+        sub_row.enabled = not item.is_bind
+        sub_row.prop(item, "bone_target", text="", emboss=False)
+        sub_row.prop(item, "bone_source", text="", emboss=False)
+
+        row.prop(item, "use_location", text="", icon="CON_LOCLIKE")
+        row.prop(item, "use_rotation_euler", text="", icon="CON_ROTLIKE")
+        row.prop(item, "use_scale", text="", icon="CON_SIZELIKE")
+
+    def filter_items(self, context, data, propname):
+        nodes = getattr(data, propname)
+        # list id is object node name
+        node_object = data.nodes.get(self.list_id)
+        filter_name = self.filter_name.lower()
+
+        # only mapping node linked to object node
+        flags = []
+        for node in nodes:
+            visible = isinstance(node, ReNimNodeMapping) and node.inputs[0].is_linked and node.inputs[
+                0].links[0].from_node == node_object
+            if visible and filter_name:
+                visible = filter_name in node.bone_target.lower() or filter_name in node.bone_source.lower()
+            flags.append(self.bitflag_filter_item if visible else 0)
+
+        order = []
+        if self.use_filter_sort_alpha:
+            order = bpy.types.UI_UL_list.sort_items_helper(
+                [(index, getattr(node, "bone_target", "")) for index, node in enumerate(nodes)], key=lambda item: item[1].lower())
+
+        return flags, order
+
+
+class ReNimUIListBoneQuality(UIList):
+    """Quality report, one row per mapped bone, sorted by selected metric"""
+    bl_idname = "RENIM_UL_bone_quality"
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.alert = item.is_over_threshold
+
+        row = layout.row(align=True)
+        row.label(text=item.name, icon="ERROR" if item.is_over_threshold else "BONE_DATA")
+        row.label(text="{:.1%}".format(item.position_rms))
+        row.label(text="{:.1f}\u00b0".format(item.orientation_rms))
+        row.label(text="{:.2%}".format(item.sliding))
+        row.label(text="{:.2%}".format(item.jitter))
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        filter_name = self.filter_name.lower()
+
+        flags = [self.bitflag_filter_item if not filter_name or filter_name in item.name.lower() else 0
+                 for item in items]
+
+        # worst bone first for selected metric
+        ranked = sorted(range(len(items)), key=lambda index: -
+                        getattr(items[index], data.quality_sort))
+        order = [0] * len(items)
+        for position, index in enumerate(ranked):
+            order[index] = position
+
+        return flags, order
+
+
+def update_source_bvh(self, context):
+    # read bvh hierarchy once, bone names used by bone node search and auto map
+    self.source_bvh_bones.clear()
+    for bone_name in read_bvh_bone_names(bpy.path.abspath(self.source_bvh)):
+        self.source_bvh_bones.add().name = bone_name
+
+
+def update_quality_report_index(self, context):
+    # make mapping node of selected row active node
+    if 0 <= self.quality_report_index < len(self.quality_report):
+        node = self.id_data.nodes.get(
+            self.quality_report[self.quality_report_index].node_name)
+        if node:
+            self.id_data.nodes.active = node
+
+
+def update_mapping_table_index(self, context):
+    # make selected row active node
+    nodes = self.id_data.nodes
+    if 0 <= self.mapping_table_index < len(nodes):
+        nodes.active = nodes[self.mapping_table_index]
+
+
 class ReNimNodeObjectSourceTarget(ReNimNode, Node):
     '''ReNim node source and target'''
     bl_idname = "ReNimNodeObjectSourceTarget"
@@ -32,9 +204,197 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
     unbind_after_bake: props.BoolProperty(default=False)  # type: ignore
     additional_bone_to_bake: props.CollectionProperty(  # type: ignore
         type=ReNimGroupPropertyBakeBone)
+    crowd_targets: props.CollectionProperty(  # type: ignore
+        type=ReNimGroupPropertyCrowdTarget)
+    crowd_collection: props.PointerProperty(  # type: ignore
+        type=bpy.types.Collection)
+    auto_map_threshold: props.FloatProperty(  # type: ignore
+        default=0.75,
+        min=0.0,
+        max=1.0,
+        subtype="FACTOR"
+    )
+    auto_map_method: props.EnumProperty(  # type: ignore
+        name="Method",
+        items=AUTO_MAP_METHODS,
+        default="NAME"
+    )
+    match_pose_reset_others: props.BoolProperty(  # type: ignore
+        name="Reset Others",
+        description="Match Pose also reset unmatched bones and location and scale of matched bones to rest",
+        default=False
+    )
+    auto_map_review: props.CollectionProperty(  # type: ignore
+        type=ReNimGroupPropertyBoneMatch)
+    library_presets: props.CollectionProperty(  # type: ignore
+        type=ReNimGroupPropertyLibraryPreset)
+    show_mapping_table: props.BoolProperty(default=False)  # type: ignore
+    show_bake_options: props.BoolProperty(default=False)  # type: ignore
+    show_library_presets: props.BoolProperty(default=False)  # type: ignore
+    show_crowd_targets: props.BoolProperty(default=False)  # type: ignore
+    mapping_table_index: props.IntProperty(  # type: ignore
+        default=-1, update=update_mapping_table_index)
+    bake_reuse: props.EnumProperty(  # type: ignore
+        name="Reuse Bake",
+        description="Reuse previous bake when target rig and mapping are identical",
+        items=[
+            ("NONE", "None", "Always bake"),
+            ("LINK", "Link", "Assign existing baked action"),
+            ("COPY", "Copy", "Assign copy of existing baked action")
+        ],
+        default="LINK"
+    )
+
+    quality_report: props.CollectionProperty(  # type: ignore
+        type=ReNimGroupPropertyBoneQuality)
+    quality_report_index: props.IntProperty(  # type: ignore
+        default=-1, update=update_quality_report_index)
+    show_quality_report: props.BoolProperty(default=False)  # type: ignore
+    quality_sort: props.EnumProperty(  # type: ignore
+        name="Sort",
+        items=[
+            ("position_rms", "Position", "Sort by position RMS error"),
+            ("orientation_rms", "Orientation", "Sort by orientation RMS error"),
+            ("sliding", "Sliding", "Sort by foot sliding"),
+            ("jitter", "Jitter", "Sort by jitter")
+        ],
+        default="position_rms"
+    )
+    quality_position_threshold: props.FloatProperty(  # type: ignore
+        name="Position Threshold",
+        description="Maximal position RMS error in part of rig height",
+        default=0.05,
+        min=0.0,
+        subtype="FACTOR"
+    )
+    quality_orientation_threshold: props.FloatProperty(  # type: ignore
+        name="Orientation Threshold",
+        description="Maximal orientation RMS error in degree",
+        default=15.0,
+        min=0.0
+    )
+    sample_mode: props.EnumProperty(  # type: ignore
+        name="Sample Mode",
+        items=SAMPLE_MODES,
+        default="STEP"
+    )
+    sample_tolerance: props.FloatProperty(  # type: ignore
+        name="Tolerance",
+        description="Maximal difference between sampled transform and linear interpolation of kept keyframes",
+        default=0.001,
+        min=0.00001,
+        precision=5
+    )
+    world_normalize: props.BoolProperty(  # type: ignore
+        name="Normalize Proportion",
+        description="Scale root translation by target and source leg length ratio",
+        default=True
+    )
+    use_root_motion: props.BoolProperty(  # type: ignore
+        name="Root Motion",
+        description="Extract hips motion on ground to root bone before keyframes are written",
+        default=False
+    )
+    root_motion_bone: props.StringProperty(  # type: ignore
+        name="Root Bone",
+        description="Target bone receiving extracted motion",
+        default=""
+    )
+    root_motion_hips: props.StringProperty(  # type: ignore
+        name="Hips Bone",
+        description="Target bone whose motion is projected to root and removed from it",
+        default=""
+    )
+    root_motion_axes: props.BoolVectorProperty(  # type: ignore
+        name="Translation",
+        description="Extract hips translation on armature X and Y axes",
+        size=2,
+        default=(True, True)
+    )
+    root_motion_rotation: props.BoolProperty(  # type: ignore
+        name="Rotation Z",
+        description="Extract hips heading around armature Z axis",
+        default=False
+    )
+    root_motion_smoothing: props.IntProperty(  # type: ignore
+        name="Smoothing",
+        description="Moving average window in baked frames, 0 for none",
+        default=0,
+        min=0
+    )
+    bake_output: props.EnumProperty(  # type: ignore
+        name="Bake Output",
+        items=[
+            ("ACTION", "Action", "Write baked transforms to new action"),
+            ("FILE", "Array File", "Stream baked local transforms to compact file, no action is created")
+        ],
+        default="ACTION"
+    )
+    bake_filepath: props.StringProperty(  # type: ignore
+        name="Bake File",
+        subtype="FILE_PATH",
+        default="//bake" + BAKE_FILE_EXTENSION
+    )
+    bake_method: props.EnumProperty(  # type: ignore
+        name="Bake Method",
+        items=BAKE_METHODS,
+        default="CONSTRAINT"
+    )
+
+    source_type: props.EnumProperty(  # type: ignore
+        name="Source",
+        items=SOURCE_TYPES,
+        default="ARMATURE"
+    )
+    source_bvh: props.StringProperty(  # type: ignore
+        name="BVH File",
+        subtype="FILE_PATH",
+        default="",
+        update=update_source_bvh
+    )
+    source_bvh_scale: props.FloatProperty(  # type: ignore
+        name="BVH Scale",
+        description="BVH unit to Blender unit, 0.01 for centimeter",
+        default=1.0,
+        min=0.0001
+    )
+    source_bvh_bones: props.CollectionProperty(  # type: ignore
+        type=ReNimGroupPropertyBoneName)
 
     is_bind: props.BoolProperty(default=False)  # type: ignore
 
+    def is_virtual_source(self):
+        # source motion come from file, mapping is solved from arrays instead bind
+        return self.source_type == "BVH"
+
+    def is_array_bake(self):
+        # mapping solved from arrays, target is not evaluated by constraint
+        return self.is_virtual_source() or self.bake_method != "CONSTRAINT"
+
+    def is_constraint_sampling(self):
+        # adaptive sampling evaluate scene, only for bake from bind constraints
+        return not self.is_array_bake()
+
+    def get_source_motion(self):
+        return BVHMotion(bpy.path.abspath(self.source_bvh), self.source_bvh_scale)
+
+    def get_crowd_targets(self):
+        # additional target armatures, receive the same baked motion as target object
+        socket_object_out = self.outputs[0]
+        crowd_objects = [data.target_object for data in self.crowd_targets]
+        if self.crowd_collection:
+            crowd_objects += list(self.crowd_collection.all_objects)
+
+        crowd_targets = []
+        for obj in crowd_objects:
+            if obj is None or obj.type != "ARMATURE" or obj in crowd_targets:
+                continue
+            if obj is socket_object_out.target_object or obj is socket_object_out.source_object:
+                continue
+            crowd_targets.append(obj)
+
+        return crowd_targets
+
     def toggle_bind(self, context: Context, operator: Operator):
         if self.is_bind:
             self.unbind(context, operator)
@@ -56,67 +416,9 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
             # bind all connected nodes bone
             # filter only bone nodes and not bind
             bone_nodes = [link.to_node for link in self.outputs[0].links if isinstance(
-                link.to_node, ReNimNodeMappingBone) and not link.to_node.is_bind]
-
-            # store current mode
-            old_mode = "OBJECT"
-
-            # store current active object
-            old_active_object = context.active_object
-
-            # change mode to object if current mode is not object
-            if bpy.context.mode != "OBJECT":
-                # overide current mode if not object
-                old_mode = context.active_object.mode if context.active_object else context.mode
-                bpy.ops.object.mode_set(mode="OBJECT")
-
-            # store selected object for seamless binding
-            selected_objects = context.selected_objects
-
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
-
-            # select target and source object
-            # commented becuse we don't really need to select the object
-            # self.outputs[0].target_object.select_set(True)
-            # self.outputs[0].source_object.select_set(True)
-
-            # active object to target object
-            context.view_layer.objects.active = self.outputs[0].target_object
-
-            # change mode to edit to add bone (expose edit_bones)
-            bpy.ops.object.mode_set(mode="EDIT")
-            # disbale mirror for preventing symmetrize bone
-            bpy.context.active_object.data.use_mirror_x = False  # type: ignore
+                link.to_node, ReNimNodeMapping) and not link.to_node.is_bind]
 
-            for node in bone_nodes:
-                node.add_bone(bone_collection)
-
-            # change mode to pose to add constraint and driver only on valid bone
-            # commented becuse we don't really need to switch mode to pose
-            # bpy.ops.object.mode_set(mode="POSE")
-            # we can use update_from_editmode() to update pose_bones collection and still can do add constarint and driver in edit mode
-            context.active_object.update_from_editmode()
-            for node in bone_nodes:
-                if node.is_bind_valid:
-                    node.add_constraint_bone()
-
-            # change mode back to object
-            bpy.ops.object.mode_set(mode="OBJECT")
-
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
-
-            # restore selected objects
-            for obj in selected_objects:
-                obj.select_set(True)
-
-            # change active object to old object
-            context.view_layer.objects.active = old_active_object
-
-            # change to old mode if not object
-            if old_mode != "OBJECT":
-                bpy.ops.object.mode_set(mode=old_mode)
+            self.bind_bone_nodes(context, bone_nodes)
 
         # set color node
         self.color = (0.1, 0.55, 0.25)
@@ -140,76 +442,52 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
             # bind all connected nodes bone
             # filter only bone nodes and bind
             bone_nodes = [link.to_node for link in self.outputs[0].links if isinstance(
-                link.to_node, ReNimNodeMappingBone) and link.to_node.is_bind]
+                link.to_node, ReNimNodeMapping) and link.to_node.is_bind]
 
-            # store current mode
-            old_mode = "OBJECT"
+            self.unbind_bone_nodes(context, bone_nodes)
 
-            # store current active object
-            old_active_object = context.active_object
-
-            # change mode to object if current mode is not object
-            if bpy.context.mode != "OBJECT":
-                # overide current mode if not object
-                old_mode = context.active_object.mode if context.active_object else context.mode
-                bpy.ops.object.mode_set(mode="OBJECT")
-
-            # store selected object for seamless binding
-            selected_objects = context.selected_objects
-
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
-
-            # select target and source object
-            # commented becuse we don't really need to select the object
-            # self.outputs[0].target_object.select_set(True)
-            # self.outputs[0].source_object.select_set(True)
+        # set color node
+        self.use_custom_color = False
 
-            # active object to target object
-            context.view_layer.objects.active = self.outputs[0].target_object
+        self.is_bind = False
+        operator.report({"INFO"}, "Unbind Success")
 
-            # change mode to pose to remove constraint and driver only on valid bone
-            # commented becuse we don't really need to switch mode to pose
-            # bpy.ops.object.mode_set(mode='POSE')
-            for node in bone_nodes:
-                if node.is_bind_valid:
-                    node.remove_constraint_bone()
+    def bind_bone_nodes(self, context: Context, bone_nodes: list):
+        bind_mapping_nodes(context, self.outputs[0].target_object, bone_nodes)
 
-            # change mode to edit to remove bone (expose edit_bones)
-            bpy.ops.object.mode_set(mode="EDIT")
-            # disbale mirror for preventing symmetrize bone
-            # context.active_object.data.use_mirror_x = False
+    def unbind_bone_nodes(self, context: Context, bone_nodes: list):
+        unbind_mapping_nodes(
+            context, self.outputs[0].target_object, bone_nodes)
 
-            for node in bone_nodes:
-                if node.is_bind_valid:
-                    node.remove_bone()
+    def new_bone_nodes(self, context: Context, pairs: list):
+        # create bone nodes from list of tuple (bone target, bone source) and bind them in one batch
+        node_group = self.id_data
+        links = node_group.links
 
-                node.is_bind_valid = False
-                # set color node
-                node.use_custom_color = False
-                node.is_bind = False
+        bone_nodes = []
+        # new links bind in one batch when leaving batch update
+        with batch_tree_update(node_group):
+            for index, (bone_target, bone_source) in enumerate(pairs):
+                # crate bone node
+                bone_node = node_group.nodes.new("ReNimNodeMappingBone")
 
-            # change mode back to object
-            bpy.ops.object.mode_set(mode="OBJECT")
+                # set location, arrange nodes in columns next to object node
+                bone_node.location = Vector((self.width + 100 + (index // BONE_NODES_PER_COLUMN) * (bone_node.width + 50),
+                                             -(index % BONE_NODES_PER_COLUMN) * BONE_NODE_SPACING)) + self.location
 
-            # deselect all object
-            bpy.ops.object.select_all(action="DESELECT")
+                # set bone to node
+                bone_node.bone_target = bone_target
+                bone_node.bone_source = bone_source
 
-            # restore selected objects
-            for obj in selected_objects:
-                obj.select_set(True)
+                # unselect bone node
+                bone_node.select = False
 
-            # change active object to old object
-            context.view_layer.objects.active = old_active_object
+                # link node socket to bone node socket
+                links.new(self.outputs[0], bone_node.inputs[0])
 
-            # change to old mode if not object
-            if old_mode != "OBJECT":
-                bpy.ops.object.mode_set(mode=old_mode)
-        # set color node
-        self.use_custom_color = False
+                bone_nodes.append(bone_node)
 
-        self.is_bind = False
-        operator.report({"INFO"}, "Unbind Success")
+        return bone_nodes
 
     def init(self, context):
         self.outputs.new("ReNimSocketSourceTarget",
@@ -219,6 +497,8 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
         pass
 
     def free(self):
+        # restore target action before node is removed
+        stop_preview(self)
         node_tree_name = cast(str, self.id_data.name)  # type: ignore
         node_name = self.name
         assert isinstance(node_tree_name, str)
@@ -230,19 +510,28 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
             )
 
     def draw_buttons(self, context, layout):
+        # only everyday controls on node, other sections are drawn in sidebar by draw_buttons_ext
         node_tree_name = cast(str, self.id_data.name)  # type: ignore
         node_name = self.name
         assert isinstance(node_tree_name, str)
 
         row = layout.row()
         row.enabled = bool(self.outputs[0].target_object) and bool(
-            self.outputs[0].source_object)
+            self.outputs[0].source_object) and (self.is_bind or not self.is_virtual_source())
         row.scale_y = 1.5
         operator_toggle_bind = cast(ReNimOperatorToggleBind, row.operator(  # I don't like it
             ReNimOperatorToggleBind.bl_idname, text="Bind" if not self.is_bind else "Unbind"))
         operator_toggle_bind.node_tree_name = node_tree_name
         operator_toggle_bind.node_source_target_name = node_name
 
+        row = layout.row()
+        row.enabled = not self.is_bind
+        row.prop(self, "source_type", expand=True)
+        if self.is_virtual_source():
+            col = layout.column(align=True)
+            col.prop(self, "source_bvh", text="")
+            col.prop(self, "source_bvh_scale")
+
         col = layout.column(align=True)
         col.scale_y = 1.5
 
@@ -258,6 +547,25 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
         operator_create_bone_node_from_selected_bones.node_tree_name = node_tree_name
         operator_create_bone_node_from_selected_bones.node_source_target_name = node_name
 
+        row = col.row(align=True)
+        row.enabled = bool(self.outputs[0].target_object) and (bool(
+            self.outputs[0].source_object) or bool(self.is_virtual_source() and self.source_bvh_bones))
+        operator_auto_map_bones = cast(ReNimOperatorAutoMapBones, row.operator(
+            ReNimOperatorAutoMapBones.bl_idname))
+        operator_auto_map_bones.node_tree_name = node_tree_name
+        operator_auto_map_bones.node_source_target_name = node_name
+        operator_auto_map_bones.threshold = self.auto_map_threshold
+        operator_auto_map_bones.method = self.auto_map_method
+        row.prop(self, "auto_map_method", text="")
+        row.prop(self, "auto_map_threshold", text="", slider=True)
+
+        if self.auto_map_review:
+            # pair list is in sidebar, node only accept or remove all
+            row = layout.row()
+            row.label(text="{} Bone Pairs To Review".format(
+                len(self.auto_map_review)), icon="INFO")
+            self.draw_review_buttons(row, -1)
+
         row = layout.row(align=True)
         row.scale_y = 1.5
         operator_load_preset = cast(ReNimOperatorLoadPreset, row.operator(ReNimOperatorLoadPreset.bl_idname,
@@ -276,18 +584,20 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
         col.alignment = "RIGHT"
         col.label(text="Action Name")
         col.label(text="Start Frame")
-        col.label(text="End Frame")
+        # virtual source bake the whole clip
+        if not self.is_virtual_source():
+            col.label(text="End Frame")
         col.label(text="Frame Step")
-        col.label(text="Unbind After Bake")
         col = split.column()
         col.row().prop(self, "action_name", text="")
         col.row().prop(self, "start_frame", text="")
-        col.row().prop(self, "end_frame", text="")
+        if not self.is_virtual_source():
+            col.row().prop(self, "end_frame", text="")
         col.row().prop(self, "frame_step", text="")
-        col.row().prop(self, "unbind_after_bake", text="")
 
         row = layout.row()
-        row.enabled = bool(self.outputs[0].target_object) and self.is_bind
+        row.enabled = bool(self.outputs[0].target_object) and (
+            self.is_bind or bool(self.is_virtual_source() and self.source_bvh) or bool(not self.is_virtual_source() and self.bake_method != "CONSTRAINT" and self.outputs[0].source_object))
         row.scale_y = 1.5
         operator_bake_action = cast(ReNimOperatorBakeAction, row.operator(
             ReNimOperatorBakeAction.bl_idname))
@@ -298,6 +608,12 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
         operator_bake_action.end_frame = self.end_frame
         operator_bake_action.frame_step = self.frame_step
         operator_bake_action.unbind_after_bake = self.unbind_after_bake
+        operator_bake_action.sample_mode = self.sample_mode
+        operator_bake_action.sample_tolerance = self.sample_tolerance
+
+        # all bound object nodes of every tree share one frame sweep
+        row = layout.row()
+        row.operator(ReNimOperatorBakeAll.bl_idname, icon="RENDER_ANIMATION")
 
         row = layout.row()
         row.label(text="Additional Bone To Bake")
@@ -331,12 +647,282 @@ class ReNimNodeObjectSourceTarget(ReNimNode, Node):
         operator_add_bone.node_tree_name = node_tree_name
         operator_add_bone.node_source_target_name = node_name
 
+    def draw_review_buttons(self, layout, index):
+        # index -1 accept or remove every pair
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        operator_accept_review = cast(ReNimOperatorAcceptAutoMapReview, layout.operator(
+            ReNimOperatorAcceptAutoMapReview.bl_idname, icon="CHECKMARK", text=""))
+        operator_accept_review.node_tree_name = node_tree_name
+        operator_accept_review.node_source_target_name = node_name
+        operator_accept_review.index = index
+        operator_remove_review = cast(ReNimOperatorRemoveAutoMapReview, layout.operator(
+            ReNimOperatorRemoveAutoMapReview.bl_idname, icon="X", text=""))
+        operator_remove_review.node_tree_name = node_tree_name
+        operator_remove_review.node_source_target_name = node_name
+        operator_remove_review.index = index
+
+    def draw_auto_map_review(self, context, layout):
+        box = layout.box()
+        row = box.row()
+        row.label(text="Review Bone Pairs")
+        self.draw_review_buttons(row, -1)
+
+        for index, data in enumerate(self.auto_map_review):
+            row = box.row(align=True)
+            row.prop(data, "bone_target", text="", icon="BONE_DATA")
+            row.prop(data, "bone_source", text="", icon="BONE_DATA")
+            row.label(text="{:.0%}".format(data.confidence))
+            self.draw_review_buttons(row, index)
+
+    def draw_match_pose(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        # rest pose alignment before bind
+        row = layout.row(align=True)
+        row.enabled = not self.is_bind and not self.is_virtual_source() and bool(
+            self.outputs[0].target_object and self.outputs[0].source_object)
+        for apply_as_rest, text in [(False, "Match Pose"), (True, "Match As Rest")]:
+            operator_match_pose = cast(ReNimOperatorMatchPose, row.operator(
+                ReNimOperatorMatchPose.bl_idname, text=text, icon="ARMATURE_DATA" if not apply_as_rest else "POSE_HLT"))
+            operator_match_pose.node_tree_name = node_tree_name
+            operator_match_pose.node_source_target_name = node_name
+            operator_match_pose.apply_as_rest = apply_as_rest
+            operator_match_pose.reset_others = self.match_pose_reset_others
+        row.prop(self, "match_pose_reset_others", text="", icon="LOOP_BACK")
+
+    def draw_library_presets(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        row = layout.row(align=True)
+        row.enabled = bool(self.outputs[0].target_object) and bool(
+            self.outputs[0].source_object)
+        operator_find_library_presets = cast(ReNimOperatorFindLibraryPresets, row.operator(
+            ReNimOperatorFindLibraryPresets.bl_idname, icon="VIEWZOOM"))
+        operator_find_library_presets.node_tree_name = node_tree_name
+        operator_find_library_presets.node_source_target_name = node_name
+        operator_load_best_library_preset = cast(ReNimOperatorLoadBestLibraryPreset, row.operator(
+            ReNimOperatorLoadBestLibraryPreset.bl_idname, icon="SORT_DESC"))
+        operator_load_best_library_preset.node_tree_name = node_tree_name
+        operator_load_best_library_preset.node_source_target_name = node_name
+
+        if self.library_presets:
+            box = layout.box()
+            for data in self.library_presets:
+                row = box.row(align=True)
+                row.label(text=data.name, icon="PRESET")
+                row.label(text="{:.0%} ({})".format(
+                    data.coverage, data.matched))
+                # load directly without file browser
+                row.operator_context = "EXEC_DEFAULT"
+                operator_load_preset = cast(ReNimOperatorLoadPreset, row.operator(
+                    ReNimOperatorLoadPreset.bl_idname, icon="EXPORT", text=""))
+                operator_load_preset.node_tree_name = node_tree_name
+                operator_load_preset.node_source_target_name = node_name
+                operator_load_preset.filepath = data.filepath
+
+    def draw_bake_options(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        row = layout.row()
+        split = row.split(factor=0.4)
+        col = split.column()
+        col.alignment = "RIGHT"
+        col.label(text="Unbind After Bake")
+        col.label(text="Reuse Bake")
+        col.label(text="Bake Output")
+        if self.bake_output == "FILE":
+            col.label(text="Bake File")
+        if not self.is_virtual_source():
+            col.label(text="Bake Method")
+            if self.bake_method == "WORLD":
+                col.label(text="Normalize Proportion")
+        if self.is_constraint_sampling():
+            col.label(text="Sample Mode")
+            if self.sample_mode == "ADAPTIVE":
+                col.label(text="Tolerance")
+        col = split.column()
+        col.row().prop(self, "unbind_after_bake", text="")
+        col.row().prop(self, "bake_reuse", text="")
+        col.row().prop(self, "bake_output", text="")
+        if self.bake_output == "FILE":
+            col.row().prop(self, "bake_filepath", text="")
+        if not self.is_virtual_source():
+            col.row().prop(self, "bake_method", text="")
+            if self.bake_method == "WORLD":
+                col.row().prop(self, "world_normalize", text="")
+        if self.is_constraint_sampling():
+            col.row().prop(self, "sample_mode", text="")
+            if self.sample_mode == "ADAPTIVE":
+                col.row().prop(self, "sample_tolerance", text="")
+
+        row = layout.row()
+        operator_filter_rotations = cast(ReNimOperatorFilterRotations, row.operator(
+            ReNimOperatorFilterRotations.bl_idname, icon="IPO_EASE_IN_OUT"))
+        operator_filter_rotations.node_tree_name = node_tree_name
+        operator_filter_rotations.node_source_target_name = node_name
+        row.operator(ReNimOperatorCleanupBakeActions.bl_idname,
+                     text="", icon="TRASH")
+
+    def draw_preview(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        row = layout.row()
+        row.enabled = bool(self.outputs[0].target_object) and bool(
+            self.source_bvh if self.is_virtual_source() else self.outputs[0].source_object)
+        is_preview = get_preview(self) is not None
+        operator_toggle_preview = cast(ReNimOperatorTogglePreview, row.operator(
+            ReNimOperatorTogglePreview.bl_idname, text="Stop Preview" if is_preview else "Preview", icon="HIDE_OFF", depress=is_preview))
+        operator_toggle_preview.node_tree_name = node_tree_name
+        operator_toggle_preview.node_source_target_name = node_name
+
+    def draw_crowd_targets(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        row = layout.row()
+        split = row.split(factor=0.4)
+        col = split.column()
+        col.alignment = "RIGHT"
+        col.label(text="Collection")
+        col = split.column()
+        col.prop(self, "crowd_collection", text="")
+
+        for index, data in enumerate(self.crowd_targets):
+            row = layout.row(align=True)
+            row.prop(data, "target_object", text="")
+            operator_remove_crowd_target = cast(ReNimOperatorRemoveCrowdTarget, row.operator(
+                ReNimOperatorRemoveCrowdTarget.bl_idname, icon="X", text=""))
+            operator_remove_crowd_target.node_tree_name = node_tree_name
+            operator_remove_crowd_target.node_source_target_name = node_name
+            operator_remove_crowd_target.index = index
+
+        row = layout.row()
+        row.scale_y = 1.5
+        operator_add_crowd_target = cast(ReNimOperatorAddCrowdTarget, row.operator(
+            ReNimOperatorAddCrowdTarget.bl_idname))
+        operator_add_crowd_target.node_tree_name = node_tree_name
+        operator_add_crowd_target.node_source_target_name = node_name
+
+    def draw_root_motion(self, context, layout):
+        target_object = self.outputs[0].target_object
+
+        row = layout.row()
+        split = row.split(factor=0.4)
+        col = split.column()
+        col.alignment = "RIGHT"
+        col.label(text="Root Bone")
+        col.label(text="Hips Bone")
+        col.label(text="Translation")
+        col.label(text="Rotation")
+        col.label(text="Smoothing")
+        col = split.column()
+        for prop_name in ["root_motion_bone", "root_motion_hips"]:
+            if target_object:
+                col.row().prop_search(self, prop_name,
+                                      target_object.pose, "bones", text="")
+            else:
+                col.row().prop(self, prop_name, icon="BONE_DATA", text="")
+        row = col.row(align=True)
+        row.prop(self, "root_motion_axes", text="X", toggle=True, index=0)
+        row.prop(self, "root_motion_axes", text="Y", toggle=True, index=1)
+        col.row().prop(self, "root_motion_rotation", toggle=True)
+        col.row().prop(self, "root_motion_smoothing", text="")
+
+    def draw_mapping_table(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        # ui list only draw visible rows
+        layout.template_list(ReNimUIListMappingNodes.bl_idname, node_name,
+                             self.id_data, "nodes", self, "mapping_table_index", rows=8)
+
+        row = layout.row(align=True)
+        for compact, text in [(True, "Compact Nodes"), (False, "Full Nodes")]:
+            operator_set_compact = cast(ReNimOperatorSetCompactBoneNodes, row.operator(
+                ReNimOperatorSetCompactBoneNodes.bl_idname, text=text))
+            operator_set_compact.node_tree_name = node_tree_name
+            operator_set_compact.node_source_target_name = node_name
+            operator_set_compact.compact = compact
+
+    def draw_quality_report(self, context, layout):
+        node_tree_name = cast(str, self.id_data.name)  # type: ignore
+        node_name = self.name
+
+        col = layout.column(align=True)
+        col.prop(self, "quality_position_threshold")
+        col.prop(self, "quality_orientation_threshold")
+
+        row = layout.row()
+        row.enabled = bool(self.outputs[0].target_object and self.outputs[0].source_object) and not self.is_virtual_source()
+        operator_quality_report = cast(ReNimOperatorQualityReport, row.operator(
+            ReNimOperatorQualityReport.bl_idname, icon="GRAPH"))
+        operator_quality_report.node_tree_name = node_tree_name
+        operator_quality_report.node_source_target_name = node_name
+
+        if not self.quality_report:
+            return
+
+        row = layout.row()
+        row.prop(self, "quality_sort", expand=True)
+
+        row = layout.row(align=True)
+        for text in ["Bone", "Position", "Orientation", "Sliding", "Jitter"]:
+            row.label(text=text)
+
+        # ui list id is object node name
+        layout.template_list(ReNimUIListBoneQuality.bl_idname, node_name,
+                             self, "quality_report", self, "quality_report_index", rows=8)
+
+    def draw_section(self, context, layout, prop_name, text, draw):
+        # collapsed section skip drawing its body
+        row = layout.row()
+        is_open = getattr(self, prop_name)
+        row.prop(self, prop_name, text=text,
+                 icon="TRIA_DOWN" if is_open else "TRIA_RIGHT", emboss=False)
+        if is_open:
+            draw(context, layout)
+
+    def draw_buttons_ext(self, context, layout):
+        # sidebar, every section beside preview is collapsed by default
+        self.draw_preview(context, layout)
+        if self.auto_map_review:
+            self.draw_auto_map_review(context, layout)
+        self.draw_match_pose(context, layout)
+        self.draw_section(context, layout, "show_bake_options",
+                          "Bake Options", self.draw_bake_options)
+        self.draw_section(context, layout, "show_mapping_table",
+                          "Mapping Table", self.draw_mapping_table)
+        self.draw_section(context, layout, "show_quality_report",
+                          "Quality Report", self.draw_quality_report)
+        self.draw_section(context, layout, "show_library_presets",
+                          "Library Presets", self.draw_library_presets)
+        self.draw_section(context, layout, "show_crowd_targets",
+                          "Crowd Targets", self.draw_crowd_targets)
+
+        row = layout.row()
+        row.prop(self, "use_root_motion")
+        if self.use_root_motion:
+            self.draw_root_motion(context, layout)
+
     def draw_label(self):
         return "Target and Source Object"
 
 
 classes = [
+    ReNimUIListMappingNodes,
+    ReNimUIListBoneQuality,
+    ReNimGroupPropertyBoneQuality,
+    ReNimGroupPropertyBoneName,
     ReNimGroupPropertyBakeBone,
+    ReNimGroupPropertyBoneMatch,
+    ReNimGroupPropertyCrowdTarget,
+    ReNimGroupPropertyLibraryPreset,
     ReNimNodeObjectSourceTarget,
 ]
 
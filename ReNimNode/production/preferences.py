@@ -0,0 +1,60 @@
+import os
+import tempfile
+import bpy
+from bpy.types import AddonPreferences
+from bpy import props
+from bpy.utils import register_class, unregister_class
+
+# add-on module name, production package live inside it
+ADDON_NAME = __package__.rpartition(".")[0]
+
+
+class ReNimAddonPreferences(AddonPreferences):
+    bl_idname = ADDON_NAME
+
+    preset_library: props.StringProperty(  # type: ignore
+        name="Preset Library",
+        description="Directory with preset files, indexed to find preset for current armatures",
+        subtype="DIR_PATH",
+        default=""
+    )
+    source_cache_directory: props.StringProperty(  # type: ignore
+        name="Source Cache",
+        description="Directory for sampled source motion, empty use system temporary directory",
+        subtype="DIR_PATH",
+        default=""
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "preset_library")
+        row = layout.row()
+        row.prop(self, "source_cache_directory")
+        # operator registered by editor type operator module
+        row.operator("renim.clear_source_cache", text="", icon="TRASH")
+
+
+def get_preferences(context):
+    return context.preferences.addons[ADDON_NAME].preferences
+
+
+def get_source_cache_directory(context):
+    directory = get_preferences(context).source_cache_directory
+    if directory:
+        return bpy.path.abspath(directory)
+    return os.path.join(tempfile.gettempdir(), "renim_source_cache")
+
+
+classes = [
+    ReNimAddonPreferences
+]
+
+
+def register():
+    for x in classes:
+        register_class(x)
+
+
+def unregister():
+    for x in reversed(classes):
+        unregister_class(x)
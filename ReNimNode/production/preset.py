@@ -0,0 +1,202 @@
+import gzip
+import json
+from mathutils import Vector
+from . node_mapping import ReNimNodeMapping, ReNimNodeMappingProperty
+from . editor_type import batch_tree_update
+from . preset_format import LAYOUT_PROPERTIES, PRESET_VERSION, PROPERTY_NODE_TYPE, preset_rows
+
+# node color for mapping with missing bone, same as invalid bind
+INVALID_COLOR = (0.55, 0.1, 0.1)
+
+
+def preset_value(value):
+    # rna array to list so json can write it
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    return list(value)
+
+
+def save_preset(filepath: str, node_source_target, compress: bool = False):
+    node_group = node_source_target.id_data
+
+    # get mapping node, property node and frame from node group
+    nodes = [node for node in node_group.nodes if node.type ==
+             "FRAME" or isinstance(node, (ReNimNodeMapping, ReNimNodeMappingProperty))]
+
+    # header, layout properties then mapping properties of every node type
+    properties = list(LAYOUT_PROPERTIES)
+    for node in nodes:
+        for prop_name in getattr(node, "mapping_properties", []):
+            if prop_name not in properties:
+                properties.append(prop_name)
+
+    values = [[] for _ in properties]
+    for node in nodes:
+        location = (node.location + node.parent.location) - node_source_target.location if node.parent else \
+            node.location - node_source_target.location
+        layout = {
+            "type": "NodeFrame" if node.type == "FRAME" else node.bl_idname,
+            "name": node.name,
+            "label": node.label,
+            "location": list(location),
+            "width": node.width,
+            "height": node.height,
+            "hide": node.hide,
+            "parent": node.parent.name if node.parent else None,
+        }
+        mapping_properties = getattr(node, "mapping_properties", [])
+        for column, prop_name in zip(values, properties):
+            if prop_name in layout:
+                column.append(layout[prop_name])
+            else:
+                column.append(preset_value(getattr(node, prop_name))
+                              if prop_name in mapping_properties else None)
+
+    text = json.dumps({
+        "version": PRESET_VERSION,
+        "count": len(nodes),
+        "properties": properties,
+        "values": values,
+    }, separators=(",", ":"))
+
+    if compress:
+        with gzip.open(filepath, "wt", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        with open(filepath, "w") as file:
+            file.write(text)
+
+    return len(nodes)
+
+
+def apply_node_layout(node, node_data: dict, origin):
+    node.label = node_data["label"]
+    node.width = node_data["width"]
+    node.height = node_data["height"]
+    node.hide = node_data["hide"]
+    node.location = Vector(node_data["location"]) + origin
+
+    # unselect node
+    node.select = False
+
+
+def apply_mapping_properties(node, node_data: dict):
+    # set only changed value, unchanged property skip rna update
+    is_change = False
+    for prop_name in getattr(node, "mapping_properties", []):
+        value = node_data.get(prop_name)
+        if value is not None and preset_value(getattr(node, prop_name)) != value:
+            setattr(node, prop_name, value)
+            is_change = True
+    return is_change
+
+
+def flag_invalid_node(node):
+    node.color = INVALID_COLOR
+    node.use_custom_color = True
+
+
+def node_merge_key(node):
+    # property node is keyed by its channels, mapping node by its bones
+    if isinstance(node, ReNimNodeMappingProperty):
+        return (node.bl_idname, node.target_type + ":" + node.target_name, node.source_type + ":" + node.source_name)
+    return (node.bl_idname, node.bone_target, node.bone_source)
+
+
+def row_merge_key(node_data: dict):
+    if node_data["type"] == PROPERTY_NODE_TYPE:
+        return (node_data["type"], "{}:{}".format(node_data.get("target_type") or "", node_data.get("target_name") or ""),
+                "{}:{}".format(node_data.get("source_type") or "", node_data.get("source_name") or ""))
+    return (node_data["type"], node_data.get("bone_target") or "", node_data.get("bone_source") or "")
+
+
+def load_preset(data: dict, node_source_target, flagged: set | None = None):
+    # create all nodes in one batch, tree update dispatch only once at the end
+    node_group = node_source_target.id_data
+    nodes = {}
+    parents = []
+
+    with batch_tree_update(node_group):
+        for node_data in preset_rows(data):
+            # crate node
+            node = node_group.nodes.new(node_data["type"])
+            nodes[node_data["name"]] = node
+
+            apply_node_layout(node, node_data, node_source_target.location)
+            apply_mapping_properties(node, node_data)
+
+            if flagged and node_data["name"] in flagged:
+                flag_invalid_node(node)
+
+            if node_data["parent"]:
+                parents.append((node, node_data["parent"]))
+
+        # set parent after all nodes exist, frame can come after its children
+        for node, parent_name in parents:
+            node.parent = nodes.get(parent_name)
+
+    return list(nodes.values())
+
+
+def merge_preset(context, data: dict, node_source_target, remove_stale: bool = False, flagged: set | None = None):
+    # merge mapping keyed by (node type, bone target, bone source) into object node mapping
+    # property node keyed by (node type, target channel, source channel)
+    # flagged nodes are not connected, prevent bind mapping with missing bone
+    # return tuple (updated, added, removed) node count
+    node_group = node_source_target.id_data
+    links = node_group.links
+
+    # mapping nodes of this object node and unconnected mapping nodes
+    existing = {}
+    for node in node_group.nodes:
+        if not isinstance(node, (ReNimNodeMapping, ReNimNodeMappingProperty)):
+            continue
+        node_links = node.inputs[0].links
+        if node_links and node_links[0].from_node != node_source_target:
+            continue
+        existing.setdefault(node_merge_key(node), node)
+
+    preset_keys = set()
+    updated = 0
+    added = 0
+    removed = 0
+
+    # new links bind in one batch when leaving batch update
+    with batch_tree_update(node_group):
+        for node_data in preset_rows(data):
+            # frame only for layout, merged nodes keep their place
+            if node_data["type"] == "NodeFrame":
+                continue
+
+            key = row_merge_key(node_data)
+            if key in preset_keys:
+                continue
+            preset_keys.add(key)
+
+            node = existing.get(key)
+            if node is None:
+                node = node_group.nodes.new(node_data["type"])
+                apply_node_layout(node, node_data,
+                                  node_source_target.location)
+                apply_mapping_properties(node, node_data)
+                added += 1
+            elif apply_mapping_properties(node, node_data):
+                updated += 1
+
+            if flagged and node_data["name"] in flagged:
+                flag_invalid_node(node)
+            elif not node.inputs[0].is_linked:
+                links.new(node_source_target.outputs[0], node.inputs[0])
+
+        if remove_stale:
+            stale_nodes = [node for key, node in existing.items()
+                           if key not in preset_keys]
+
+            # unbind all stale nodes in one mode switch before removing
+            node_source_target.unbind_bone_nodes(
+                context, [node for node in stale_nodes if getattr(node, "is_bind", False)])
+            for node in stale_nodes:
+                node_group.nodes.remove(node)
+            removed = len(stale_nodes)
+
+    return updated, added, removed
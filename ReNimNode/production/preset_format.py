@@ -0,0 +1,168 @@
+import gzip
+import json
+
+PRESET_VERSION = [0, 0, 2]
+
+# node layout columns, always first in header
+LAYOUT_PROPERTIES = ["type", "name", "label",
+                     "location", "width", "height", "hide", "parent"]
+
+# gzip file start with this magic number
+GZIP_MAGIC = b"\x1f\x8b"
+
+# preset columns which hold bone names, first column of each is required
+TARGET_COLUMNS = ["bone_target", "bone_target_end"]
+SOURCE_COLUMNS = ["bone_source", "bone_source_end"]
+
+# property node map channel names, no bone to check
+PROPERTY_NODE_TYPE = "ReNimNodeMappingProperty"
+
+
+def migrate_0_0_1(data: dict):
+    # per node dict -> header table and columnar values
+    nodes = list(data["nodes"].items())
+    properties = list(LAYOUT_PROPERTIES)
+    for _, node_data in nodes:
+        for prop_name in node_data:
+            if prop_name not in properties:
+                properties.append(prop_name)
+
+    values = []
+    for prop_name in properties:
+        if prop_name == "name":
+            values.append([name for name, _ in nodes])
+        else:
+            # frame store empty mapping value in 0.0.1
+            values.append([None if node_data["type"] == "NodeFrame" and prop_name not in LAYOUT_PROPERTIES else node_data.get(prop_name)
+                           for _, node_data in nodes])
+
+    return {
+        "version": [0, 0, 2],
+        "count": len(nodes),
+        "properties": properties,
+        "values": values,
+    }
+
+
+# migration from version to next version
+MIGRATIONS = {
+    (0, 0, 1): migrate_0_0_1,
+}
+
+
+def migrate_preset(data: dict):
+    version = tuple(data.get("version", []))
+    while version in MIGRATIONS:
+        data = MIGRATIONS[version](data)
+        version = tuple(data["version"])
+
+    if list(version) != PRESET_VERSION:
+        raise ValueError(
+            "Unsupported Preset Version {}".format(".".join(str(x) for x in version)))
+    return data
+
+
+def validate_preset(data: dict):
+    properties = data.get("properties")
+    values = data.get("values")
+    count = data.get("count")
+
+    if not isinstance(properties, list) or not isinstance(values, list) or not isinstance(count, int):
+        raise ValueError("Invalid Preset, Missing Header")
+    if len(properties) != len(values):
+        raise ValueError("Invalid Preset, Header And Values Length Differ")
+    missing = [prop_name for prop_name in LAYOUT_PROPERTIES if prop_name not in properties]
+    if missing:
+        raise ValueError(
+            "Invalid Preset, Missing Column {}".format(", ".join(missing)))
+    if any(not isinstance(column, list) or len(column) != count for column in values):
+        raise ValueError("Invalid Preset, Column Length Differ From Count")
+
+
+def read_preset(filepath: str):
+    # read plain or gzip json preset, return data migrated to current version
+    with open(filepath, "rb") as file:
+        return parse_preset(file.read())
+
+
+def parse_preset(raw: bytes):
+    # parse plain or gzip json preset bytes, return data migrated to current version
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+
+    data = migrate_preset(json.loads(raw.decode("utf-8")))
+    validate_preset(data)
+    return data
+
+
+def preset_rows(data: dict):
+    # iterate node as dict property name -> value
+    properties = data["properties"]
+    for row in zip(*data["values"]):
+        yield dict(zip(properties, row))
+
+
+def parse_substitutions(text: str):
+    # "old:new, old:new" -> list of tuple (old, new), applied as substring replace
+    substitutions = []
+    for item in text.split(","):
+        if ":" not in item:
+            continue
+        old, new = item.rsplit(":", 1)
+        if old.strip():
+            substitutions.append((old.strip(), new.strip()))
+    return substitutions
+
+
+def remap_preset_bones(data: dict, substitutions: list):
+    # rename bone names in preset before validation and node creation
+    if not substitutions:
+        return data
+
+    def remap(name):
+        if not name:
+            return name
+        for old, new in substitutions:
+            name = name.replace(old, new)
+        return name
+
+    values = list(data["values"])
+    for index, prop_name in enumerate(data["properties"]):
+        if prop_name in TARGET_COLUMNS or prop_name in SOURCE_COLUMNS:
+            values[index] = [remap(name) for name in values[index]]
+    return dict(data, values=values)
+
+
+def validate_preset_bones(data: dict, target_names, source_names):
+    # check bone names with armatures set before create any node
+    # return tuple (invalid node names, missing target bones, missing source bones)
+    target_names = set(target_names)
+    source_names = set(source_names)
+
+    invalid = set()
+    missing_target = set()
+    missing_source = set()
+    for node_data in preset_rows(data):
+        if node_data["type"] in ["NodeFrame", PROPERTY_NODE_TYPE]:
+            continue
+
+        for columns, names, missing in ((TARGET_COLUMNS, target_names, missing_target), (SOURCE_COLUMNS, source_names, missing_source)):
+            for index, column in enumerate(columns):
+                name = node_data.get(column)
+                # end bone is optional
+                if not name and index > 0:
+                    continue
+                if name not in names:
+                    invalid.add(node_data["name"])
+                    if name:
+                        missing.add(name)
+
+    return invalid, missing_target, missing_source
+
+
+def skip_preset_nodes(data: dict, node_names: set):
+    # copy of preset without some nodes
+    name_index = data["properties"].index("name")
+    keep = [index for index, name in enumerate(
+        data["values"][name_index]) if name not in node_names]
+    return dict(data, count=len(keep), values=[[column[index] for index in keep] for column in data["values"]])
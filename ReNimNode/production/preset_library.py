@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from . preset_format import SOURCE_COLUMNS, TARGET_COLUMNS, parse_preset
+
+# cache file written inside preset library directory
+INDEX_FILE_NAME = ".renim_preset_index.json"
+INDEX_VERSION = 1
+
+PRESET_EXTENSIONS = (".json", ".json.gz")
+
+# loaded index per directory, prevent reading index file on every lookup
+index_cache = {}
+
+
+def preset_bone_names(data: dict):
+    # (target bone names, source bone names) used by preset
+    columns = dict(zip(data["properties"], data["values"]))
+    target_names = {name for column in TARGET_COLUMNS for name in columns.get(
+        column, []) if name}
+    source_names = {name for column in SOURCE_COLUMNS for name in columns.get(
+        column, []) if name}
+    return target_names, source_names
+
+
+def library_files(directory: str):
+    # relative path -> os.stat_result for every preset file in directory tree
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name == INDEX_FILE_NAME or not name.endswith(PRESET_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            files[os.path.relpath(path, directory)] = os.stat(path)
+    return files
+
+
+def read_index(directory: str):
+    index_path = os.path.join(directory, INDEX_FILE_NAME)
+    try:
+        with open(index_path, "r") as file:
+            index = json.loads(file.read())
+    except (OSError, ValueError):
+        return {}
+
+    if index.get("version") != INDEX_VERSION:
+        return {}
+    return index.get("presets", {})
+
+
+def write_index(directory: str, entries: dict):
+    index_path = os.path.join(directory, INDEX_FILE_NAME)
+    try:
+        with open(index_path, "w") as file:
+            file.write(json.dumps(
+                {"version": INDEX_VERSION, "presets": entries}, separators=(",", ":")))
+    except OSError:
+        # read only library still usable with memory index
+        pass
+
+
+def refresh_library_index(directory: str):
+    # update index incrementally, only parse preset which size or modification time change
+    directory = os.path.abspath(directory)
+    entries = index_cache.get(directory)
+    if entries is None:
+        entries = read_index(directory)
+
+    files = library_files(directory)
+    is_change = set(entries) != set(files)
+    refreshed = {}
+
+    for path, stat in files.items():
+        entry = entries.get(path)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            refreshed[path] = entry
+            continue
+
+        is_change = True
+        full_path = os.path.join(directory, path)
+        try:
+            with open(full_path, "rb") as file:
+                raw = file.read()
+        except OSError:
+            # file removed or locked after walk, picked up on next refresh
+            continue
+        content_hash = hashlib.sha1(raw).hexdigest()
+
+        # touched file with same content keep bone names
+        if entry and entry["hash"] == content_hash:
+            refreshed[path] = dict(
+                entry, mtime=stat.st_mtime, size=stat.st_size)
+            continue
+
+        try:
+            target_names, source_names = preset_bone_names(parse_preset(raw))
+        except (OSError, ValueError):
+            # broken preset stay in index without bones, so it is not parsed again
+            target_names, source_names = set(), set()
+
+        refreshed[path] = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "hash": content_hash,
+            "targets": sorted(target_names),
+            "sources": sorted(source_names),
+        }
+
+    if is_change:
+        write_index(directory, refreshed)
+    index_cache[directory] = refreshed
+
+    return refreshed
+
+
+def rank_library_presets(entries: dict, target_names: list, source_names: list):
+    # rank by bone name coverage, return list of tuple (relative path, coverage, matched bones)
+    # coverage is how much of preset exist on armatures, rank also count how much of armatures preset cover
+    target_names = set(target_names)
+    source_names = set(source_names)
+    rig_total = len(target_names) + len(source_names)
+
+    ranks = []
+    for path, entry in entries.items():
+        preset_total = len(entry["targets"]) + len(entry["sources"])
+        if not preset_total or not rig_total:
+            continue
+
+        matched = len(target_names.intersection(
+            entry["targets"])) + len(source_names.intersection(entry["sources"]))
+        if not matched:
+            continue
+
+        coverage = matched / preset_total
+        rig_coverage = matched / rig_total
+        score = 2 * coverage * rig_coverage / (coverage + rig_coverage)
+        ranks.append((score, coverage, matched, path))
+
+    ranks.sort(key=lambda rank: (-rank[0], -rank[1], rank[3]))
+    return [(path, coverage, matched) for _, coverage, matched, path in ranks]
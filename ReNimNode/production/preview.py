@@ -0,0 +1,169 @@
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from . bake import write_bone_channels
+from . solver import ReNimArraySolver
+
+PREVIEW_ACTION_NAME = "ReNimPreview"
+
+# active preview per object node | (node tree name, node name) -> ReNimPreview
+previews = {}
+
+
+def preview_key(node_source_target):
+    return (node_source_target.id_data.name, node_source_target.name)
+
+
+def get_preview(node_source_target):
+    return previews.get(preview_key(node_source_target))
+
+
+def read_source_transforms(source, bone_names: list, frame_step: int = 1):
+    # whole clip in memory | tuple (frame indices, dict bone name -> (location, quaternion, scale))
+    indices = []
+    chunks = []
+    for chunk_indices, chunk in source.iter_chunks(bone_names, frame_step):
+        indices.append(chunk_indices)
+        chunks.append(chunk)
+
+    if not chunks:
+        return np.zeros(0, dtype=int), {}
+    return np.concatenate(indices), {bone_name: tuple(np.concatenate([chunk[bone_name][index] for chunk in chunks]) for index in range(3)) for bone_name in chunks[0]}
+
+
+class ReNimPreview:
+    '''Source clip kept in memory, changed bone node is re-solved into temporary action'''
+
+    def __init__(self, node_source_target, source, frames, source_transforms: dict):
+        self.node_tree_name = node_source_target.id_data.name
+        self.node_name = node_source_target.name
+        self.target_object = node_source_target.outputs[0].target_object
+        self.source = source
+        self.frames = np.array(frames, dtype=np.float32)
+        self.source_transforms = source_transforms
+
+        # pose before preview action, constraint mix with it
+        self.original_transforms = {pose_bone.name: tuple(np.array(x) for x in pose_bone.matrix_basis.decompose())
+                                    for pose_bone in self.target_object.pose.bones}
+
+        if self.target_object.animation_data is None:
+            self.target_object.animation_data_create()
+        self.restore_action = self.target_object.animation_data.action
+
+        # tuple list (bone name, constraint name) muted so bound target show preview action
+        self.muted_constraints = []
+
+        self.action = bpy.data.actions.new(PREVIEW_ACTION_NAME)
+        self.target_object.animation_data.action = self.action
+
+    @property
+    def node_source_target(self):
+        node_tree = bpy.data.node_groups.get(self.node_tree_name)
+        return node_tree.nodes.get(self.node_name) if node_tree else None
+
+    def mute_constraints(self, bone_name: str):
+        pose_bone = self.target_object.pose.bones.get(bone_name)
+        for constraint in pose_bone.constraints if pose_bone else []:
+            if constraint.name.startswith("RENIM_TRANSFORM_") and not constraint.mute:
+                constraint.mute = True
+                self.muted_constraints.append((bone_name, constraint.name))
+
+    def remove_bone_fcurves(self, bone_name: str, keep_transforms=()):
+        prefix = 'pose.bones["{}"].'.format(bone_name)
+        for fcurve in [fcurve for fcurve in self.action.fcurves if fcurve.data_path.startswith(prefix)]:
+            if fcurve.data_path[len(prefix):] not in keep_transforms:
+                self.action.fcurves.remove(fcurve)
+
+    def refresh(self, bone_names=None):
+        # re-solve only given target bones, all bones when None
+        node_source_target = self.node_source_target
+        if node_source_target is None:
+            return
+
+        # solver is cheap to build, always follow current links and bone names
+        solver = ReNimArraySolver(
+            node_source_target, self.source, self.original_transforms)
+
+        if bone_names is None:
+            # bone which lost its mapping show original pose again
+            for fcurve in list(self.action.fcurves):
+                if fcurve.data_path.split('"')[1] not in solver.bone_nodes:
+                    self.action.fcurves.remove(fcurve)
+
+        solved = solver.solve(self.source_transforms, bone_names)
+        if not solved:
+            return
+
+        for bone_name, bone_channels in solver.channels([solved]).items():
+            self.remove_bone_fcurves(bone_name, bone_channels.keys())
+            write_bone_channels(self.action, bone_name,
+                                self.frames, bone_channels)
+            self.mute_constraints(bone_name)
+
+        self.target_object.update_tag(refresh={"TIME"})
+
+    def stop(self):
+        pose_bones = self.target_object.pose.bones
+        for bone_name, constraint_name in self.muted_constraints:
+            pose_bone = pose_bones.get(bone_name)
+            constraint = pose_bone.constraints.get(
+                constraint_name) if pose_bone else None
+            if constraint:
+                constraint.mute = False
+
+        self.target_object.animation_data.action = self.restore_action
+        bpy.data.actions.remove(self.action)
+
+
+def start_preview(node_source_target, source, frames, source_transforms: dict):
+    stop_preview(node_source_target)
+
+    preview = ReNimPreview(node_source_target, source,
+                           frames, source_transforms)
+    previews[preview_key(node_source_target)] = preview
+    preview.refresh()
+    return preview
+
+
+def stop_preview(node_source_target):
+    preview = previews.pop(preview_key(node_source_target), None)
+    if preview:
+        try:
+            preview.stop()
+        except ReferenceError:
+            # target or preview action removed by undo
+            pass
+    return preview
+
+
+def update_node_preview(node, is_remap: bool = False):
+    # mapping node property change, re-solve its bone if object node is in preview
+    if not previews or not node.inputs[0].is_linked:
+        return
+
+    preview = get_preview(node.inputs[0].links[0].from_node)
+    if preview:
+        # changed bone name move curves to other bone, refresh all
+        preview.refresh(None if is_remap else [node.bone_target])
+
+
+def stop_all_previews():
+    for preview in list(previews.values()):
+        try:
+            preview.stop()
+        except ReferenceError:
+            # target already removed with its data
+            pass
+    previews.clear()
+
+
+@persistent
+def clear_previews(*args):
+    # object references are invalid after loading other file
+    previews.clear()
+
+
+@persistent
+def stop_previews_before_save(*args):
+    # saved file should keep original action and unmuted constraints
+    stop_all_previews()
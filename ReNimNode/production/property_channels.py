@@ -0,0 +1,150 @@
+import bpy
+import numpy as np
+from bpy.types import Action, Object
+from . bake import INTERPOLATION_LINEAR, assign_baked_action, new_bake_action, read_fcurve_co, write_fcurve
+from . node_mapping import ReNimNodeMappingProperty
+
+
+def channel_path(owner: Object | None, channel_type: str, name: str):
+    # tuple (animated id, data path), id is None when channel can not exist on owner
+    # name is escaped, quote or backslash in property name still give valid path
+    if owner is None or not name:
+        return None, ""
+    if channel_type == "SHAPE_KEY":
+        shape_keys = getattr(owner.data, "shape_keys", None)
+        if shape_keys is None:
+            return None, ""
+        return shape_keys, 'key_blocks["{}"].value'.format(bpy.utils.escape_identifier(name))
+    return owner, '["{}"]'.format(bpy.utils.escape_identifier(name))
+
+
+def static_value(animated_id, channel_type: str, name: str):
+    if channel_type == "SHAPE_KEY":
+        key_block = animated_id.key_blocks.get(name)
+        return key_block.value if key_block else 0.0
+    value = animated_id.get(name, 0.0)
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def sample_channel(animated_id, data_path: str, channel_type: str, name: str, frames):
+    # evaluate fcurve of active action at frames, no scene evaluation
+    # drivers and nla strips are not evaluated, see unsampled_channels
+    frames = np.asarray(frames, dtype=np.float64)
+    animation_data = animated_id.animation_data
+    action = animation_data.action if animation_data else None
+    fcurve = action.fcurves.find(data_path) if action else None
+    if fcurve is None or not len(fcurve.keyframe_points):
+        return np.full(len(frames), static_value(animated_id, channel_type, name))
+
+    # linear keys without modifiers interpolate in one call, capture data is usually baked linear
+    interpolations = np.empty(len(fcurve.keyframe_points), dtype=np.int32)
+    fcurve.keyframe_points.foreach_get("interpolation", interpolations)
+    if not len(fcurve.modifiers) and np.all(interpolations == INTERPOLATION_LINEAR):
+        co = read_fcurve_co(fcurve)
+        return np.interp(frames, co[:, 0], co[:, 1])
+    return np.array([fcurve.evaluate(frame) for frame in frames])
+
+
+def remap_values(values, node):
+    # input range to 0-1, shaped by remap curve, to output range, then gain
+    input_range = node.input_max - node.input_min
+    factor = (values - node.input_min) / \
+        (input_range if abs(input_range) > 1e-8 else 1.0)
+    if node.use_clamp:
+        factor = np.clip(factor, 0.0, 1.0)
+
+    if node.remap_curve == "SMOOTH":
+        factor = factor * factor * (3.0 - 2.0 * factor)
+    elif node.remap_curve == "EASE_IN":
+        factor = np.sign(factor) * np.abs(factor) ** node.curve_exponent
+    elif node.remap_curve == "EASE_OUT":
+        factor = 1.0 - np.sign(1.0 - factor) * \
+            np.abs(1.0 - factor) ** node.curve_exponent
+
+    return (node.output_min + factor * (node.output_max - node.output_min)) * node.gain
+
+
+def property_nodes(node_source_target):
+    return [link.to_node for link in node_source_target.outputs[0].links if isinstance(link.to_node, ReNimNodeMappingProperty)]
+
+
+def property_owners(node_source_target):
+    # ids other than target armature which receive own property action
+    socket_node = node_source_target.outputs[0]
+    owners = []
+    for node in property_nodes(node_source_target):
+        target_id, _ = channel_path(
+            node.target_object or socket_node.target_object, node.target_type, node.target_name)
+        if target_id is not None and target_id != socket_node.target_object and target_id not in owners:
+            owners.append(target_id)
+    return owners
+
+
+def owner_rig_fingerprint(rig_fingerprint: str, animated_id) -> str:
+    # action of other id is found again with target rig fingerprint and owner name
+    return rig_fingerprint + ":" + animated_id.name
+
+
+def unsampled_channels(node_source_target):
+    # source channel names whose value come from driver or nla, only active action fcurve is sampled
+    socket_node = node_source_target.outputs[0]
+    names = []
+    for node in property_nodes(node_source_target):
+        source_id, source_path = channel_path(
+            node.source_object or socket_node.source_object, node.source_type, node.source_name)
+        animation_data = source_id.animation_data if source_id is not None else None
+        if animation_data is None:
+            continue
+        is_driven = animation_data.drivers.find(source_path) is not None
+        is_nla = animation_data.use_nla and any(
+            track.strips and not track.mute for track in animation_data.nla_tracks)
+        if (is_driven or is_nla) and node.source_name not in names:
+            names.append(node.source_name)
+    return names
+
+
+def property_channels(node_source_target, frames):
+    # dict target id -> dict data path -> tuple (channel type, name, values), first node win for the same channel
+    socket_node = node_source_target.outputs[0]
+    result = {}
+    for node in property_nodes(node_source_target):
+        source_id, source_path = channel_path(
+            node.source_object or socket_node.source_object, node.source_type, node.source_name)
+        target_id, target_path = channel_path(
+            node.target_object or socket_node.target_object, node.target_type, node.target_name)
+        if source_id is None or target_id is None:
+            continue
+
+        channels = result.setdefault(target_id, {})
+        if target_path not in channels:
+            channels[target_path] = (node.target_type, node.target_name, remap_values(sample_channel(
+                source_id, source_path, node.source_type, node.source_name, frames), node))
+    return result
+
+
+def write_property_channels(node_source_target, frames, action: Action | None, action_name: str):
+    # channels of target armature go to its bake action, other id get own action
+    # return list of tuple (other id, action created for it)
+    if not property_nodes(node_source_target):
+        return []
+
+    target_object = node_source_target.outputs[0].target_object
+    frames = np.array(frames, dtype=np.float32)
+    actions = []
+    for animated_id, channels in property_channels(node_source_target, frames).items():
+        if animated_id == target_object and action is not None:
+            id_action = action
+        else:
+            id_action = new_bake_action(action_name + "_" + animated_id.name)
+            actions.append((animated_id, id_action))
+
+        for data_path, (channel_type, name, values) in channels.items():
+            # fcurve of missing custom property do not apply
+            if channel_type != "SHAPE_KEY" and name not in animated_id:
+                animated_id[name] = 0.0
+            write_fcurve(id_action, data_path, 0,
+                         "Properties", frames, values)
+
+        if id_action is not action:
+            assign_baked_action(animated_id, id_action, "LINK")
+    return actions
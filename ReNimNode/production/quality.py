@@ -0,0 +1,22 @@
+import numpy as np
+from bpy.types import Object
+from . quality_math import points_height
+
+
+def rig_height(armature_object: Object):
+    # world height of rest bone heads, normalize position so rig size does not matter
+    heights = [(armature_object.matrix_world @ bone.head_local).z for bone in armature_object.data.bones] + \
+        [(armature_object.matrix_world @ bone.tail_local).z for bone in armature_object.data.bones]
+    return points_height(heights)
+
+
+def rest_world_rotations(armature_object: Object, bone_names: list):
+    return np.array([(armature_object.matrix_world @ armature_object.data.bones[bone_name].matrix_local).to_quaternion() for bone_name in bone_names])
+
+
+def sample_world_transforms(armature_object: Object, bone_names: list):
+    # tuple (positions (bones, 3), quaternions (bones, 4)) of current evaluated pose in world space
+    matrix_world = armature_object.matrix_world
+    pose_bones = armature_object.pose.bones
+    matrices = [matrix_world @ pose_bones[bone_name].matrix for bone_name in bone_names]
+    return np.array([matrix.translation for matrix in matrices]), np.array([matrix.to_quaternion() for matrix in matrices])
@@ -0,0 +1,67 @@
+import numpy as np
+from . array_math import quat_conjugate, quat_multiply
+
+# quality metrics of retarget without bpy, arrays are sampled by quality module
+
+# source bone lower than this part of rig height above its lowest point is in contact
+CONTACT_HEIGHT = 0.02
+
+# source bone slower than this part of rig height per frame is planted
+CONTACT_SPEED = 0.005
+
+
+def points_height(heights: list):
+    # vertical extent of rig points, rig without height count as unit height
+    height = max(heights) - min(heights) if len(heights) else 0.0
+    return height if height > 1e-6 else 1.0
+
+
+def rotation_angle(a, b):
+    # angle between two quaternion arrays (..., 4), sign independent
+    dot = np.abs(np.einsum("...i,...i->...", a, b))
+    return 2.0 * np.arccos(np.clip(dot, 0.0, 1.0))
+
+
+def quality_metrics(source_positions, source_rotations, source_rest, source_height, target_positions, target_rotations, target_rest, target_height):
+    # arrays (frames, bones, 3 or 4) of mapped bone pairs, rest (bones, 4)
+    # return dict metric name -> array (bones)
+    # position relative to first frame root of each rig, in rig height unit
+    source_normalized = (source_positions - source_positions[:1].mean(axis=1, keepdims=True)) / source_height
+    target_normalized = (target_positions - target_positions[:1].mean(axis=1, keepdims=True)) / target_height
+
+    position_error = np.linalg.norm(target_normalized - source_normalized, axis=-1)
+
+    # rotation from rest in world space, bones with different rest orientation still compare
+    source_delta = quat_multiply(source_rotations, quat_conjugate(source_rest))
+    target_delta = quat_multiply(target_rotations, quat_conjugate(target_rest))
+    orientation_error = np.degrees(rotation_angle(source_delta, target_delta))
+
+    # foot sliding | target horizontal speed when source bone is planted
+    source_speed = np.linalg.norm(np.diff(source_normalized, axis=0), axis=-1)
+    target_horizontal_speed = np.linalg.norm(
+        np.diff(target_normalized[..., :2], axis=0), axis=-1)
+    source_height_above_lowest = source_normalized[..., 2] - \
+        source_normalized[..., 2].min(axis=0)
+    planted = (source_height_above_lowest[1:] < CONTACT_HEIGHT) & (
+        source_speed < CONTACT_SPEED)
+    planted_count = planted.sum(axis=0)
+    sliding = np.where(planted_count > 0, (target_horizontal_speed * planted).sum(
+        axis=0) / np.maximum(planted_count, 1), 0.0)
+
+    # jitter | acceleration of target not present in source
+    if len(source_normalized) > 2:
+        acceleration_difference = np.diff(
+            target_normalized, n=2, axis=0) - np.diff(source_normalized, n=2, axis=0)
+        jitter = np.sqrt(
+            np.mean(np.sum(acceleration_difference ** 2, axis=-1), axis=0))
+    else:
+        jitter = np.zeros(position_error.shape[1])
+
+    return {
+        "position_rms": np.sqrt(np.mean(position_error ** 2, axis=0)),
+        "position_max": position_error.max(axis=0),
+        "orientation_rms": np.sqrt(np.mean(orientation_error ** 2, axis=0)),
+        "orientation_max": orientation_error.max(axis=0),
+        "sliding": sliding,
+        "jitter": jitter,
+    }
@@ -0,0 +1,132 @@
+import numpy as np
+from . array_math import euler_continuity, euler_order, matrix_to_quat, quat_continuity, quat_to_euler, quat_to_matrix
+
+
+def smooth_frames(values, window: int):
+    # centered moving average along frames, edge frames repeated
+    if window < 2 or len(values) < 2:
+        return values
+    half = window // 2
+    padded = np.concatenate(
+        [np.repeat(values[:1], half, axis=0), values, np.repeat(values[-1:], half, axis=0)])
+    kernel = np.ones(2 * half + 1) / (2 * half + 1)
+    return np.stack([np.convolve(padded[:, index], kernel, mode="valid") for index in range(values.shape[1])], axis=-1)
+
+
+def transform_channels(pose_bone, matrices):
+    # bake channels from basis matrices (frames, 4, 4), scale is kept in its own channel
+    rotation_matrices = matrices[:, :3, :3] / \
+        np.linalg.norm(matrices[:, :3, :3], axis=1, keepdims=True)
+    rotation = quat_continuity(matrix_to_quat(rotation_matrices))
+    return {
+        "location": matrices[:, :3, 3].copy(),
+        "rotation_quaternion": rotation,
+        "rotation_euler": euler_continuity(quat_to_euler(rotation, euler_order(pose_bone))),
+    }
+
+
+def basis_matrices(bone_channels: dict, count: int):
+    # basis matrices (frames, 4, 4) from baked channels, channel not baked stay at rest
+    matrices = np.tile(np.eye(4), (count, 1, 1))
+    if "rotation_quaternion" in bone_channels:
+        matrices[:, :3, :3] = quat_to_matrix(
+            bone_channels["rotation_quaternion"])
+    if "scale" in bone_channels:
+        matrices[:, :3, :3] *= bone_channels["scale"][:, None, :]
+    if "location" in bone_channels:
+        matrices[:, :3, 3] = bone_channels["location"]
+    return matrices
+
+
+def armature_matrices(pose_bone, channels: dict, count: int, rest_bone: str = ""):
+    # armature space matrices of bone from baked channels of it and its parents, bone without channel at rest
+    # rest bone and its parents are taken at rest
+    rest = np.array(pose_bone.bone.matrix_local)
+    if pose_bone.name == rest_bone:
+        return np.tile(rest, (count, 1, 1))
+
+    matrices = rest @ basis_matrices(channels.get(pose_bone.name, {}), count)
+    parent = pose_bone.parent
+    if parent is None:
+        return matrices
+    return armature_matrices(parent, channels, count, rest_bone) @ np.linalg.inv(np.array(parent.bone.matrix_local)) @ matrices
+
+
+def is_root_motion_parent(root_pose_bone, hips_pose_bone):
+    # root motion move hips through hierarchy, root must be one of hips parents
+    parent = hips_pose_bone.parent
+    while parent is not None:
+        if parent == root_pose_bone:
+            return True
+        parent = parent.parent
+    return False
+
+
+def extract_root_motion(channels: dict, target_object, root_bone: str, hips_bone: str, axes, use_rotation: bool, smoothing: int):
+    # project hips motion on ground to root bone and remove it from hips, in armature space
+    # axes is (x, y) translation to extract, use_rotation extract rotation around z
+    # baked channels of root are replaced by root motion
+    hips_channels = channels.get(hips_bone)
+    root_pose_bone = target_object.pose.bones.get(root_bone)
+    hips_pose_bone = target_object.pose.bones.get(hips_bone)
+    if not hips_channels or root_pose_bone is None or hips_pose_bone is None or not is_root_motion_parent(root_pose_bone, hips_pose_bone):
+        return channels
+
+    count = len(next(iter(hips_channels.values())))
+
+    # hips in armature space from baked channels of its parents
+    hips_rest = np.array(hips_pose_bone.bone.matrix_local)
+    root_rest = np.array(root_pose_bone.bone.matrix_local)
+    hips = armature_matrices(hips_pose_bone, channels, count)
+
+    translation = np.zeros((count, 3))
+    for index, is_axis in enumerate(axes):
+        if is_axis:
+            translation[:, index] = hips[:, index, 3] - hips_rest[index, 3]
+
+    yaw = np.zeros(count)
+    if use_rotation:
+        # heading of hips forward axis relative to rest, around z
+        delta = hips[:, :3, :3] @ hips_rest[:3, :3].T
+        forward = delta[:, :, 1]
+        yaw = np.unwrap(np.arctan2(-forward[:, 0], forward[:, 1]))
+
+    smoothed = smooth_frames(np.concatenate(
+        [translation, yaw[:, None]], axis=-1), smoothing)
+    translation, yaw = smoothed[:, :3], smoothed[:, 3]
+
+    # root motion in armature space
+    motion = np.tile(np.eye(4), (count, 1, 1))
+    cosine, sine = np.cos(yaw), np.sin(yaw)
+    motion[:, 0, 0] = cosine
+    motion[:, 0, 1] = -sine
+    motion[:, 1, 0] = sine
+    motion[:, 1, 1] = cosine
+    motion[:, :3, 3] = translation
+
+    # root pose = motion @ root rest, every child of root is moved by motion
+    # hips keep its armature pose under moved root and baked bones between them
+    hips_parent_rest = np.array(hips_pose_bone.parent.bone.matrix_local)
+    hips_parent = motion @ armature_matrices(
+        hips_pose_bone.parent, channels, count, root_bone)
+    root_basis = np.linalg.inv(root_rest) @ motion @ root_rest
+    if root_pose_bone.parent:
+        # root motion stay in armature space under baked parents of root
+        root_basis = np.linalg.inv(root_rest) @ np.array(root_pose_bone.parent.bone.matrix_local) @ np.linalg.inv(
+            armature_matrices(root_pose_bone.parent, channels, count)) @ motion @ root_rest
+    hips_basis = np.linalg.inv(
+        hips_rest) @ hips_parent_rest @ np.linalg.inv(hips_parent) @ hips
+
+    result = dict(channels)
+    result[root_bone] = transform_channels(root_pose_bone, root_basis)
+    result[hips_bone] = dict(hips_channels, **
+                             transform_channels(hips_pose_bone, hips_basis))
+    return result
+
+
+def apply_root_motion(channels: dict, node_source_target):
+    # optional bake stage of object node, before fcurves are written
+    if not node_source_target.use_root_motion:
+        return channels
+    return extract_root_motion(channels, node_source_target.outputs[0].target_object, node_source_target.root_motion_bone, node_source_target.root_motion_hips,
+                               node_source_target.root_motion_axes, node_source_target.root_motion_rotation, node_source_target.root_motion_smoothing)
@@ -1,3 +1,4 @@
+import bpy
 from bpy import props, types
 from bpy.utils import register_class, unregister_class
 from bpy.types import NodeSocket
@@ -48,7 +49,10 @@ class ReNimSocketSourceTarget(NodeSocket):
                 col.label(text="NONE")
 
         # SOURCE
-        if is_output and is_object_node:
+        if is_output and is_object_node and node.is_virtual_source():
+            col.label(text=bpy.path.basename(node.source_bvh)
+                      or "NONE", icon="FILE")
+        elif is_output and is_object_node:
             row = col.row()
             row.enabled = not node.is_bind
             row.prop(self, "source_object", text="")
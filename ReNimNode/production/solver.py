@@ -0,0 +1,148 @@
+import numpy as np
+from . array_math import euler_continuity, euler_order, euler_to_matrix, matrix_to_quat, quat_continuity, quat_conjugate, quat_multiply, quat_rotate, quat_to_euler, quat_to_matrix
+from . bake import rest_rotation
+from . node_mapping import ReNimNodeMapping, ReNimNodeMappingBone
+
+
+def node_channel_parameters(node, prop_transform: str):
+    # (use axis, influence, multiply, offset) arrays of one transform of bone node
+    use_axis = np.array(getattr(node, prop_transform + "_axis"),
+                        dtype=bool) & bool(getattr(node, "use_" + prop_transform))
+    return (
+        use_axis,
+        np.array(getattr(node, prop_transform + "_influence")),
+        np.array(getattr(node, prop_transform + "_multiply")),
+        np.array(getattr(node, prop_transform + "_offset")),
+    )
+
+
+def map_channel(values, parameters):
+    # same expression as mimic source driver, disabled axis is 0
+    use_axis, influence, multiply, offset = parameters
+    return np.where(use_axis, values * influence * multiply + offset, 0.0)
+
+
+class ReNimArraySolver:
+    '''Retarget source motion arrays to target bone transforms, same math as bone node bind without drivers and constraints'''
+
+    def __init__(self, node_source_target, source, original_transforms: dict | None = None):
+        # source provide bone_names, object_scale, rest_rotation(bone name) and local transforms arrays
+        # original transforms is dict target bone name -> (location, quaternion, scale), default current pose
+        socket_node = node_source_target.outputs[0]
+        self.target_object = socket_node.target_object
+        self.source = source
+
+        target_bones = self.target_object.data.bones
+        source_bone_names = set(source.bone_names)
+
+        # location driver divide by target scale / source scale
+        self.scale_ratio = np.array(
+            self.target_object.scale) / np.array(source.object_scale)
+
+        mapping_nodes = [link.to_node for link in socket_node.links if isinstance(
+            link.to_node, ReNimNodeMapping)]
+        self.nodes = [node for node in mapping_nodes if isinstance(node, ReNimNodeMappingBone) and target_bones.get(
+            node.bone_target) and node.bone_source in source_bone_names]
+        # chain node and node with missing bone can not be solved from arrays
+        self.skipped_nodes = [
+            node for node in mapping_nodes if node not in self.nodes]
+
+        # per target bone list of (node, conjugation rest target^-1 @ rest source), in constraint order
+        self.bone_nodes = {}
+        for node in self.nodes:
+            conjugation = quat_multiply(quat_conjugate(rest_rotation(
+                self.target_object, node.bone_target)), source.rest_rotation(node.bone_source))
+            self.bone_nodes.setdefault(node.bone_target, []).append(
+                (node, conjugation))
+
+        # constraint mix with pose basis, captured once so solve is not affected by later pose
+        if original_transforms is None:
+            original_transforms = {bone_name: tuple(np.array(x) for x in self.target_object.pose.bones[bone_name].matrix_basis.decompose())
+                                   for bone_name in self.bone_nodes}
+        self.original_transforms = original_transforms
+
+    @property
+    def source_bone_names(self):
+        return sorted({node.bone_source for node in self.nodes})
+
+    def bake_flags(self, bone_name: str):
+        # (location, rotation, scale) to bake, any node enable it
+        nodes = [node for node, _ in self.bone_nodes[bone_name]]
+        return (any(node.use_location for node in nodes), any(node.use_rotation_euler for node in nodes), any(node.use_scale for node in nodes))
+
+    def solve_node(self, node, conjugation, location, rotation, scale):
+        # copied transform of node constraint | mimic source basis conjugated into target bone space
+        location_mapped = map_channel(
+            location / self.scale_ratio, node_channel_parameters(node, "location"))
+        euler_mapped = map_channel(quat_to_euler(
+            rotation, "XYZ"), node_channel_parameters(node, "rotation_euler"))
+        scale_mapped = map_channel(
+            scale, node_channel_parameters(node, "scale")) if node.use_scale else np.ones_like(scale)
+
+        rotation_conjugation = quat_to_matrix(conjugation)
+        matrix = rotation_conjugation @ euler_to_matrix(
+            euler_mapped, "XYZ") @ (scale_mapped[:, :, None] * np.eye(3)) @ rotation_conjugation.T
+
+        copied_scale = np.linalg.norm(matrix, axis=-2)
+        copied_rotation = matrix_to_quat(
+            matrix / np.where(copied_scale == 0.0, 1.0, copied_scale)[:, None, :])
+        copied_location = quat_rotate(conjugation, location_mapped)
+        return copied_location, copied_rotation, copied_scale
+
+    def solve(self, source_transforms: dict, bone_names=None):
+        # source transforms is dict source bone name -> (location, quaternion, scale) arrays (frames, size)
+        # return dict target bone name -> (location, quaternion, scale) local basis, only bone names when given
+        result = {}
+        for bone_name, nodes in self.bone_nodes.items():
+            if bone_names is not None and bone_name not in bone_names:
+                continue
+            original_location, original_rotation, original_scale = self.original_transforms[bone_name]
+
+            location = None
+            for node, conjugation in nodes:
+                copied_location, copied_rotation, copied_scale = self.solve_node(
+                    node, conjugation, *source_transforms[node.bone_source])
+                if location is None:
+                    location = np.broadcast_to(
+                        original_location, copied_location.shape)
+                    rotation = np.broadcast_to(
+                        original_rotation, copied_rotation.shape)
+                    scale = np.broadcast_to(original_scale, copied_scale.shape)
+
+                # mix like copy transforms split scale, BEFORE copied act as parent, AFTER as child
+                if node.mix_mode == "BEFORE":
+                    location = copied_location + \
+                        quat_rotate(copied_rotation, copied_scale * location)
+                    rotation = quat_multiply(copied_rotation, rotation)
+                else:
+                    location = location + \
+                        quat_rotate(rotation, scale * copied_location)
+                    rotation = quat_multiply(rotation, copied_rotation)
+                scale = scale * copied_scale
+
+            result[bone_name] = (location, rotation, scale)
+        return result
+
+    def channels(self, solved_chunks: list):
+        # concatenate solved chunks to bake channels | dict bone name -> dict data path -> array (frames, size)
+        result = {}
+        for bone_name in solved_chunks[0]:
+            pose_bone = self.target_object.pose.bones[bone_name]
+            is_bake_location, is_bake_rotation, is_bake_scale = self.bake_flags(
+                bone_name)
+
+            location, rotation, scale = [np.concatenate(
+                [chunk[bone_name][index] for chunk in solved_chunks]) for index in range(3)]
+
+            channels = {}
+            if is_bake_location:
+                channels["location"] = location
+            if is_bake_rotation:
+                rotation = quat_continuity(rotation)
+                channels["rotation_quaternion"] = rotation
+                channels["rotation_euler"] = euler_continuity(
+                    quat_to_euler(rotation, euler_order(pose_bone)))
+            if is_bake_scale:
+                channels["scale"] = scale
+            result[bone_name] = channels
+        return result
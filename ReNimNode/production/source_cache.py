@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import numpy as np
+from bpy.types import Object
+from . bake import rest_rotation
+from . fingerprint import action_fingerprint, hash_data, rig_fingerprint
+
+# per bone and frame | location 3, quaternion 4, scale 3
+CACHE_CHANNELS = 10
+
+# frames per chunk when iterate cache
+CACHE_CHUNK_FRAMES = 4096
+
+# cache file named by sha1 key, with header and unfinished sample, other files in directory are never touched
+CACHE_FILE_PATTERN = re.compile(r"^[0-9a-f]{40}\.npy(\.json|\.tmp)?$")
+
+
+def source_cache_key(source_object: Object, start_frame: int, end_frame: int, frame_step: int) -> str:
+    # same rig, same action and same frame range produce the same source motion
+    source_action = source_object.animation_data.action if source_object.animation_data else None
+    return hash_data({
+        "rig": rig_fingerprint(source_object),
+        "action": action_fingerprint(source_action),
+        "frame_range": [start_frame, end_frame, frame_step],
+    })
+
+
+class ReNimSourceCache:
+    '''Sampled local transforms of source armature, memory-mapped from npy file'''
+
+    def __init__(self, source_object: Object, filepath: str):
+        self.source_object = source_object
+        self.filepath = filepath
+
+        with open(filepath + ".json", "r") as file:
+            header = json.loads(file.read())
+        self.bone_names = header["bone_names"]
+        self.frames = np.array(header["frames"], dtype=np.float64)
+        self.bone_index = {name: index for index,
+                           name in enumerate(self.bone_names)}
+
+        # (frames, bones, channels), only touched pages are read from disk
+        self.data = np.load(filepath, mmap_mode="r")
+
+    @property
+    def object_scale(self):
+        return np.array(self.source_object.scale)
+
+    def rest_rotation(self, bone_name: str):
+        return rest_rotation(self.source_object, bone_name)
+
+    def rest_matrices(self):
+        # dict bone name -> (parent name, rest matrix in armature space), for world solver
+        return {bone.name: (bone.parent.name if bone.parent else "", np.array(bone.matrix_local)) for bone in self.source_object.data.bones}
+
+    def bone_transforms(self, bone_name: str, start: int = 0, end: int | None = None):
+        values = np.asarray(
+            self.data[start:end, self.bone_index[bone_name]], dtype=np.float64)
+        return values[:, 0:3], values[:, 3:7], values[:, 7:10]
+
+    def iter_chunks(self, bone_names: list, frame_step: int = 1, chunk_frames: int = CACHE_CHUNK_FRAMES):
+        # same interface as bvh motion, cache is already sampled with frame step
+        bone_names = [name for name in bone_names if name in self.bone_index]
+        for start in range(0, len(self.frames), chunk_frames):
+            end = min(start + chunk_frames, len(self.frames))
+            yield np.arange(start, end), {name: self.bone_transforms(name, start, end) for name in bone_names}
+
+    def scene_frames(self, indices, start_frame: int, fps: float):
+        return self.frames[indices]
+
+
+def source_cache_path(directory: str, key: str):
+    return os.path.join(directory, key + ".npy")
+
+
+def load_source_cache(directory: str, source_object: Object, key: str):
+    filepath = source_cache_path(directory, key)
+    if not os.path.isfile(filepath) or not os.path.isfile(filepath + ".json"):
+        return None
+    try:
+        return ReNimSourceCache(source_object, filepath)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def sample_source_cache(context, directory: str, source_object: Object, key: str, start_frame: int, end_frame: int, frame_step: int):
+    # evaluate source armature once for frame range, write directly into memory-mapped file
+    os.makedirs(directory, exist_ok=True)
+    filepath = source_cache_path(directory, key)
+
+    pose_bones = [pose_bone for pose_bone in source_object.pose.bones
+                  if not pose_bone.bone.collections.get("ReNimHelperBones")]
+    frames = list(range(start_frame, end_frame + 1, frame_step))
+
+    # write to temporary file first, unfinished sample is never loaded
+    temporary_path = filepath + ".tmp"
+    data = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.float32, shape=(
+        len(frames), len(pose_bones), CACHE_CHANNELS))
+
+    old_current_frame = context.scene.frame_current
+    for frame_index, frame in enumerate(frames):
+        context.scene.frame_set(frame)
+        for bone_index, pose_bone in enumerate(pose_bones):
+            matrix = source_object.convert_space(
+                pose_bone=pose_bone, matrix=pose_bone.matrix, from_space="POSE", to_space="LOCAL")
+            location, rotation, scale = matrix.decompose()
+            data[frame_index, bone_index, 0:3] = location
+            data[frame_index, bone_index, 3:7] = rotation
+            data[frame_index, bone_index, 7:10] = scale
+    context.scene.frame_set(old_current_frame)
+
+    data.flush()
+    del data
+    os.replace(temporary_path, filepath)
+
+    with open(filepath + ".json", "w") as file:
+        file.write(json.dumps({
+            "bone_names": [pose_bone.name for pose_bone in pose_bones],
+            "frames": frames,
+        }))
+
+    return ReNimSourceCache(source_object, filepath)
+
+
+def get_source_cache(context, directory: str, source_object: Object, start_frame: int, end_frame: int, frame_step: int):
+    # memory-mapped cache of source motion, sample source only when no cache match
+    key = source_cache_key(source_object, start_frame, end_frame, frame_step)
+    source = load_source_cache(directory, source_object, key)
+    if source is None:
+        source = sample_source_cache(
+            context, directory, source_object, key, start_frame, end_frame, frame_step)
+    return source
+
+
+def clear_source_cache(directory: str):
+    # remove cache files in directory, return (removed files, freed bytes, files still in use)
+    removed = freed = locked = 0
+    if not os.path.isdir(directory):
+        return removed, freed, locked
+
+    for name in os.listdir(directory):
+        if not CACHE_FILE_PATTERN.match(name):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            # memory-mapped by preview on some platforms
+            locked += 1
+            continue
+        removed += 1
+        freed += size
+    return removed, freed, locked
@@ -0,0 +1,191 @@
+import numpy as np
+from . array_math import euler_continuity, euler_order, matrix_to_quat, quat_continuity, quat_to_euler, quat_to_matrix
+from . node_mapping import ReNimNodeMapping, ReNimNodeMappingBone
+
+
+def compose_matrices(location, quaternion, scale):
+    # (frames, 4, 4) from local transform arrays
+    matrices = np.zeros(location.shape[:-1] + (4, 4))
+    matrices[..., :3, :3] = quat_to_matrix(quaternion) * scale[..., None, :]
+    matrices[..., :3, 3] = location
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+
+def armature_rest_matrices(armature_object):
+    # dict bone name -> (parent name, rest matrix in armature space)
+    return {bone.name: (bone.parent.name if bone.parent else "", np.array(bone.matrix_local)) for bone in armature_object.data.bones}
+
+
+def hierarchy_order(rest_matrices: dict):
+    # bone names parent first
+    order = []
+    visited = set()
+
+    def visit(bone_name):
+        if bone_name in visited:
+            return
+        visited.add(bone_name)
+        parent_name = rest_matrices[bone_name][0]
+        if parent_name in rest_matrices:
+            visit(parent_name)
+        order.append(bone_name)
+
+    for bone_name in rest_matrices:
+        visit(bone_name)
+    return order
+
+
+def leg_length(rest_matrices: dict, root_name: str):
+    # root rest height above lowest rest head, in armature unit
+    lowest = min(matrix[2, 3] for _, matrix in rest_matrices.values())
+    return rest_matrices[root_name][1][2, 3] - lowest
+
+
+class ReNimWorldSolver:
+    '''Retarget in armature space top-down, mapped target bone follow source bone rotation from rest, root follow source translation'''
+
+    def __init__(self, node_source_target, source, normalize: bool = True):
+        # source provide bone_names, object_scale, rest_matrices() and local transforms arrays
+        socket_node = node_source_target.outputs[0]
+        self.target_object = socket_node.target_object
+        self.source = source
+
+        self.target_rest = armature_rest_matrices(self.target_object)
+        self.source_rest = source.rest_matrices()
+        self.target_order = hierarchy_order(self.target_rest)
+
+        mapping_nodes = [link.to_node for link in socket_node.links if isinstance(
+            link.to_node, ReNimNodeMapping)]
+        self.nodes = [node for node in mapping_nodes if isinstance(node, ReNimNodeMappingBone) and node.use_rotation_euler
+                      and node.bone_target in self.target_rest and node.bone_source in self.source_rest]
+        # chain node, node without rotation and node with missing bone are not solved
+        self.skipped_nodes = [
+            node for node in mapping_nodes if node not in self.nodes]
+
+        # target bone -> source bone, first node win like first constraint
+        self.bone_nodes = {}
+        for node in self.nodes:
+            self.bone_nodes.setdefault(node.bone_target, node.bone_source)
+
+        # topmost mapped bone carry translation, usually hips
+        self.root_bone = next(
+            (bone_name for bone_name in self.target_order if bone_name in self.bone_nodes), None)
+
+        # source translation to target armature unit, optional leg length ratio
+        self.translation_factor = np.array(
+            source.object_scale) / np.array(self.target_object.scale)
+        if normalize and self.root_bone:
+            source_leg = leg_length(
+                self.source_rest, self.bone_nodes[self.root_bone]) * source.object_scale[2]
+            target_leg = leg_length(
+                self.target_rest, self.root_bone) * self.target_object.scale[2]
+            if source_leg > 1e-6 and target_leg > 1e-6:
+                self.translation_factor = self.translation_factor * \
+                    (target_leg / source_leg)
+
+        # unmapped bone keep current pose
+        self.original_basis = {bone_name: np.array(self.target_object.pose.bones[bone_name].matrix_basis)
+                               for bone_name in self.target_order if bone_name not in self.bone_nodes}
+
+    @property
+    def source_bone_names(self):
+        # mapped source bones and their ancestors, needed for forward kinematics
+        names = set()
+        for bone_name in self.bone_nodes.values():
+            while bone_name and bone_name not in names:
+                names.add(bone_name)
+                bone_name = self.source_rest[bone_name][0] if bone_name in self.source_rest else ""
+        return sorted(names)
+
+    def source_pose_matrices(self, source_transforms: dict):
+        # armature space matrices (frames, 4, 4), parent result cached and reused by children
+        pose_matrices = {}
+
+        def pose_matrix(bone_name):
+            if bone_name in pose_matrices:
+                return pose_matrices[bone_name]
+
+            parent_name, rest = self.source_rest[bone_name]
+            basis = compose_matrices(*source_transforms[bone_name])
+            if parent_name in self.source_rest and parent_name in source_transforms:
+                matrix = pose_matrix(parent_name) @ (np.linalg.inv(
+                    self.source_rest[parent_name][1]) @ rest) @ basis
+            else:
+                matrix = rest @ basis
+            pose_matrices[bone_name] = matrix
+            return matrix
+
+        for bone_name in set(self.bone_nodes.values()):
+            pose_matrix(bone_name)
+        return pose_matrices
+
+    def solve(self, source_transforms: dict):
+        # source transforms is dict source bone name -> (location, quaternion, scale) arrays (frames, size)
+        # return dict target bone name -> (location, quaternion, scale) local basis of mapped bones
+        source_pose = self.source_pose_matrices(source_transforms)
+        count = len(next(iter(source_pose.values())))
+
+        target_pose = {}
+        result = {}
+        for bone_name in self.target_order:
+            parent_name, rest = self.target_rest[bone_name]
+            if parent_name:
+                # rest relative to parent, then parent pose
+                parent_rest = target_pose[parent_name] @ (
+                    np.linalg.inv(self.target_rest[parent_name][1]) @ rest)
+            else:
+                parent_rest = np.broadcast_to(rest, (count, 4, 4))
+
+            source_name = self.bone_nodes.get(bone_name)
+            if source_name is None:
+                target_pose[bone_name] = parent_rest @ self.original_basis[bone_name]
+                continue
+
+            # rotation from rest in armature space, same delta on target rest
+            source_rest = self.source_rest[source_name][1]
+            source_rotation = source_pose[source_name][:, :3, :3]
+            source_rotation = source_rotation / \
+                np.linalg.norm(source_rotation, axis=-2, keepdims=True)
+            source_rest_rotation = source_rest[:3, :3] / \
+                np.linalg.norm(source_rest[:3, :3], axis=-2, keepdims=True)
+            target_rotation = source_rotation @ source_rest_rotation.T @ rest[:3, :3]
+
+            parent_rotation = parent_rest[:, :3, :3] / \
+                np.linalg.norm(parent_rest[:, :3, :3], axis=-2, keepdims=True)
+            basis = np.zeros((count, 4, 4))
+            basis[:, :3, :3] = np.swapaxes(
+                parent_rotation, -1, -2) @ target_rotation
+            basis[:, 3, 3] = 1.0
+
+            if bone_name == self.root_bone:
+                # root head follow source head displacement from rest
+                position = rest[:3, 3] + (source_pose[source_name][:, :3, 3] -
+                                          source_rest[:3, 3]) * self.translation_factor
+                local_position = np.linalg.inv(parent_rest) @ np.concatenate(
+                    [position, np.ones((count, 1))], axis=-1)[..., None]
+                basis[:, :3, 3] = local_position[:, :3, 0]
+
+            target_pose[bone_name] = parent_rest @ basis
+            result[bone_name] = (basis[:, :3, 3], matrix_to_quat(
+                basis[:, :3, :3]), np.ones((count, 3)))
+
+        return result
+
+    def channels(self, solved_chunks: list):
+        # concatenate solved chunks to bake channels | dict bone name -> dict data path -> array (frames, size)
+        result = {}
+        for bone_name in solved_chunks[0]:
+            pose_bone = self.target_object.pose.bones[bone_name]
+            location, rotation = [np.concatenate(
+                [chunk[bone_name][index] for chunk in solved_chunks]) for index in range(2)]
+
+            rotation = quat_continuity(rotation)
+            channels = {
+                "rotation_quaternion": rotation,
+                "rotation_euler": euler_continuity(quat_to_euler(rotation, euler_order(pose_bone))),
+            }
+            if bone_name == self.root_bone:
+                channels["location"] = location
+            result[bone_name] = channels
+        return result
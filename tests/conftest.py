@@ -0,0 +1,11 @@
+import os
+import sys
+
+# add-on package import bpy on load, pure python modules are imported directly by name
+# production package itself has no import, module with relative import of pure module is imported as production.<module>
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), "ReNimNode", "production"))
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), "ReNimNode"))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
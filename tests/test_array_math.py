@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from array_math import euler_continuity, euler_to_matrix, euler_to_quat, matrix_to_quat, quat_continuity, quat_multiply, quat_rotate, quat_to_euler, quat_to_matrix
+
+EULER_ORDERS = ["XYZ", "XZY", "YXZ", "YZX", "ZXY", "ZYX"]
+
+
+def random_eulers(count=200, seed=0):
+    # middle angle inside +-90 degree, away from gimbal lock so euler is unique
+    rng = np.random.default_rng(seed)
+    eulers = rng.uniform(-np.pi * 0.95, np.pi * 0.95, (count, 3))
+    return eulers
+
+
+@pytest.mark.parametrize("order", EULER_ORDERS)
+def test_euler_quaternion_round_trip(order):
+    eulers = random_eulers()
+    middle = "XYZ".index(order[1])
+    eulers[:, middle] *= 0.5
+    result = quat_to_euler(euler_to_quat(eulers, order), order)
+    np.testing.assert_allclose(result, eulers, atol=1e-9)
+
+
+@pytest.mark.parametrize("order", EULER_ORDERS)
+def test_euler_apply_first_axis_first(order):
+    # blender euler rotate first axis of order first
+    angles = np.array([0.3, -0.7, 1.1])
+    expected = np.eye(3)
+    for axis in order:
+        single = np.zeros(3)
+        single["XYZ".index(axis)] = angles["XYZ".index(axis)]
+        expected = euler_to_matrix(single, "XYZ") @ expected
+    np.testing.assert_allclose(euler_to_matrix(
+        angles, order), expected, atol=1e-12)
+
+
+def test_matrix_quaternion_round_trip():
+    rng = np.random.default_rng(1)
+    quaternions = rng.normal(size=(500, 4))
+    quaternions /= np.linalg.norm(quaternions, axis=-1, keepdims=True)
+    quaternions[quaternions[:, 0] < 0.0] *= -1.0
+    np.testing.assert_allclose(matrix_to_quat(
+        quat_to_matrix(quaternions)), quaternions, atol=1e-9)
+
+
+def test_rotate_match_matrix():
+    q = euler_to_quat([0.2, 0.4, -1.3], "ZXY")
+    v = np.array([0.3, -1.0, 2.0])
+    np.testing.assert_allclose(quat_rotate(
+        q, v), quat_to_matrix(q) @ v, atol=1e-12)
+    np.testing.assert_allclose(quat_to_matrix(quat_multiply(
+        q, q)), quat_to_matrix(q) @ quat_to_matrix(q), atol=1e-12)
+
+
+def test_quaternion_continuity_flip_hemisphere():
+    q = np.array([[1.0, 0.0, 0.0, 0.0], [-0.99, -0.1, 0.0, 0.0],
+                 [0.98, 0.2, 0.0, 0.0]])
+    result = quat_continuity(q)
+    assert np.all(np.einsum("ij,ij->i", result[1:], result[:-1]) > 0.0)
+
+
+def test_euler_continuity_remove_jump():
+    e = np.array([[3.1, 0.0, 0.0], [-3.1, 0.0, 0.0]])
+    result = euler_continuity(e)
+    assert abs(result[1, 0] - result[0, 0]) < 0.1
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from production.bake_file import BAKE_FILE_CHANNELS, BAKE_FILE_MAGIC, IDENTITY_TRANSFORM, ReNimBakeFileWriter, read_bake_file
+
+BONES = ["hips", "spine", "head"]
+
+
+def random_transforms(frames, seed):
+    # dict bone -> (location, unit quaternion with positive w, scale), head bone missing
+    rng = np.random.default_rng(seed)
+    count = len(frames)
+    result = {}
+    for bone_name in BONES[:2]:
+        rotation = rng.normal(size=(count, 4))
+        rotation /= np.linalg.norm(rotation, axis=1)[:, None]
+        rotation *= np.sign(rotation[:, :1])
+        result[bone_name] = (rng.normal(size=(count, 3)), rotation, rng.uniform(0.5, 2.0, (count, 3)))
+    return result
+
+
+def write_file(path, chunks):
+    with ReNimBakeFileWriter(str(path), BONES, 30.0) as writer:
+        for frames, transforms in chunks:
+            writer.write_chunk(frames, transforms)
+    return writer
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "take.renimbake"
+    chunks = [(np.arange(1, 5), random_transforms(np.arange(1, 5), 0)),
+              (np.arange(5, 8), random_transforms(np.arange(5, 8), 1))]
+    writer = write_file(path, chunks)
+    assert writer.frame_count == 7
+
+    header, frames, transforms = read_bake_file(str(path))
+    assert header == {"bones": BONES, "channels": BAKE_FILE_CHANNELS, "fps": 30.0}
+    assert frames.dtype == np.float32 and transforms.dtype == np.float32
+    assert np.array_equal(frames, np.arange(1, 8, dtype=np.float32))
+    assert transforms.shape == (7, 3, 10)
+
+    for index, bone_name in enumerate(BONES[:2]):
+        location = np.concatenate([chunk[1][bone_name][0] for chunk in chunks])
+        scale = np.concatenate([chunk[1][bone_name][2] for chunk in chunks])
+        assert np.allclose(transforms[:, index, 0:3], location, atol=1e-6)
+        assert np.allclose(transforms[:, index, 7:10], scale, atol=1e-6)
+        # continuity may flip quaternion, same rotation either sign
+        rotation = np.concatenate([chunk[1][bone_name][1] for chunk in chunks])
+        assert np.allclose(np.abs(np.sum(transforms[:, index, 3:7] * rotation, axis=1)), 1.0, atol=1e-5)
+    # missing bone written at rest
+    assert np.allclose(transforms[:, 2], IDENTITY_TRANSFORM)
+
+
+def test_rotation_continuous_across_chunks(tmp_path):
+    path = tmp_path / "take.renimbake"
+    quaternion = np.array([[0.6, 0.8, 0.0, 0.0]])
+    still = (np.zeros((1, 3)), quaternion, np.ones((1, 3)))
+    flipped = (np.zeros((1, 3)), -quaternion, np.ones((1, 3)))
+    write_file(path, [([1], {"hips": still}), ([2], {"hips": flipped})])
+
+    _, _, transforms = read_bake_file(str(path))
+    assert np.allclose(transforms[:, 0, 3:7], [quaternion[0], quaternion[0]])
+
+
+def test_header_only_file(tmp_path):
+    path = tmp_path / "empty.renimbake"
+    write_file(path, [([], {})])
+    header, frames, transforms = read_bake_file(str(path))
+    assert header["bones"] == BONES
+    assert frames.shape == (0,) and transforms.shape == (0, 3, 10)
+
+
+def test_reject_wrong_magic(tmp_path):
+    path = tmp_path / "take.renimbake"
+    write_file(path, [(np.arange(1, 3), random_transforms(np.arange(1, 3), 0))])
+    raw = path.read_bytes()
+    path.write_bytes(b"NOTBAKE\0" + raw[len(BAKE_FILE_MAGIC):])
+    with pytest.raises(ValueError, match="Invalid Bake File"):
+        read_bake_file(str(path))
+
+
+def test_reject_wrong_version(tmp_path):
+    path = tmp_path / "take.renimbake"
+    write_file(path, [])
+    raw = bytearray(path.read_bytes())
+    raw[len(BAKE_FILE_MAGIC)] = 99
+    path.write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match="Unsupported Bake File Version 99"):
+        read_bake_file(str(path))
+
+
+@pytest.mark.parametrize("part, keep", [("version", 4), ("header", 20), ("frame count", 2), ("frames", 6), ("transforms", 20)])
+def test_reject_truncated_file(tmp_path, part, keep):
+    # file cut after keep bytes of part
+    path = tmp_path / "take.renimbake"
+    write_file(path, [(np.arange(1, 3), random_transforms(np.arange(1, 3), 0))])
+    raw = path.read_bytes()
+    header_end = raw.index(b"}", len(BAKE_FILE_MAGIC)) + 1
+    start = {"version": len(BAKE_FILE_MAGIC), "header": len(BAKE_FILE_MAGIC) + 8,
+             "frame count": header_end, "frames": header_end + 4, "transforms": header_end + 12}[part]
+    path.write_bytes(raw[:start + keep])
+    with pytest.raises(ValueError, match="Truncated Bake File"):
+        read_bake_file(str(path))
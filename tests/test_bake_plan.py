@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+from bake_plan import is_shared_sweep_node, node_frames, sweep_frames
+
+
+def object_node(start_frame=1, end_frame=10, frame_step=1, bake_reuse="LINK", bake_output="ACTION", sample_mode="STEP", is_array_bake=False):
+    # default bake reuse of object node is link
+    return SimpleNamespace(start_frame=start_frame, end_frame=end_frame, frame_step=frame_step, bake_reuse=bake_reuse,
+                           bake_output=bake_output, sample_mode=sample_mode, is_array_bake=lambda: is_array_bake)
+
+
+def run_sweep(frame_sets):
+    # same loop as bake all, scene evaluation and per job sampling are mocked
+    evaluate = Mock()
+    samples = [[] for _ in frame_sets]
+    for frame, job_indices in sweep_frames(frame_sets):
+        evaluate(frame)
+        for index in job_indices:
+            samples[index].append(frame)
+    return evaluate, samples
+
+
+def test_default_and_reuse_nodes_share_sweep():
+    assert is_shared_sweep_node(object_node())
+    assert is_shared_sweep_node(object_node(bake_reuse="COPY"))
+    assert is_shared_sweep_node(object_node(bake_reuse="NONE"))
+    assert not is_shared_sweep_node(object_node(bake_output="FILE"))
+    assert not is_shared_sweep_node(object_node(sample_mode="ADAPTIVE"))
+    assert not is_shared_sweep_node(object_node(is_array_bake=True))
+
+
+def test_scene_evaluated_once_per_frame_of_union():
+    nodes = [object_node(1, 10), object_node(5, 20, 2), object_node(1, 10)]
+    frame_sets = [node_frames(node) for node in nodes]
+    evaluate, samples = run_sweep(frame_sets)
+
+    union = set().union(*frame_sets)
+    assert evaluate.call_count == len(union) == 15
+    assert [call.args[0] for call in evaluate.call_args_list] == sorted(union)
+    for job_frames, job_samples in zip(frame_sets, samples):
+        assert job_samples == sorted(job_frames)
+
+
+def test_reused_node_is_not_sampled():
+    # fully reused bake join with empty frame set, it add no evaluation
+    frame_sets = [node_frames(object_node(1, 10)), set(),
+                  node_frames(object_node(1, 10))]
+    evaluate, samples = run_sweep(frame_sets)
+
+    assert evaluate.call_count == 10
+    assert samples[1] == []
+
+
+def test_all_reused_sweep_nothing():
+    evaluate, _ = run_sweep([set(), set()])
+    assert evaluate.call_count == 0
@@ -0,0 +1,66 @@
+from bone_chain import chain_weights, resolve_chain
+
+
+class Bone:
+    # minimal bone with parent and children like blender bone
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        if parent:
+            parent.children.append(self)
+
+
+def spine_bones():
+    # hips, spine_0..spine_3, then neck and shoulder branch
+    bones = {"hips": Bone("hips")}
+    parent = bones["hips"]
+    for index in range(4):
+        parent = bones["spine_{}".format(index)] = Bone("spine_{}".format(index), parent)
+    bones["neck"] = Bone("neck", parent)
+    bones["shoulder_l"] = Bone("shoulder_l", parent)
+    return bones
+
+
+def names(chain):
+    return [bone.name for bone in chain]
+
+
+def test_resolve_chain_start_to_end():
+    assert names(resolve_chain(spine_bones(), "spine_0", "spine_2")) == ["spine_0", "spine_1", "spine_2"]
+    assert names(resolve_chain(spine_bones(), "hips", "hips")) == ["hips"]
+
+
+def test_resolve_chain_without_end_stop_at_branch():
+    assert names(resolve_chain(spine_bones(), "hips", "")) == ["hips", "spine_0", "spine_1", "spine_2", "spine_3"]
+
+
+def test_resolve_chain_invalid_is_empty():
+    assert resolve_chain(spine_bones(), "missing", "") == []
+    assert resolve_chain(spine_bones(), "spine_2", "spine_0") == []
+    assert resolve_chain(spine_bones(), "neck", "shoulder_l") == []
+
+
+def test_chain_weights_same_count_is_identity():
+    assert chain_weights([1.0, 2.0, 3.0], [2.0, 4.0, 6.0]) == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+
+def test_chain_weights_every_source_sum_to_one():
+    for target_lengths, source_lengths in [([1.0, 1.0], [1.0, 1.0, 1.0, 1.0]), ([1.0, 1.0, 1.0], [1.0, 1.0]),
+                                           ([0.5, 2.0, 1.0], [1.0, 1.0, 3.0, 0.2])]:
+        weights = chain_weights(target_lengths, source_lengths)
+        assert len(weights) == len(target_lengths)
+        for source_index in range(len(source_lengths)):
+            assert abs(sum(row[source_index] for row in weights) - 1.0) < 1e-9
+
+
+def test_chain_weights_split_by_overlap():
+    # two target bones over three equal source bones, middle source bone is shared half and half
+    weights = chain_weights([1.0, 1.0], [1.0, 1.0, 1.0])
+    assert weights[0][0] == 1.0 and weights[1][2] == 1.0
+    assert abs(weights[0][1] - 0.5) < 1e-9 and abs(weights[1][1] - 0.5) < 1e-9
+    assert weights[0][2] == 0.0 and weights[1][0] == 0.0
+
+
+def test_chain_weights_zero_length_source_bone():
+    assert chain_weights([1.0], [1.0, 0.0]) == [[1.0, 0.0]]
@@ -0,0 +1,69 @@
+from bone_matcher import match_bone_names, normalize_bone_name
+
+MIXAMO_BONES = [
+    "mixamorig:Hips", "mixamorig:Spine", "mixamorig:Spine1", "mixamorig:Spine2", "mixamorig:Neck", "mixamorig:Head",
+    "mixamorig:LeftShoulder", "mixamorig:LeftArm", "mixamorig:LeftForeArm", "mixamorig:LeftHand",
+    "mixamorig:RightShoulder", "mixamorig:RightArm", "mixamorig:RightForeArm", "mixamorig:RightHand",
+    "mixamorig:LeftUpLeg", "mixamorig:LeftLeg", "mixamorig:LeftFoot", "mixamorig:LeftToeBase",
+    "mixamorig:RightUpLeg", "mixamorig:RightLeg", "mixamorig:RightFoot", "mixamorig:RightToeBase",
+    "mixamorig:LeftHandIndex1", "mixamorig:LeftHandIndex2",
+]
+
+UE_BONES = [
+    "pelvis", "spine_01", "spine_02", "spine_03", "neck_01", "head",
+    "clavicle_l", "upperarm_l", "lowerarm_l", "hand_l",
+    "clavicle_r", "upperarm_r", "lowerarm_r", "hand_r",
+    "thigh_l", "calf_l", "foot_l", "ball_l",
+    "thigh_r", "calf_r", "foot_r", "ball_r",
+    "index_01_l", "index_02_l",
+]
+
+EXPECTED_PAIRS = {
+    "pelvis": "mixamorig:Hips",
+    "spine_01": "mixamorig:Spine",
+    "spine_02": "mixamorig:Spine1",
+    "spine_03": "mixamorig:Spine2",
+    "neck_01": "mixamorig:Neck",
+    "head": "mixamorig:Head",
+    "clavicle_l": "mixamorig:LeftShoulder",
+    "upperarm_l": "mixamorig:LeftArm",
+    "lowerarm_l": "mixamorig:LeftForeArm",
+    "hand_l": "mixamorig:LeftHand",
+    "upperarm_r": "mixamorig:RightArm",
+    "thigh_l": "mixamorig:LeftUpLeg",
+    "calf_l": "mixamorig:LeftLeg",
+    "foot_r": "mixamorig:RightFoot",
+    "ball_l": "mixamorig:LeftToeBase",
+    "index_01_l": "mixamorig:LeftHandIndex1",
+    "index_02_l": "mixamorig:LeftHandIndex2",
+}
+
+
+def test_normalize_side_and_prefix():
+    assert normalize_bone_name("mixamorig:LeftUpLeg")[:2] == \
+        normalize_bone_name("thigh_l")[:2]
+    assert normalize_bone_name("DEF-forearm.R")[:2] == \
+        normalize_bone_name("lowerarm_r")[:2]
+
+
+def test_mixamo_to_ue_pairs():
+    pairs = {target: source for target, source,
+             _ in match_bone_names(UE_BONES, MIXAMO_BONES)}
+    for target, source in EXPECTED_PAIRS.items():
+        assert pairs.get(target) == source, target
+
+
+def test_pairs_are_one_to_one():
+    matches = match_bone_names(UE_BONES, MIXAMO_BONES)
+    sources = [source for _, source, _ in matches]
+    assert len(sources) == len(set(sources))
+    assert all(0.0 <= confidence <= 1.0 for _, _, confidence in matches)
+
+
+def test_side_never_crossed():
+    matches = match_bone_names(["hand_l", "hand_r"], [
+                               "mixamorig:RightHand", "mixamorig:LeftHand"])
+    assert dict((target, source) for target, source, _ in matches) == {
+        "hand_l": "mixamorig:LeftHand",
+        "hand_r": "mixamorig:RightHand",
+    }
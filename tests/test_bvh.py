@@ -0,0 +1,118 @@
+import os
+import numpy as np
+import pytest
+from conftest import FIXTURES
+from array_math import quat_to_matrix
+from production.bvh import AXIS_CONVERSION, BVHMotion, read_bvh_bone_names
+
+SMALL_BVH = os.path.join(FIXTURES, "small.bvh")
+
+
+def rotation(axis: str, degree: float):
+    # right hand rotation matrix around one axis, column vector
+    angle = np.radians(degree)
+    cosine, sine = np.cos(angle), np.sin(angle)
+    if axis == "X":
+        return np.array([[1.0, 0.0, 0.0], [0.0, cosine, -sine], [0.0, sine, cosine]])
+    if axis == "Y":
+        return np.array([[cosine, 0.0, sine], [0.0, 1.0, 0.0], [-sine, 0.0, cosine]])
+    return np.array([[cosine, -sine, 0.0], [sine, cosine, 0.0], [0.0, 0.0, 1.0]])
+
+
+def motion_rows():
+    # every frame of fixture as (frames, channels), wrapped frame row joined
+    with open(SMALL_BVH) as file:
+        text = file.read().split("Frame Time: 0.0333333")[1]
+    return np.array(text.split(), dtype=np.float64).reshape(-1, 12)
+
+
+def read_all(motion, frame_step=1, chunk_frames=4096):
+    indices = []
+    transforms = {}
+    for chunk_indices, chunk in motion.iter_chunks(motion.bone_names, frame_step, chunk_frames):
+        indices.append(chunk_indices)
+        for name, values in chunk.items():
+            transforms.setdefault(name, []).append(values)
+    return np.concatenate(indices), {name: [np.concatenate(part) for part in zip(*chunks)] for name, chunks in transforms.items()}
+
+
+def test_hierarchy_and_offsets():
+    motion = BVHMotion(SMALL_BVH)
+    assert motion.bone_names == ["Hips", "Spine", "Left Leg"]
+    assert [joint.parent for joint in motion.joints] == [-1, 0, 0]
+    assert motion.joints[0].children == [1, 2]
+    assert np.allclose(motion.joints[0].offset, [0.0, 90.0, 0.0])
+    assert np.allclose(motion.joints[2].offset, [10.0, -5.0, 0.0])
+    assert motion.joints[0].end_offset is None
+    assert np.allclose(motion.joints[1].end_offset, [0.0, 20.0, 0.0])
+    assert [joint.column for joint in motion.joints] == [0, 6, 9]
+    assert motion.channel_count == 12
+    assert motion.frame_count == 5
+    assert motion.frame_time == pytest.approx(0.0333333)
+
+
+def test_bone_tuples_in_blender_space():
+    bones = {name: (parent, head, tail)
+             for name, parent, head, tail in BVHMotion(SMALL_BVH, 0.01).bone_tuples()}
+    # y up to z up, scaled
+    assert bones["Hips"][0] == ""
+    assert np.allclose(bones["Hips"][1], [0.0, 0.0, 0.9])
+    assert np.allclose(bones["Hips"][2], [0.0, 0.0, 1.0])
+    assert bones["Left Leg"][0] == "Hips"
+    assert np.allclose(bones["Left Leg"][1], [0.1, 0.0, 0.85])
+    assert np.allclose(bones["Left Leg"][2], [0.1, 0.0, 0.45])
+    assert np.allclose(AXIS_CONVERSION @ [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])
+
+
+def test_rotation_follow_channel_order():
+    motion = BVHMotion(SMALL_BVH)
+    rows = motion_rows()
+    _, transforms = read_all(motion)
+
+    for name, axes, column in [("Hips", "ZXY", 3), ("Spine", "ZXY", 6), ("Left Leg", "YXZ", 9)]:
+        matrices = quat_to_matrix(transforms[name][1])
+        for frame, row in enumerate(rows):
+            # bvh apply channels left to right, R = R1 @ R2 @ R3
+            expected = rotation(axes[0], row[column]) @ rotation(
+                axes[1], row[column + 1]) @ rotation(axes[2], row[column + 2])
+            assert np.allclose(matrices[frame], expected, atol=1e-9)
+
+
+def test_location_relative_to_offset():
+    motion = BVHMotion(SMALL_BVH)
+    _, transforms = read_all(motion)
+    location, _, scale = transforms["Hips"]
+    assert np.allclose(location, motion_rows()[:, :3] - [0.0, 90.0, 0.0])
+    assert np.allclose(scale, 1.0)
+    # joint without position channel stay at rest position
+    assert np.allclose(transforms["Spine"][0], 0.0)
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 2, 3, 4096])
+def test_wrapped_row_across_chunk_boundary(chunk_frames):
+    # frame 3 is written on two lines, small chunk split it between chunks
+    motion = BVHMotion(SMALL_BVH)
+    indices, transforms = read_all(motion, chunk_frames=chunk_frames)
+    expected_indices, expected = read_all(motion)
+    assert list(indices) == list(expected_indices) == [0, 1, 2, 3, 4]
+    for name in motion.bone_names:
+        for values, expected_values in zip(transforms[name], expected[name]):
+            assert np.allclose(values, expected_values)
+    assert np.allclose(transforms["Hips"][0][3], [3.0, 3.0, 6.0])
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 2, 4096])
+def test_frame_step_phase_across_chunks(chunk_frames):
+    motion = BVHMotion(SMALL_BVH)
+    indices, transforms = read_all(motion, 2, chunk_frames)
+    assert list(indices) == [0, 2, 4]
+    assert np.allclose(transforms["Hips"][0][:, 0], [0.0, 2.0, 4.0])
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "broken.bvh"
+    path.write_text("HIERARCHY\nROOT Hips\n{\n\tOFFSET 0 0 0\n")
+    with pytest.raises(ValueError):
+        BVHMotion(str(path))
+    assert read_bvh_bone_names(str(path)) == []
+    assert read_bvh_bone_names(SMALL_BVH) == ["Hips", "Spine", "Left Leg"]
@@ -0,0 +1,141 @@
+import math
+import random
+import time
+from itertools import permutations
+from hierarchy_matcher import best_assignment, build_chains, match_bone_hierarchy, normalize_bones
+
+
+def humanoid(names: dict, extra_root: str = ""):
+    # list of tuple (name, parent name, head, tail), names map role -> bone name
+    bones = [
+        ("hips", "", (0.0, 0.0, 1.0), (0.0, 0.0, 1.1)),
+        ("spine", "hips", (0.0, 0.0, 1.1), (0.0, 0.0, 1.4)),
+        ("head", "spine", (0.0, 0.0, 1.4), (0.0, 0.0, 1.7)),
+        ("thigh_l", "hips", (0.1, 0.0, 1.0), (0.1, 0.0, 0.55)),
+        ("calf_l", "thigh_l", (0.1, 0.0, 0.55), (0.1, 0.0, 0.1)),
+        ("foot_l", "calf_l", (0.1, 0.0, 0.1), (0.1, -0.15, 0.0)),
+        ("thigh_r", "hips", (-0.1, 0.0, 1.0), (-0.1, 0.0, 0.55)),
+        ("calf_r", "thigh_r", (-0.1, 0.0, 0.55), (-0.1, 0.0, 0.1)),
+        ("foot_r", "calf_r", (-0.1, 0.0, 0.1), (-0.1, -0.15, 0.0)),
+    ]
+    result = [(names.get(name, name), names.get(parent, parent) if parent else extra_root, head, tail)
+              for name, parent, head, tail in bones]
+    if extra_root:
+        # root on ground with ik bone, chain level which source does not have
+        result.insert(0, (extra_root, "", (0.0, 0.0, 0.0), (0.0, 0.1, 0.0)))
+        result.append(("ik_foot_root", extra_root,
+                      (0.0, 0.0, 0.0), (0.0, 0.0, 0.05)))
+    return result
+
+
+TARGET_NAMES = {"hips": "Bone", "spine": "Bone.001", "head": "Bone.002", "thigh_l": "Bone.003", "calf_l": "Bone.004",
+                "foot_l": "Bone.005", "thigh_r": "Bone.006", "calf_r": "Bone.007", "foot_r": "Bone.008"}
+
+
+def test_chains_compress_single_child():
+    chains, roots = build_chains(normalize_bones(humanoid({})))
+    assert len(roots) == 1
+    assert chains[roots[0]]["bones"] == ["hips"]
+    assert sorted(len(chains[index]["bones"])
+                  for index in chains[roots[0]]["children"]) == [2, 3, 3]
+
+
+def test_meaningless_names_align_by_structure():
+    pairs = {target: source for target, source, _ in match_bone_hierarchy(
+        humanoid(TARGET_NAMES), humanoid({}))}
+    assert pairs == {bone_name: role for role,
+                     bone_name in TARGET_NAMES.items()}
+
+
+def test_extra_root_bone_is_skipped():
+    pairs = {target: source for target, source, _ in match_bone_hierarchy(
+        humanoid(TARGET_NAMES, extra_root="root"), humanoid({}))}
+    assert "root" not in pairs and "ik_foot_root" not in pairs
+    assert pairs["Bone"] == "hips"
+    assert pairs["Bone.003"] == "thigh_l"
+    assert pairs["Bone.008"] == "foot_r"
+
+
+def test_longer_source_chain_skip_bone():
+    # source spine has one more bone, target bones pick nearest along chain
+    source = humanoid({})
+    source[1] = ("spine", "hips", (0.0, 0.0, 1.1), (0.0, 0.0, 1.25))
+    source.insert(2, ("spine1", "spine", (0.0, 0.0, 1.25), (0.0, 0.0, 1.4)))
+    source[3] = ("head", "spine1", (0.0, 0.0, 1.4), (0.0, 0.0, 1.7))
+    pairs = {target: source_name for target, source_name,
+             _ in match_bone_hierarchy(humanoid(TARGET_NAMES), source)}
+    assert pairs["Bone"] == "hips"
+    assert pairs["Bone.002"] == "head"
+    assert pairs["Bone.001"] in ["spine", "spine1"]
+    assert len(set(pairs.values())) == len(pairs)
+
+
+def test_anchors_are_kept_out_of_result():
+    matches = match_bone_hierarchy(humanoid(TARGET_NAMES), humanoid({}), anchors={
+                                   "Bone": "hips", "Bone.003": "thigh_l"})
+    targets = [target for target, _, _ in matches]
+    sources = [source for _, source, _ in matches]
+    assert "Bone" not in targets and "Bone.003" not in targets
+    assert "hips" not in sources and "thigh_l" not in sources
+    assert dict((target, source) for target, source, _ in matches)[
+        "Bone.004"] == "calf_l"
+
+
+def wide_fan(count: int, prefix: str = ""):
+    # root with many leaf children on a circle (face rig, fan of fingers)
+    bones = [(prefix + "root", "", (0.0, 0.0, 0.0), (0.0, 0.0, 0.1))]
+    for index in range(count - 1):
+        angle = 2.0 * math.pi * index / (count - 1)
+        bones.append((prefix + "fan_{}".format(index), prefix + "root", (0.1 * math.cos(angle), 0.1 * math.sin(angle), 0.1),
+                      (0.5 * math.cos(angle), 0.5 * math.sin(angle), 0.2)))
+    return bones
+
+
+def comb(count: int, prefix: str = ""):
+    # long spine, every bone has a twig child, so no chain is longer than one bone
+    bones = []
+    spine = count // 2
+    for index in range(spine):
+        z = index / spine
+        parent = prefix + "spine_{}".format(index - 1) if index else ""
+        bones.append((prefix + "spine_{}".format(index), parent, (0.0, 0.0, z), (0.0, 0.0, z + 1.0 / spine)))
+        bones.append((prefix + "twig_{}".format(index), prefix + "spine_{}".format(index), (0.0, 0.0, z),
+                      (0.1 if index % 2 else -0.1, 0.0, z)))
+    return bones
+
+
+def timed_match(shape):
+    start = time.perf_counter()
+    matches = match_bone_hierarchy(shape(500), shape(500, "s_"))
+    return time.perf_counter() - start, matches
+
+
+def test_wide_fan_500_under_one_second():
+    duration, matches = timed_match(wide_fan)
+    assert duration < 1.0
+    assert len(matches) == 500
+    assert all("s_" + target == source for target, source, _ in matches)
+
+
+def test_comb_500_under_one_second():
+    duration, matches = timed_match(comb)
+    assert duration < 1.0
+    assert len(matches) == 500
+    assert all("s_" + target == source for target, source, _ in matches)
+
+
+def test_best_assignment_is_maximum():
+    rng = random.Random(0)
+    for rows, columns in [(1, 4), (3, 3), (4, 2), (5, 6)]:
+        weights = [[rng.uniform(-0.5, 1.0) for _ in range(columns)] for _ in range(rows)]
+        pairs = best_assignment(weights)
+        assert len({row for row, _ in pairs}) == len({column for _, column in pairs}) == len(pairs)
+
+        # brute force over every assignment of the smaller side
+        if rows <= columns:
+            best = max(sum(max(weights[row][column], 0.0) for row, column in enumerate(order))
+                       for order in permutations(range(columns), rows))
+        else:
+            best = max(sum(max(weights[row][column], 0.0) for column, row in enumerate(order))
+                       for order in permutations(range(rows), columns))
+        assert math.isclose(sum(weights[row][column] for row, column in pairs), best)
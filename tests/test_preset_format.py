@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+import pytest
+from conftest import FIXTURES
+from preset_format import LAYOUT_PROPERTIES, PRESET_VERSION, PROPERTY_NODE_TYPE, migrate_preset, parse_preset, parse_substitutions, preset_rows, read_preset, remap_preset_bones, skip_preset_nodes, validate_preset, validate_preset_bones
+
+PRESET_0_0_1 = os.path.join(FIXTURES, "preset_0_0_1.json")
+
+
+def load_fixture():
+    with open(PRESET_0_0_1) as file:
+        return json.load(file)
+
+
+def test_migrate_0_0_1():
+    old = load_fixture()
+    data = migrate_preset(load_fixture())
+    validate_preset(data)
+
+    assert data["version"] == PRESET_VERSION
+    assert data["count"] == len(old["nodes"])
+    assert data["properties"][:len(LAYOUT_PROPERTIES)] == LAYOUT_PROPERTIES
+
+    rows = {row["name"]: row for row in preset_rows(data)}
+    assert list(rows) == list(old["nodes"])
+    for name, node_data in old["nodes"].items():
+        row = rows[name]
+        for prop_name in LAYOUT_PROPERTIES:
+            if prop_name != "name":
+                assert row[prop_name] == node_data[prop_name]
+
+    # bone node keep mapping value, frame mapping value become empty
+    assert rows["Bone"]["bone_source"] == "mixamorig:Hips"
+    assert rows["Bone.001"]["parent"] == "Frame"
+    assert rows["Bone.001"]["rotation_euler_multiply"] == [1.0, 1.0, 1.0]
+    assert rows["Frame"]["bone_target"] is None
+    assert rows["Frame"]["mix_mode"] is None
+
+
+def test_read_plain_and_gzip(tmp_path):
+    with open(PRESET_0_0_1, "rb") as file:
+        raw = file.read()
+    gzip_path = tmp_path / "preset.json.gz"
+    gzip_path.write_bytes(gzip.compress(raw))
+
+    assert read_preset(PRESET_0_0_1) == read_preset(str(gzip_path))
+    assert parse_preset(gzip.compress(raw)) == read_preset(PRESET_0_0_1)
+
+
+def test_unknown_version_rejected():
+    with pytest.raises(ValueError):
+        migrate_preset({"version": [9, 9, 9]})
+
+
+def test_remap_and_validate_bones():
+    data = migrate_preset(load_fixture())
+    data = remap_preset_bones(
+        data, parse_substitutions("mixamorig::, _l:.L"))
+    rows = {row["name"]: row for row in preset_rows(data)}
+    assert rows["Bone"]["bone_source"] == "Hips"
+    assert rows["Bone.001"]["bone_target"] == "thigh.L"
+
+    invalid, missing_target, missing_source = validate_preset_bones(
+        data, ["pelvis"], ["Hips", "LeftUpLeg"])
+    assert invalid == {"Bone.001"}
+    assert missing_target == {"thigh.L"}
+    assert missing_source == set()
+
+    data = skip_preset_nodes(data, invalid)
+    assert data["count"] == 2
+    validate_preset(data)
+
+
+def test_property_rows_skip_bone_check():
+    # property node column next to bone columns, its bone values are empty
+    data = migrate_preset(load_fixture())
+    rows = list(preset_rows(data))
+    rows.append(dict({prop_name: None for prop_name in data["properties"]}, type=PROPERTY_NODE_TYPE, name="Property",
+                     label="", location=[0.0, 0.0], width=300.0, height=100.0, hide=False, target_name="jawOpen", source_name="jawOpen"))
+    properties = data["properties"] + ["target_name", "source_name"]
+    data = dict(data, count=len(rows), properties=properties, values=[
+        [row.get(prop_name) for row in rows] for prop_name in properties])
+    validate_preset(data)
+
+    invalid, _, _ = validate_preset_bones(
+        data, ["pelvis", "thigh_l"], ["mixamorig:Hips", "mixamorig:LeftUpLeg"])
+    assert invalid == set()
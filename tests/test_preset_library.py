@@ -0,0 +1,106 @@
+import json
+import os
+from unittest.mock import Mock
+import pytest
+from conftest import FIXTURES
+from preset_format import TARGET_COLUMNS, migrate_preset
+from production import preset_library
+from production.preset_library import INDEX_FILE_NAME, rank_library_presets, refresh_library_index
+
+
+def write_preset(path, target_prefix: str = ""):
+    # current format preset from fixture, target bone names optionally prefixed
+    with open(os.path.join(FIXTURES, "preset_0_0_1.json")) as file:
+        data = migrate_preset(json.load(file))
+    for column in TARGET_COLUMNS:
+        if column not in data["properties"]:
+            continue
+        index = data["properties"].index(column)
+        data["values"][index] = [
+            target_prefix + name if name else name for name in data["values"][index]]
+    path.write_text(json.dumps(data))
+
+
+@pytest.fixture
+def parse_spy(monkeypatch):
+    # count parsed preset, memory index is cleared so every test start from files
+    monkeypatch.setattr(preset_library, "index_cache", {})
+    spy = Mock(wraps=preset_library.parse_preset)
+    monkeypatch.setattr(preset_library, "parse_preset", spy)
+    return spy
+
+
+def test_rank_by_coverage_of_preset_and_rig():
+    entries = {
+        "full.json": {"targets": ["a", "b", "c"], "sources": ["x", "y", "z"]},
+        "partial.json": {"targets": ["a", "b"], "sources": ["x"]},
+        "big.json": {"targets": ["a", "b", "c", "d", "e", "f"], "sources": ["x", "y", "z", "u", "v", "w"]},
+        "other.json": {"targets": ["q"], "sources": ["r"]},
+        "empty.json": {"targets": [], "sources": []},
+    }
+    ranks = rank_library_presets(entries, ["a", "b", "c"], ["x", "y", "z"])
+
+    # no matching bone and empty preset are left out
+    assert [path for path, _, _ in ranks] == ["full.json", "partial.json", "big.json"]
+    assert ranks[0][1:] == (1.0, 6)
+    assert ranks[1][1:] == (1.0, 3)
+    assert ranks[2][1:] == (0.5, 6)
+
+
+def test_rank_tie_sorted_by_path():
+    entries = {name: {"targets": ["a"], "sources": ["x"]}
+               for name in ["b.json", "a.json"]}
+    assert [path for path, _, _ in rank_library_presets(entries, ["a"], ["x"])] == ["a.json", "b.json"]
+
+
+def test_refresh_skip_unchanged_files(tmp_path, parse_spy):
+    write_preset(tmp_path / "one.json")
+    write_preset(tmp_path / "two.json", "prefix_")
+    entries = refresh_library_index(str(tmp_path))
+    assert parse_spy.call_count == 2
+    assert (tmp_path / INDEX_FILE_NAME).exists()
+    assert all(name.startswith("prefix_")
+               for name in entries["two.json"]["targets"])
+
+    # memory index, then index file of directory
+    assert refresh_library_index(str(tmp_path)) == entries
+    preset_library.index_cache.clear()
+    assert refresh_library_index(str(tmp_path)) == entries
+    assert parse_spy.call_count == 2
+
+
+def test_refresh_rehash_changed_file(tmp_path, parse_spy):
+    write_preset(tmp_path / "one.json")
+    write_preset(tmp_path / "two.json")
+    entries = refresh_library_index(str(tmp_path))
+
+    write_preset(tmp_path / "two.json", "changed_")
+    changed = refresh_library_index(str(tmp_path))
+    assert parse_spy.call_count == 3
+    assert changed["one.json"] == entries["one.json"]
+    assert changed["two.json"]["hash"] != entries["two.json"]["hash"]
+    assert all(name.startswith("changed_")
+               for name in changed["two.json"]["targets"])
+
+
+def test_refresh_touched_file_keep_bones(tmp_path, parse_spy):
+    write_preset(tmp_path / "one.json")
+    entries = refresh_library_index(str(tmp_path))
+
+    # same content with new modification time is hashed but not parsed
+    stat = os.stat(tmp_path / "one.json")
+    os.utime(tmp_path / "one.json", (stat.st_atime, stat.st_mtime + 10.0))
+    touched = refresh_library_index(str(tmp_path))
+    assert parse_spy.call_count == 1
+    assert touched["one.json"]["hash"] == entries["one.json"]["hash"]
+    assert touched["one.json"]["targets"] == entries["one.json"]["targets"]
+    assert touched["one.json"]["mtime"] == stat.st_mtime + 10.0
+
+
+def test_refresh_drop_removed_file(tmp_path, parse_spy):
+    write_preset(tmp_path / "one.json")
+    write_preset(tmp_path / "two.json")
+    refresh_library_index(str(tmp_path))
+
+    os.remove(tmp_path / "two.json")
+    assert list(refresh_library_index(str(tmp_path))) == ["one.json"]
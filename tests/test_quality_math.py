@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from array_math import quat_multiply
+from production.quality_math import points_height, quality_metrics
+
+FRAMES = 20
+IDENTITY = np.array([1.0, 0.0, 0.0, 0.0])
+
+
+def still_pose(positions):
+    # (frames, bones, 3) positions and identity rotations, rest (bones, 4)
+    positions = np.repeat(np.array(positions, dtype=np.float64)[None], FRAMES, axis=0)
+    rotations = np.broadcast_to(IDENTITY, positions.shape[:2] + (4,)).copy()
+    return positions, rotations, rotations[0].copy()
+
+
+def metrics(source, source_height, target, target_height):
+    return quality_metrics(*source, source_height, *target, target_height)
+
+
+def test_static_pose_score_zero():
+    # hips and foot, target is same pose on two times bigger rig
+    source = still_pose([[0.0, 0.0, 1.0], [0.1, 0.0, 0.0]])
+    target = still_pose([[0.0, 0.0, 2.0], [0.2, 0.0, 0.0]])
+    for values in metrics(source, 1.0, target, 2.0).values():
+        assert values.shape == (2,)
+        assert np.allclose(values, 0.0)
+
+
+def test_known_foot_slide():
+    # source foot planted on ground, target foot move 0.01 per frame on rig of height 2
+    source = still_pose([[0.0, 0.0, 1.0], [0.1, 0.0, 0.0]])
+    target = still_pose([[0.0, 0.0, 2.0], [0.2, 0.0, 0.0]])
+    target[0][:, 1, 0] += 0.01 * np.arange(FRAMES)
+
+    result = metrics(source, 1.0, target, 2.0)
+    assert result["sliding"][0] == pytest.approx(0.0)
+    assert result["sliding"][1] == pytest.approx(0.005)
+    # constant speed has no acceleration
+    assert result["jitter"][1] == pytest.approx(0.0)
+    # last frame is furthest, in rig height unit
+    assert result["position_max"][1] == pytest.approx(0.01 * (FRAMES - 1) / 2.0)
+
+
+def test_moving_source_foot_is_not_planted():
+    # source foot swing above contact height, target slide is not counted
+    source = still_pose([[0.0, 0.0, 1.0], [0.1, 0.0, 0.0]])
+    source[0][:, 1, 2] += 0.1 * np.abs(np.sin(np.arange(FRAMES)))
+    source[0][:, 1, 0] += 0.05 * np.arange(FRAMES)
+    target = still_pose([[0.0, 0.0, 1.0], [0.1, 0.0, 0.0]])
+    target[0][:, 1, 0] += 0.05 * np.arange(FRAMES)
+    assert metrics(source, 1.0, target, 1.0)["sliding"][1] == pytest.approx(0.0)
+
+
+def test_position_normalized_by_rig_height():
+    source = still_pose([[0.0, 0.0, 1.0], [0.1, 0.0, 0.0]])
+    target = still_pose([[0.0, 0.0, 2.0], [0.2, 0.0, 0.0]])
+
+    # wrong height leave the scale difference as error
+    assert np.allclose(metrics(source, 1.0, target, 2.0)["position_rms"], 0.0)
+    result = metrics(source, 1.0, target, 1.0)
+    assert result["position_rms"][1] == pytest.approx(np.linalg.norm([0.1, 0.0, -1.0]) / 2.0)
+
+
+def test_orientation_error_from_rest():
+    # target bone rest differ from source, same rotation from rest is no error
+    source = still_pose([[0.0, 0.0, 1.0]])
+    target = still_pose([[0.0, 0.0, 1.0]])
+    half = np.sqrt(0.5)
+    target[2][0] = [half, 0.0, 0.0, half]
+    target[1][:] = [half, 0.0, 0.0, half]
+    assert np.allclose(metrics(source, 1.0, target, 1.0)["orientation_rms"], 0.0)
+
+    # target turn from its rest 90 degree around x more than source
+    target[1][:] = quat_multiply(np.array([half, half, 0.0, 0.0]), target[2][0])
+    result = metrics(source, 1.0, target, 1.0)
+    assert result["orientation_rms"][0] == pytest.approx(90.0)
+
+
+def test_points_height():
+    assert points_height([0.0, 1.8, 0.2]) == pytest.approx(1.8)
+    assert points_height([-1.0, 1.0]) == pytest.approx(2.0)
+    # flat or empty rig count as unit height
+    assert points_height([0.5, 0.5]) == 1.0
+    assert points_height([]) == 1.0
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from array_math import euler_to_quat, quat_to_matrix
+from production.root_motion import armature_matrices, extract_root_motion, smooth_frames
+
+FRAMES = 30
+
+
+def rest_matrix(location, rotation_x: float = 0.0):
+    # bone rest matrix in armature space, rotated around x
+    matrix = np.eye(4)
+    matrix[:3, :3] = quat_to_matrix(euler_to_quat([rotation_x, 0.0, 0.0]))
+    matrix[:3, 3] = location
+    return matrix
+
+
+def armature():
+    # root on ground, pelvis baked parent of hips, hips, pose bone like object with rest matrix only
+    bones = {}
+    for name, parent, matrix in [("root", None, rest_matrix([0.0, 0.0, 0.0], -np.pi / 2)),
+                                 ("pelvis", "root", rest_matrix([0.0, 0.0, 1.0])),
+                                 ("hips", "pelvis", rest_matrix([0.0, 0.0, 1.05], 0.3))]:
+        bones[name] = SimpleNamespace(name=name, parent=bones.get(parent), bone=SimpleNamespace(
+            matrix_local=matrix), rotation_mode="QUATERNION")
+    return SimpleNamespace(pose=SimpleNamespace(bones=bones))
+
+
+def baked_channels():
+    # pelvis lean and shift, hips walk forward with sway, bob and turn
+    time = np.linspace(0.0, 1.0, FRAMES)
+    zeros = np.zeros(FRAMES)
+    return {
+        "pelvis": {
+            "location": np.stack([0.02 * np.ones(FRAMES), zeros, 0.01 * time], axis=-1),
+            "rotation_quaternion": euler_to_quat(np.stack([zeros, 0.1 * time, zeros], axis=-1)),
+        },
+        "hips": {
+            "location": np.stack([0.1 * np.sin(6.0 * time), 2.0 * time, 0.05 * np.cos(6.0 * time)], axis=-1),
+            "rotation_quaternion": euler_to_quat(np.stack([0.1 * time, zeros, 1.2 * time], axis=-1)),
+            "scale": np.ones((FRAMES, 3)),
+        },
+    }
+
+
+def extract(channels, axes=(True, True), use_rotation=False, smoothing=0):
+    return extract_root_motion(channels, armature(), "root", "hips", axes, use_rotation, smoothing)
+
+
+@pytest.mark.parametrize("use_rotation", [False, True])
+def test_hips_world_pose_unchanged(use_rotation):
+    channels = baked_channels()
+    hips = armature().pose.bones["hips"]
+    before = armature_matrices(hips, channels, FRAMES)
+    result = extract(channels, use_rotation=use_rotation)
+    after = armature_matrices(hips, result, FRAMES)
+    assert np.allclose(before, after, atol=1e-9)
+    # channels not touched by extraction stay
+    assert result["pelvis"] is channels["pelvis"]
+    assert np.allclose(result["hips"]["scale"], 1.0)
+
+
+def test_root_get_horizontal_motion():
+    channels = baked_channels()
+    bones = armature().pose.bones
+    hips_rest = bones["hips"].bone.matrix_local
+    hips = armature_matrices(bones["hips"], channels, FRAMES)
+
+    result = extract(channels)
+    root = armature_matrices(bones["root"], result, FRAMES)
+    assert np.allclose(root[:, :2, 3], hips[:, :2, 3] - hips_rest[:2, 3])
+    # no vertical motion and no turn on root, bob and heading stay on hips
+    assert np.allclose(root[:, 2, 3], 0.0)
+    assert np.allclose(root[:, :3, :3], bones["root"].bone.matrix_local[:3, :3])
+
+
+def test_root_axes_and_heading():
+    channels = baked_channels()
+    bones = armature().pose.bones
+    hips = armature_matrices(bones["hips"], channels, FRAMES)
+
+    result = extract(channels, axes=(False, True), use_rotation=True)
+    root = armature_matrices(bones["root"], result, FRAMES)
+    assert np.allclose(root[:, 0, 3], 0.0)
+    assert np.allclose(root[:, 1, 3], hips[:, 1, 3] - bones["hips"].bone.matrix_local[1, 3])
+
+    # root turn around z only, by heading of hips forward axis from rest
+    motion = root @ np.linalg.inv(bones["root"].bone.matrix_local)
+    assert np.allclose(motion[:, 2, :3], [0.0, 0.0, 1.0])
+    delta = hips[:, :3, :3] @ bones["hips"].bone.matrix_local[:3, :3].T
+    heading = np.arctan2(-delta[:, 0, 1], delta[:, 1, 1])
+    assert np.allclose(np.arctan2(motion[:, 1, 0], motion[:, 0, 0]), heading)
+
+
+def test_smoothing_keep_world_pose():
+    channels = baked_channels()
+    hips = armature().pose.bones["hips"]
+    result = extract(channels, smoothing=5)
+    assert np.allclose(armature_matrices(hips, channels, FRAMES),
+                       armature_matrices(hips, result, FRAMES), atol=1e-9)
+
+
+def test_smooth_frames_moving_average():
+    values = np.arange(5, dtype=np.float64)[:, None]
+    assert np.allclose(smooth_frames(values, 3)[:, 0], [1.0 / 3.0, 1.0, 2.0, 3.0, 11.0 / 3.0])
+    assert smooth_frames(values, 1) is values
+
+
+def test_hips_not_under_root_is_unchanged():
+    channels = baked_channels()
+    assert extract_root_motion(channels, armature(), "hips", "pelvis", (True, True), False, 0) is channels